@@ -0,0 +1,369 @@
+import os
+import threading
+import time
+
+import profiling
+from bu_sources import discover_sources
+from data_cache import file_fingerprint
+import incremental_ingest
+from data_loader import bu_view, index_view, load_files, overall_view, read_data_file
+from excel_ingest import ingest_workbook
+from period_index import build_period_index
+from precompute import load_artifact
+from shared_store import SHARED_STORE, Lease
+from snapshot_store import has_fresh_snapshot, manifest_fingerprint
+from sql_backend import SQL_DB
+from sql_backend import period_index as sql_period_index
+from streaming_ingest import aggregate_csv, needs_streaming
+
+# ---------------------------
+# Background refresh
+# ---------------------------
+# A worker thread polls the data directory (bu_sources.discover_sources, after
+# converting a changed workbook) every DASHBOARD_REFRESH_SECONDS and rebuilds the view data of each export
+# that changed, off the request path. Sessions read the last published
+# version of a view, which stays in place while the next one is built; once
+# the new version is complete and validated it replaces the old one in a
+# single reference swap, so a viewer never waits for a reload and never sees
+# a half-built view.
+#
+# Published view data is kept in the shared store (shared_store.py), under
+# the memory budget of every other dataset. The worker references each
+# published version through its own lease until a newer version replaces it
+# (or the export disappears), so a published view is never evicted; sessions
+# reference the versions they show, and a replaced version goes once no
+# session shows it any more.
+#
+# An export is only read once it has settled: its size and mtime are the same
+# as on the previous poll and at least DASHBOARD_REFRESH_SETTLE_SECONDS old,
+# so a file still being copied in is left alone. A new version is rejected,
+# and the previous one kept, only when it fails to load, changes while being
+# read (it is still being written) or has no months at all (truncated); a
+# rejected version is not retried until the file changes again. Any other
+# version is published, with warnings for what looks wrong with it: its last
+# line has no line break, or it has more malformed values or fewer months
+# than the version it replaces. The dashboard shows them with the view.
+#
+# DASHBOARD_REFRESH_SECONDS=0 turns the worker off; the dashboard then loads
+# views on the request path.
+
+REFRESH_SECONDS = float(os.environ.get("DASHBOARD_REFRESH_SECONDS", "5"))
+REFRESH_SETTLE_SECONDS = float(os.environ.get("DASHBOARD_REFRESH_SETTLE_SECONDS", "2"))
+
+
+def build_view(file_path, overall, previous=None):
+    """
+    Build the view data of an export the way the dashboard would serve it:
+    from its precomputed artifact, the SQL database, streamed aggregates or
+    the loaded file, in that order. CSV files are read incrementally (see
+    incremental_ingest.py), so a poll after rows were appended only parses
+    those rows.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        overall (bool): Whether this is the Overall_BU export
+        previous (dict): View data this function last built for the export,
+            if still at hand, to append new rows to
+
+    Returns:
+        dict: View data (see data_loader.overall_view / bu_view), with
+            'problems' (count of malformed values) and, for streamed
+            exports, 'streamed' set
+    """
+    view = load_artifact(file_path)
+    if view is not None:
+        return {**view, 'problems': 0}
+    index = sql_period_index(file_path) if SQL_DB else {}
+    if index:
+        return {**index_view(index), 'problems': 0}
+    if needs_streaming(file_path):
+        aggregates, problem_count = aggregate_csv(file_path)
+        return {**index_view(build_period_index(aggregates)), 'streamed': True, 'problems': problem_count}
+    if os.path.exists(file_path) and not has_fresh_snapshot(file_path):
+        # Only the rows appended since the last poll are parsed
+        view, problem_count, _ = incremental_ingest.ingest(file_path, overall, previous)
+        return {**view, 'problems': problem_count}
+    df, problems = read_data_file(file_path)
+    view = overall_view(df) if overall else bu_view(df)
+    view['problems'] = len(problems)
+    return view
+
+
+def _stat(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _ends_with_newline(file_path):
+    """Whether the last line of a file is complete; True for missing or empty files."""
+    try:
+        with open(file_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+    except OSError:
+        return True
+
+
+def _version(file_path):
+    """Identity of the current contents of an export (or its snapshot)."""
+    fingerprint = file_fingerprint(file_path)
+    if fingerprint is not None:
+        return fingerprint[2]
+    if has_fresh_snapshot(file_path):
+        return ('snapshot', manifest_fingerprint())
+    return None
+
+
+class Refresher:
+    """
+    Background worker keeping the view data of every export current.
+
+    Args:
+        interval (float): Seconds between polls
+        settle (float): Seconds a file must be unchanged before it is read
+        discover (callable): Zero-argument function returning the sources
+            ({'overall': path or None, 'bus': {label: path}}); by default
+            the workbook (DASHBOARD_WORKBOOK) is converted if it changed and
+            the exports are discovered as bu_sources.discover_sources does
+        build (callable): build(path, overall, previous view data or None)
+            -> view data
+        store (SharedStore): Store the published view data is kept in
+    """
+
+    def __init__(self, interval=REFRESH_SECONDS, settle=REFRESH_SETTLE_SECONDS,
+                 discover=None, build=build_view, store=SHARED_STORE):
+        self.interval = interval
+        self.settle = settle
+        self.discover = discover or self._discover_exports
+        self.build = build
+        self.store = store
+        # References the published versions, so the store keeps them
+        self._lease = Lease(store)
+        self.workbook_error = None
+        # Path -> {'version', 'key' (of the view data in the store), 'loaded',
+        # 'problems', 'months'}; replaced, never mutated, so readers need no lock
+        self._published = {}
+        # Path -> {'version', 'error'} of the last rejected version
+        self._rejected = {}
+        self._stats = {}
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.scans = 0
+        self.swaps = 0
+        self.rejections = 0
+        self.last_scan_seconds = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the worker thread, if it is not running yet."""
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='dashboard-refresh', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the worker thread after its current poll."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wait_ready(self, timeout=None):
+        """
+        Wait for the first poll to finish.
+
+        Returns:
+            bool: True if it finished within the timeout
+        """
+        return self._ready.wait(timeout)
+
+    def _discover_exports(self):
+        try:
+            ingest_workbook()
+            self.workbook_error = None
+        except Exception as e:
+            # The sheets converted from the last readable version stay served
+            self.workbook_error = str(e)
+        return discover_sources()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+            except Exception:
+                # A failed poll (e.g. an unreadable sources file) is retried
+                # on the next one; the published views stay in place
+                pass
+            finally:
+                self._ready.set()
+            self._stop.wait(self.interval)
+
+    def scan(self):
+        """
+        Poll the exports once and publish new versions of the changed ones.
+
+        Returns:
+            dict: Path -> error message of the versions rejected by this poll
+        """
+        start = time.perf_counter()
+        sources = self.discover()
+        overall = {sources['overall']} if sources['overall'] else set()
+        paths = [*overall, *sources['bus'].values()]
+
+        # Stat of every file on this poll; a file is read once it is old
+        # enough and unchanged since the previous poll that saw it
+        stats = {path: _stat(path) for path in paths}
+        now = time.time_ns()
+        due = {}
+        for path in paths:
+            stat = stats[path]
+            if stat is not None:
+                changed = path in self._stats and stat != self._stats[path]
+                if changed or now - stat[0] < self.settle * 1e9:
+                    continue
+            version = _version(path)
+            if version is None:
+                continue
+            published = self._published.get(path)
+            rejected = self._rejected.get(path)
+            if published is not None and published['version'] == version:
+                continue
+            if rejected is not None and rejected['version'] == version:
+                continue
+            due[path] = version
+        self._stats = stats
+
+        loaded = load_files(due, lambda path: self.build(path, path in overall, self.view(path))) if due else {}
+        for path in self._published.keys() - stats.keys():
+            incremental_ingest.forget(path)
+        published = {path: entry for path, entry in self._published.items() if path in stats}
+        rejected = {path: entry for path, entry in self._rejected.items() if path in stats}
+        errors = {}
+        for path, (view, error) in loaded.items():
+            if error is None:
+                error = self._reject(path, due[path], view)
+            if error is not None:
+                rejected[path] = {'version': due[path], 'error': str(error)}
+                errors[path] = str(error)
+                continue
+            key = ('refresh', path, due[path])
+            self._lease.get(key, lambda: view)
+            published[path] = {
+                'version': due[path],
+                'key': key,
+                'loaded': time.time(),
+                'problems': view.get('problems', 0),
+                'months': frozenset(view['index']),
+                'warnings': self._warnings(path, view),
+            }
+            rejected.pop(path, None)
+            self.swaps += 1
+
+        # The swap: sessions holding the previous dict keep their versions
+        self._published = published
+        self._rejected = rejected
+        self._lease.keep_only(entry['key'] for entry in published.values())
+        self.rejections += len(errors)
+        self.scans += 1
+        self.last_scan_seconds = time.perf_counter() - start
+        return errors
+
+    def _reject(self, path, version, view):
+        """Reason not to publish a newly built view (truncated or still being written), or None."""
+        if _version(path) != version:
+            return "file changed while it was read"
+        if not view.get('index'):
+            return "no months found"
+        return None
+
+    def _warnings(self, path, view):
+        """What looks wrong with a newly built view, compared with the version it replaces."""
+        warnings = []
+        if not _ends_with_newline(path):
+            warnings.append("its last line has no line break")
+        previous = self._published.get(path)
+        if previous is None:
+            return warnings
+        if view.get('problems', 0) > previous['problems']:
+            warnings.append(f"{view['problems']} malformed value(s), up from {previous['problems']}")
+        missing = sorted(period for period in previous['months'] if period not in view['index'])
+        if missing:
+            warnings.append(f"{len(missing)} month(s) no longer in the file, e.g. {missing[-1].strftime('%b %Y')}")
+        return warnings
+
+    def view_key(self, file_path):
+        """
+        Shared store key of the published view data of an export, or None
+        if no version has been published yet.
+        """
+        entry = self._published.get(file_path)
+        return None if entry is None else entry['key']
+
+    def view(self, file_path, lease=None):
+        """
+        The published view data of an export.
+
+        Args:
+            file_path (str): Export path, as discovered
+            lease (Lease): Lease to reference the view data from
+
+        Returns:
+            dict: View data, or None if no version has been published yet
+                or the store was cleared since
+        """
+        key = self.view_key(file_path)
+        if key is None:
+            return None
+        return lease.peek(key) if lease is not None else self.store.peek(key)
+
+    def status(self, file_path):
+        """
+        Publication state of an export.
+
+        Returns:
+            dict: 'loaded' (time the published version was swapped in, or
+                None), 'warnings' (list of what looks wrong with the
+                published version) and 'rejected' (error of a newer version
+                that was not published, or None)
+        """
+        entry = self._published.get(file_path)
+        rejected = self._rejected.get(file_path)
+        return {
+            'loaded': None if entry is None else entry['loaded'],
+            'warnings': [] if entry is None else entry['warnings'],
+            'rejected': None if rejected is None else rejected['error'],
+        }
+
+    def stats(self):
+        """
+        Worker counters for tuning.
+
+        Returns:
+            dict: running, scans, swaps, rejections, published (views),
+                last_scan_seconds and workbook_error
+        """
+        return {
+            'running': self.running,
+            'scans': self.scans,
+            'swaps': self.swaps,
+            'rejections': self.rejections,
+            'published': len(self._published),
+            'last_scan_seconds': self.last_scan_seconds,
+            'workbook_error': self.workbook_error,
+        }
+
+
+REFRESHER = Refresher()
+profiling.register_stats('refresh', REFRESHER.stats)
@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+from dashboard_utils import (
+    create_budget_vs_expense_chart,
+    create_donut_chart,
+    create_line_chart,
+    create_pie_chart,
+)
+from data_generator import generate_mock_data
+from data_loader import bu_view, overall_view, read_data_file
+from figure_cache import FIGURE_CACHE
+from profiling import rss_bytes
+from synthetic_csv import write_dataset
+
+# ---------------------------
+# Load -> process -> plot benchmark
+# ---------------------------
+# Runs the dashboard's data and chart stages headlessly over synthetic
+# datasets of increasing size (see synthetic_csv.py) and records, per stage:
+# wall time (min / median over --repeat runs), peak RSS, and the peak and
+# live Python allocations traced in a separate tracemalloc run.
+#
+#   python benchmark.py --scales 1,10,100 --output bench.json
+#   python benchmark.py --scales 1,10,100 --baseline bench_baseline.json
+#
+# With --baseline, stages slower (or allocating more) than the baseline by
+# more than --tolerance are flagged and the exit status is 1.
+
+BASE_SIZE = {'n_bus': 3, 'n_subdivs': 6, 'n_products': 5}
+DEFAULT_MONTHS = 12
+
+
+class _RssSampler:
+    """Samples the process RSS in a background thread to find a stage's peak."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def rss():
+        return rss_bytes()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.rss())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.start = self.rss()
+        self.peak = self.start
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.rss())
+
+
+def measure(stage, func, repeat):
+    """
+    Run one stage repeatedly and collect its metrics.
+
+    Args:
+        stage (str): Stage name
+        func (callable): Zero-argument function running the stage
+        repeat (int): Number of timed runs
+
+    Returns:
+        dict: Stage metrics
+    """
+    times = []
+    for i in range(repeat):
+        if i == 0:
+            with _RssSampler() as sampler:
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+        else:
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    live_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    del result
+
+    return {
+        'stage': stage,
+        'wall_s_min': min(times),
+        'wall_s_median': statistics.median(times),
+        'peak_rss_mb': sampler.peak / 2**20,
+        'rss_delta_mb': (sampler.peak - sampler.start) / 2**20,
+        'alloc_peak_mb': traced_peak / 2**20,
+        'alloc_live_blocks': live_blocks,
+    }
+
+
+def _chart_inputs(size, n_months):
+    """Inputs for the dashboard_utils chart builders, from the mock generator."""
+    mock = generate_mock_data(n_months=n_months, **size)
+    return mock['overall_budget'], mock['overall_expense'], mock['customer_by_bu'], mock['satisfaction_trend']
+
+
+def _plot_figures(index, category, title):
+    """Build and serialize the budget vs expense chart of every period."""
+    FIGURE_CACHE.clear()
+    payload = 0
+    for period, entry in index.items():
+        df = entry['data']
+        if any(name is not None for name in df.index.names):
+            df = df.reset_index()
+        fig = create_budget_vs_expense_chart(df, category, f"{title} ({period})")
+        payload += len(fig.to_json())
+    return payload
+
+
+def run_scale(scale, n_months, repeat, work_dir):
+    """
+    Generate a dataset at one scale and benchmark every stage on it.
+
+    Args:
+        scale (int): Size multiplier applied to BASE_SIZE
+        n_months (int): Number of months in the dataset
+        repeat (int): Timed runs per stage
+        work_dir (str): Directory for the generated CSV files
+
+    Returns:
+        list: Stage metric dicts, tagged with the scale and row counts
+    """
+    size = {key: value * scale for key, value in BASE_SIZE.items()}
+    data_dir = os.path.join(work_dir, f'scale_{scale}')
+    written = write_dataset(data_dir, n_months=n_months, bu_files=1, **size)
+    overall_path = os.path.join(data_dir, 'Overall_BU.csv')
+    bu_path = os.path.join(data_dir, 'BU1.csv')
+
+    df_overall, _ = read_data_file(overall_path)
+    df_bu, _ = read_data_file(bu_path)
+    overall_index = overall_view(df_overall)['index']
+    bu_index = bu_view(df_bu)['index']
+    budget, expense, customers, trend = _chart_inputs(size, n_months)
+
+    def build_charts():
+        FIGURE_CACHE.clear()
+        figs = [
+            create_donut_chart(budget, expense),
+            create_pie_chart(customers, 'customers', 'bu', 'Customers by BU'),
+            create_line_chart(trend, 'month', 'satisfaction', 'bu', 'Customer Satisfaction'),
+        ]
+        return sum(len(fig.to_json()) for fig in figs)
+
+    stages = [
+        ('load_overall', lambda: read_data_file(overall_path)),
+        ('load_bu', lambda: read_data_file(bu_path)),
+        # Everything a view is processed into: period index, KPIs,
+        # reconciliation and metric series (and perspective tables for BUs)
+        ('overall_view', lambda: overall_view(df_overall)),
+        ('bu_view', lambda: bu_view(df_bu)),
+        ('plot_overall', lambda: _plot_figures(overall_index, 'BU', 'Overall BU Budget vs Expense')),
+        ('plot_bu', lambda: _plot_figures(bu_index, 'Subdiv', 'BU1 Budget vs Expense')),
+        ('charts', build_charts),
+    ]
+
+    rows = {os.path.basename(path): count for path, count in written.items()}
+    results = []
+    for stage, func in stages:
+        metrics = measure(stage, func, repeat)
+        metrics.update({'scale': scale, 'rows': rows})
+        results.append(metrics)
+        print(f"scale {scale:>4} {stage:<16} {metrics['wall_s_min'] * 1000:10.1f} ms "
+              f"{metrics['rss_delta_mb']:8.1f} MB rss {metrics['alloc_peak_mb']:8.1f} MB alloc")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Flag stages that regressed against a baseline run.
+
+    Args:
+        results (list): Stage metrics of this run
+        baseline (dict): Previously written benchmark output
+        tolerance (float): Allowed relative slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        list: Human-readable regression messages
+    """
+    previous = {(r['scale'], r['stage']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        base = previous.get((result['scale'], result['stage']))
+        if base is None:
+            continue
+        for metric in ('wall_s_min', 'alloc_peak_mb'):
+            if base[metric] > 0 and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"scale {result['scale']} {result['stage']}: {metric} "
+                    f"{result[metric]:.4g} vs baseline {base[metric]:.4g} "
+                    f"(+{(result[metric] / base[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def _positive_int(text):
+    """argparse type: an integer of at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an integer: {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard load, process and plot stages.")
+    parser.add_argument("--scales", default="1,10,100",
+                        help="Comma-separated size multipliers (default: %(default)s)")
+    parser.add_argument("--months", type=_positive_int, default=DEFAULT_MONTHS, help="Months per dataset (default: %(default)s)")
+    parser.add_argument("--repeat", type=_positive_int, default=3, help="Timed runs per stage (default: %(default)s)")
+    parser.add_argument("--output", default="benchmark_results.json", help="Results file (default: %(default)s)")
+    parser.add_argument("--baseline", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative regression against the baseline (default: %(default)s)")
+    parser.add_argument("--work-dir", help="Keep generated datasets in this directory")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='bu_bench_')
+    try:
+        results = []
+        for scale in (int(s) for s in args.scales.split(',')):
+            results.extend(run_scale(scale, args.months, args.repeat, work_dir))
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'months': args.months,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import json
+import os
+import re
+
+from snapshot_store import SNAPSHOT_DIR, load_manifest
+
+# ---------------------------
+# BU source discovery
+# ---------------------------
+# The dashboard's files are discovered instead of hardcoded: an Overall_BU.csv
+# and one <BU>.csv per business unit in DASHBOARD_DATA_DIR (default: the
+# working directory), plus any export the snapshot store has ingested whose
+# CSV has since been archived. Per-BU exports the store ingested from a
+# workbook sheet not named BU<n> are included under their sheet name.
+#
+# A sources file (DASHBOARD_SOURCES, default <data dir>/sources.json) can list
+# the files explicitly instead, paths relative to the data directory:
+#
+#   {"overall": "Overall_BU.csv", "bus": {"BU1": "BU1.csv", "BU2": "exports/bu2.csv"}}
+
+DATA_DIR = os.environ.get("DASHBOARD_DATA_DIR", ".")
+SOURCES_FILE = os.environ.get("DASHBOARD_SOURCES")
+
+OVERALL_FILE = "Overall_BU.csv"
+
+# Per-BU exports: BU1.csv, BU12.csv, ...
+_BU_FILE = re.compile(r'^(BU\d+)\.csv$', re.IGNORECASE)
+
+
+def _natural_key(label):
+    """Sort 'BU2' before 'BU10'."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', label)]
+
+
+def _join(data_dir, name):
+    return os.path.normpath(os.path.join(data_dir, name))
+
+
+def _from_sources_file(sources_file, data_dir):
+    with open(sources_file) as f:
+        listed = json.load(f)
+    overall = listed.get('overall')
+    return {
+        'overall': _join(data_dir, overall) if overall else None,
+        'bus': {label: _join(data_dir, path) for label, path in listed.get('bus', {}).items()},
+    }
+
+
+def discover_sources(data_dir=DATA_DIR, sources_file=SOURCES_FILE, store_dir=SNAPSHOT_DIR):
+    """
+    Find the dashboard's data files.
+
+    Args:
+        data_dir (str): Directory holding the CSV exports
+        sources_file (str): JSON file listing the exports (default:
+            <data_dir>/sources.json if it exists, else directory discovery)
+        store_dir (str): Snapshot store whose archived exports are included
+
+    Returns:
+        dict: {'overall': path or None, 'bus': {BU label: path}}, BUs in
+            natural order
+    """
+    if sources_file is None:
+        default = os.path.join(data_dir, 'sources.json')
+        sources_file = default if os.path.exists(default) else None
+    if sources_file is not None:
+        return _from_sources_file(sources_file, data_dir)
+
+    names = set(os.listdir(data_dir)) if os.path.isdir(data_dir) else set()
+    # Exports served from the store after their CSV was archived
+    stored = load_manifest(store_dir)['sources']
+    names.update(stored)
+
+    overall = None
+    bus = {}
+    for name in names:
+        match = _BU_FILE.match(name)
+        if match:
+            bus[match.group(1).upper()] = _join(data_dir, name)
+        elif name.lower() == OVERALL_FILE.lower():
+            overall = _join(data_dir, name)
+        elif name in stored and stored[name]['table'] == 'bu':
+            # Workbook sheet with another name, e.g. 'Retail.csv'
+            bus.setdefault(stored[name]['bu'], _join(data_dir, name))
+
+    return {
+        'overall': overall,
+        'bus': {label: bus[label] for label in sorted(bus, key=_natural_key)},
+    }
@@ -3,6 +3,37 @@ import plotly.graph_objects as go
 import streamlit as st
 import pandas as pd
 
+from downsample import downsample_frame
+from figure_cache import cached_figure
+from table_query import column_values, label_columns, page_count, page_rows, select_rows
+
+# Chart builders are memoized with @cached_figure: calling one again with the
+# same data and parameters returns the shared, already built figure, which
+# must not be mutated by the caller.
+
+# Line charts: downsampled points per pixel of chart width, and the number of
+# plotted points above which WebGL traces are used
+POINTS_PER_PIXEL = 1
+WEBGL_POINT_THRESHOLD = 5000
+
+# Columns budget vs expense bars can be grouped by, in order of preference
+CATEGORY_COLUMNS = ('BU', 'Subdiv', 'Category')
+
+# Paginated tables: rows sent per page, and the most distinct values a label
+# column can have to get a filter
+TABLE_PAGE_SIZE = 50
+MAX_FILTER_OPTIONS = 200
+
+# Scorecards of a view: (title, metric, suffix, change unit); values and
+# changes are looked up in the view's metric series (metric_series.py)
+SCORECARDS = [
+    ("Total Budget", 'Budget', "", "%"),
+    ("Total Expense", 'Expense', "", "%"),
+    ("Usage", 'Usage %', "%", " pts"),
+    ("Profit margin", 'Profit margin %', "%", " pts"),
+]
+
+@cached_figure
 def create_donut_chart(budget_data, expense_data):
     """
     Create a donut chart showing budget vs expense.
@@ -58,6 +89,7 @@ def create_donut_chart(budget_data, expense_data):
     
     return fig
 
+@cached_figure
 def create_pie_chart(data, values, names, title):
     """
     Create a pie chart.
@@ -81,29 +113,56 @@ def create_pie_chart(data, values, names, title):
     
     return fig
 
-def create_line_chart(data, x, y, color, title):
+@cached_figure
+def create_line_chart(data, x, y, color, title, width=None, max_points=None,
+                      webgl_threshold=WEBGL_POINT_THRESHOLD):
     """
     Create a line chart.
     
+    Long series can be downsampled server-side with LTTB (see downsample.py),
+    which keeps the visual shape of each line while bounding the payload sent
+    to the browser. Above webgl_threshold plotted points the chart switches to
+    WebGL traces, drawn with straight segments and no markers.
+    
     Args:
         data (pd.DataFrame): DataFrame with data for the chart
         x (str): Column name for x-axis
         y (str): Column name for y-axis
         color (str): Column name for color
         title (str): Chart title
+        width (int): Chart width in pixels; each series is downsampled to
+            POINTS_PER_PIXEL points per pixel (None for no downsampling)
+        max_points (int): Maximum points per series, overrides width
+        webgl_threshold (int): Total plotted points above which WebGL is used
         
     Returns:
         plotly.graph_objects.Figure: The line chart figure
     """
-    fig = px.line(
-        data, 
-        x=x, 
-        y=y, 
-        color=color, 
-        title=title,
-        markers=True,
-        line_shape='spline'
-    )
+    if max_points is None and width is not None:
+        max_points = max(3, int(width * POINTS_PER_PIXEL))
+    if max_points is not None:
+        data = downsample_frame(data, x, y, max_points, group=color)
+    
+    if len(data) > webgl_threshold:
+        # Scattergl supports neither spline shapes nor markers cheaply
+        fig = px.line(
+            data, 
+            x=x, 
+            y=y, 
+            color=color, 
+            title=title,
+            render_mode='webgl'
+        )
+    else:
+        fig = px.line(
+            data, 
+            x=x, 
+            y=y, 
+            color=color, 
+            title=title,
+            markers=True,
+            line_shape='spline'
+        )
     
     fig.update_layout(
         xaxis_title=x.capitalize(),
@@ -112,26 +171,167 @@ def create_line_chart(data, x, y, color, title):
     
     return fig
 
-def create_scorecard(title, value, change, prefix="", suffix=""):
+@cached_figure
+def create_budget_vs_expense_chart(data, category, title, budget='Budget', expense='Expense'):
+    """
+    Create a grouped bar chart comparing budget and expense per category.
+    
+    Args:
+        data (pd.DataFrame): DataFrame with data for the chart
+        category (str): Column name for the bar groups (e.g. 'BU', 'Subdiv')
+        title (str): Chart title
+        budget (str): Column name for budget values
+        expense (str): Column name for expense values
+        
+    Returns:
+        plotly.graph_objects.Figure: The bar chart figure
+    """
+    # Rows with neither figure (e.g. streamed customer rows) get no bars
+    data = data.dropna(subset=[budget, expense], how='all')
+    df_melted = data.melt(id_vars=[category], value_vars=[budget, expense], var_name='Type', value_name='Amount')
+    fig = px.bar(df_melted, x=category, y='Amount', color='Type', barmode='group', title=title)
+    
+    return fig
+
+def category_column(data):
+    """
+    Pick the column to group budget vs expense bars by.
+    
+    Args:
+        data (pd.DataFrame): DataFrame with data for the chart
+        
+    Returns:
+        str: The first of CATEGORY_COLUMNS in data, or None
+    """
+    return next((c for c in CATEGORY_COLUMNS if c in data.columns), None)
+
+def period_figure(data, title):
+    """
+    Build the budget vs expense chart of one period's rows.
+    
+    Args:
+        data (pd.DataFrame): Rows of the period, e.g. a period index entry's 'data'
+        title (str): Chart title
+        
+    Returns:
+        plotly.graph_objects.Figure: The bar chart, or None if the rows
+            cannot be plotted
+    """
+    if data is None or data.empty:
+        return None
+    if any(name is not None for name in data.index.names):
+        data = data.reset_index()
+    category = category_column(data)
+    if category is None or not {'Budget', 'Expense'} <= set(data.columns):
+        return None
+    return create_budget_vs_expense_chart(data, category, title)
+
+def period_chart_title(label, period):
+    """
+    Title of the budget vs expense chart of one period, e.g.
+    'BU1 Budget vs Expense (Jan 2025)'.
+    """
+    return f"{label} Budget vs Expense ({period.strftime('%b %Y')})"
+
+def scorecard_text(value, change, prefix="", suffix="", change_unit="%", compared_to="from last month"):
+    """
+    Format a scorecard's value and delta, as shown by create_scorecard.
+    
+    Returns:
+        tuple: (formatted value, delta text or None for no delta)
+    """
+    formatted_value = f"{prefix}{value:,.0f}{suffix}"
+    if change is not None and not pd.isna(change) and change != 0:
+        return formatted_value, f"{change:+.1f}{change_unit} {compared_to}"
+    return formatted_value, None
+
+def create_scorecard(title, value, change, prefix="", suffix="", change_unit="%",
+                     compared_to="from last month", trend=None):
     """
     Create a scorecard with a metric and delta indicator.
     
     Args:
         title (str): Scorecard title
         value (float): Metric value
-        change (float): Percentage change
+        change (float): Change from the compared value (None or NaN for no delta)
         prefix (str): Prefix for the value (e.g., "$")
         suffix (str): Suffix for the value (e.g., "%")
+        change_unit (str): Unit of the change (e.g., "%", " pts")
+        compared_to (str): What the change is from, as shown in the delta
+        trend (sequence): Recent values, oldest first, drawn as a sparkline
+            (None or fewer than two values for none)
     """
-    formatted_value = f"{prefix}{value:,.0f}{suffix}"
-    
-    if change != 0:
-        delta = f"{change:+.1f}% from last month"
-    else:
-        delta = None
+    formatted_value, delta = scorecard_text(value, change, prefix, suffix, change_unit, compared_to)
     
     st.metric(
         label=title,
         value=formatted_value,
-        delta=delta
+        delta=delta,
+        chart_data=list(trend) if trend is not None and len(trend) > 1 else None
+    )
+
+def create_paginated_table(data, key, page_size=TABLE_PAGE_SIZE):
+    """
+    Show a table one page at a time.
+    
+    The frame stays on the server: search (by BU, subdiv or product), filters
+    and sorting run in table_query.py and only the visible page is sent to
+    the browser.
+    
+    Args:
+        data (pd.DataFrame): Table to show; named index levels can be
+            searched, filtered and sorted like columns
+        key (str): Unique widget key prefix
+        page_size (int): Rows per page
+    """
+    if data is None or data.empty:
+        st.info("No rows to show.")
+        return
+    
+    labels = label_columns(data)
+    sortable = [n for n in data.index.names if n is not None] + list(data.columns)
+    
+    controls = st.columns([3, 2, 1])
+    search = controls[0].text_input(
+        "Search",
+        key=f"{key}_search",
+        placeholder=" / ".join(labels) if labels else "No label columns",
+        disabled=not labels
     )
+    sort_by = controls[1].selectbox("Sort by", [None, *sortable], format_func=lambda c: c or "(file order)",
+                                    key=f"{key}_sort")
+    descending = controls[2].toggle("Descending", key=f"{key}_desc", disabled=sort_by is None)
+    
+    filters = {}
+    filterable = []
+    for name in labels:
+        values = column_values(data, name)
+        options = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else values.dropna().unique()
+        if 1 < len(options) <= MAX_FILTER_OPTIONS:
+            filterable.append((name, list(options)))
+    if filterable:
+        filter_cols = st.columns(len(filterable))
+        for col, (name, options) in zip(filter_cols, filterable):
+            filters[name] = col.multiselect(name, options, key=f"{key}_filter_{name}")
+    
+    positions = select_rows(data, search=search, filters=filters, sort_by=sort_by, ascending=not descending)
+    pages = page_count(len(positions), page_size)
+    
+    # A new query starts from the first page
+    page_key = f"{key}_page"
+    query = (search, sort_by, descending, tuple((name, tuple(values)) for name, values in filters.items()))
+    if st.session_state.get(f"{key}_query") != query or st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = 1
+    st.session_state[f"{key}_query"] = query
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key) if pages > 1 else 1
+    
+    if len(positions) == 0:
+        st.info("No matching rows.")
+        return
+    
+    st.dataframe(page_rows(data, positions, page, page_size))
+    start = (page - 1) * page_size
+    st.caption(
+        f"Rows {start + 1:,}-{min(start + page_size, len(positions)):,} "
+        f"of {len(positions):,} (page {page} of {pages})"
+    )
\ No newline at end of file
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import threading
+
+# ---------------------------
+# Cache configuration
+# ---------------------------
+# Loaded CSV frames and processed dashboard data are cached process-wide, so
+# every session served by the same Streamlit server shares one copy (see
+# shared_store.py). Cache entries are keyed on the fingerprint of the file
+# they were built from, so a new version of a file is never served stale;
+# entries of superseded versions are dropped once no session shows them and
+# they expire or exceed the entry limit, without waiting for the memory
+# budget. Both knobs can be overridden from the environment:
+# - DASHBOARD_CACHE_TTL         : seconds an unused entry is kept (0 = never expires)
+# - DASHBOARD_CACHE_MAX_ENTRIES : maximum number of entries per kind of data
+#                                 (loaded frames, views, artifacts, ...)
+
+CACHE_TTL_SECONDS = int(os.environ.get("DASHBOARD_CACHE_TTL", "3600")) or None
+CACHE_MAX_ENTRIES = int(os.environ.get("DASHBOARD_CACHE_MAX_ENTRIES", "64"))
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+# (path, mtime_ns, size) -> content digest, so an unchanged file is only hashed once
+_digest_memo = {}
+_digest_lock = threading.Lock()
+
+
+def _content_digest(file_path):
+    """
+    Hash the file contents in fixed-size chunks.
+
+    Args:
+        file_path (str): Path of the file to hash
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path):
+    """
+    Build a cache key component identifying the current version of a file.
+
+    The fingerprint combines modification time, size and a content hash.
+    The hash is only recomputed when mtime or size change, so checking an
+    unchanged file on every rerun costs a single stat call.
+
+    Args:
+        file_path (str): Path of the file
+
+    Returns:
+        tuple: (mtime_ns, size, digest), or None if the file does not exist
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    memo_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    with _digest_lock:
+        digest = _digest_memo.get(memo_key)
+    if digest is None:
+        digest = _content_digest(file_path)
+        with _digest_lock:
+            # Drop digests of older versions of the same file
+            for key in [k for k in _digest_memo if k[0] == memo_key[0]]:
+                del _digest_memo[key]
+            _digest_memo[memo_key] = digest
+
+    return (stat.st_mtime_ns, stat.st_size, digest)
@@ -1,193 +1,159 @@
 import pandas as pd
 import numpy as np
-import random
 
-def generate_mock_data():
+# ---------------------------
+# Mock data generation
+# ---------------------------
+# Everything is generated from one seeded NumPy generator, with each table
+# drawn as whole arrays (one allocation per column) rather than row by row,
+# so load-test datasets with hundreds of BUs and years of months build in
+# seconds. The same seed and sizes always produce the same data.
+
+START_MONTH = '2025-01'
+
+def _bu_labels(n_bus):
+    return [f'BU{i + 1}' for i in range(n_bus)]
+
+def _subdiv_labels(n_subdivs):
+    return [f'Subdiv {i + 1}' for i in range(n_subdivs)]
+
+def _product_labels(n_products):
+    return [f'Product {i + 1}' for i in range(n_products)]
+
+def _month_range(n_months, start=START_MONTH):
+    return pd.period_range(start=start, periods=n_months, freq='M')
+
+def _nullable_int(values, mask=None):
+    """Wrap an integer array (and optional missing-value mask) as a nullable Int64 array."""
+    values = np.asarray(values, dtype='int64')
+    if mask is None:
+        mask = np.zeros(values.shape, dtype=bool)
+    return pd.arrays.IntegerArray(values, mask)
+
+def generate_mock_data(n_bus=3, n_subdivs=4, n_products=3, n_months=6, seed=42):
     """
     Generate mock data for the business dashboard.
     In a real application, this would be replaced with actual data loading from the Excel file.
+
+    Args:
+        n_bus (int): Number of business units
+        n_subdivs (int): Number of subdivisions per BU
+        n_products (int): Number of products per BU
+        n_months (int): Number of months in the trend series
+        seed (int): Random seed, for reproducibility
+
+    Returns:
+        dict: Overall KPIs, breakdown tables and a 'bu_data' list with one dict per BU
     """
-    np.random.seed(42)  # For reproducibility
-    
+    rng = np.random.default_rng(seed)
+    bus = _bu_labels(n_bus)
+    months = _month_range(n_months).strftime('%b' if n_months <= 12 else '%b %Y')
+
     # Overall budget and expense data
-    overall_budget = {
-        'BU1': 1_200_000,
-        'BU2': 950_000,
-        'BU3': 1_500_000
-    }
-    
-    overall_expense = {
-        'BU1': 980_000,
-        'BU2': 920_000,
-        'BU3': 1_350_000
-    }
-    
+    budget = rng.integers(9, 16, n_bus) * 100_000
+    expense = np.round(budget * rng.uniform(0.8, 1.0, n_bus), -4).astype('int64')
+    overall_budget = dict(zip(bus, budget.tolist()))
+    overall_expense = dict(zip(bus, expense.tolist()))
+
     # Profit and revenue data
-    overall_profit = 1_400_000
-    overall_profit_change = 12.5
-    overall_revenue = 3_800_000
-    overall_revenue_change = 8.2
-    
+    revenue = np.round(budget * rng.uniform(1.0, 1.3, n_bus), -4).astype('int64')
+    profit = np.round(revenue * rng.uniform(0.3, 0.4, n_bus), -4).astype('int64')
+    overall_profit = int(profit.sum())
+    overall_profit_change = round(float(rng.uniform(5, 15)), 1)
+    overall_revenue = int(revenue.sum())
+    overall_revenue_change = round(float(rng.uniform(3, 10)), 1)
+
     # Profit and revenue breakdown
-    bu_profit_revenue = pd.DataFrame([
-        {'category': 'BU1 Profit', 'value': 420_000},
-        {'category': 'BU2 Profit', 'value': 380_000},
-        {'category': 'BU3 Profit', 'value': 600_000},
-        {'category': 'BU1 Revenue', 'value': 1_150_000},
-        {'category': 'BU2 Revenue', 'value': 950_000},
-        {'category': 'BU3 Revenue', 'value': 1_700_000}
-    ])
-    
+    bu_profit_revenue = pd.DataFrame({
+        'category': [f'{bu} Profit' for bu in bus] + [f'{bu} Revenue' for bu in bus],
+        'value': np.concatenate([profit, revenue])
+    })
+
     # Customer distribution data
-    customer_by_bu = pd.DataFrame([
-        {'bu': 'BU1', 'customers': 1200},
-        {'bu': 'BU2', 'customers': 950},
-        {'bu': 'BU3', 'customers': 1500}
-    ])
-    
-    # Customer satisfaction trend
-    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-    satisfaction_trend = pd.DataFrame()
-    
-    for bu in ['BU1', 'BU2', 'BU3']:
-        base = 75 + np.random.randint(0, 10)
-        trend = base + np.cumsum(np.random.normal(0.5, 1, len(months)))
-        trend = np.clip(trend, 65, 95)
-        
-        for i, month in enumerate(months):
-            satisfaction_trend = pd.concat([
-                satisfaction_trend, 
-                pd.DataFrame({'month': [month], 'bu': [bu], 'satisfaction': [trend[i]]})
-            ])
-    
+    customers = rng.integers(50, 200, (n_bus, n_subdivs, n_products))
+    customer_by_bu = pd.DataFrame({'bu': bus, 'customers': customers.sum(axis=(1, 2))})
+
+    # Customer satisfaction trend, one row per (BU, month)
+    base = 75 + rng.integers(0, 10, (n_bus, 1))
+    trend = np.clip(base + np.cumsum(rng.normal(0.5, 1, (n_bus, n_months)), axis=1), 65, 95)
+    satisfaction_trend = pd.DataFrame({
+        'month': np.tile(months, n_bus),
+        'bu': np.repeat(bus, n_months),
+        'satisfaction': trend.ravel()
+    })
+
+    # Per-subdivision figures for every BU, drawn as (n_bus, n_subdivs) arrays
+    shape = (n_bus, n_subdivs)
+    subdiv_budget = rng.integers(25, 36, shape) * 10_000
+    subdiv_expense = np.round(subdiv_budget * rng.uniform(0.85, 1.0, shape), -4).astype('int64')
+    subdiv_revenue = np.round(subdiv_budget * rng.uniform(0.8, 1.2, shape), -4).astype('int64')
+    subdiv_profit = np.round(subdiv_revenue * rng.uniform(0.3, 0.4, shape), -4).astype('int64')
+    subdiv_profit_change = np.round(rng.uniform(7, 17, shape), 1)
+    subdiv_revenue_change = np.round(rng.uniform(4, 13, shape), 1)
+    subdiv_financial_health = rng.integers(75, 93, shape)
+    subdiv_base = 72 + rng.integers(0, 8, shape + (1,))
+    subdiv_satisfaction = np.clip(
+        np.round(subdiv_base + np.cumsum(rng.uniform(0, 2.5, shape + (n_months,)), axis=2)), 0, 100
+    ).astype('int64')
+    subdiv_target = rng.integers(88, 95, shape)
+    subdiv_realization = subdiv_target - rng.integers(2, 9, shape)
+    subdiv_velocity = np.round(rng.uniform(20, 26, shape), 1)
+    subdiv_quality = rng.integers(84, 94, shape)
+    subdiv_required_emp = rng.integers(10, 21, shape)
+    subdiv_current_emp = subdiv_required_emp - rng.integers(-1, 3, shape)
+    subdiv_competency = np.round(rng.uniform(3.5, 4.3, shape), 1)
+    bu_turnover = np.round(rng.uniform(12, 16, n_bus), 1)
+
     # Target vs realization data
     target_realization = {
-        'BU1': {'target': 95, 'realization': 87},
-        'BU2': {'target': 90, 'realization': 85},
-        'BU3': {'target': 92, 'realization': 90}
+        bu: {'target': int(t), 'realization': int(r)}
+        for bu, t, r in zip(bus, subdiv_target.mean(axis=1).round(), subdiv_realization.mean(axis=1).round())
     }
-    
+
     # Quality and velocity data
-    overall_velocity = 22.5
-    overall_quality = 88.3
-    
+    overall_velocity = round(float(subdiv_velocity.mean()), 1)
+    overall_quality = round(float(subdiv_quality.mean()), 1)
+
     # Manpower data
     manpower = {
-        'current': {'BU1': 48, 'BU2': 52, 'BU3': 67},
-        'required': {'BU1': 50, 'BU2': 55, 'BU3': 70}
+        'current': dict(zip(bus, subdiv_current_emp.sum(axis=1).tolist())),
+        'required': dict(zip(bus, subdiv_required_emp.sum(axis=1).tolist()))
     }
-    
+
     # Competency data
-    competency = {'BU1': 3.8, 'BU2': 4.1, 'BU3': 3.9}
-    
+    competency = dict(zip(bus, subdiv_competency.mean(axis=1).round(1).tolist()))
+
     # Turnover ratio
-    turnover_ratio = 14.5
-    
+    turnover_ratio = round(float(bu_turnover.mean()), 1)
+
     # BU-specific data
-    bu_data = []
-    
-    # BU1 data
-    bu1 = {
-        'subdivs': ['Subdiv A', 'Subdiv B', 'Subdiv C', 'Subdiv D'],
-        'products': ['Product X', 'Product Y', 'Product Z'],
-        'subdiv_budget': [350_000, 280_000, 320_000, 250_000],
-        'subdiv_expense': [320_000, 260_000, 280_000, 220_000],
-        'subdiv_profit': [110_000, 95_000, 125_000, 90_000],
-        'subdiv_profit_change': [11.2, 8.5, 15.4, 7.8],
-        'subdiv_revenue': [320_000, 280_000, 350_000, 200_000],
-        'subdiv_revenue_change': [6.8, 5.5, 12.3, 4.5],
-        'subdiv_financial_health': [85, 90, 78, 82],
-        'subdiv_customers': [
-            [150, 120, 80],  # Subdiv A customers by product
-            [110, 90, 70],   # Subdiv B customers by product
-            [180, 140, 60],  # Subdiv C customers by product
-            [100, 50, 50]    # Subdiv D customers by product
-        ],
-        'subdiv_satisfaction': [
-            [75, 76, 77, 79, 81, 82],  # Subdiv A satisfaction trend
-            [78, 80, 79, 81, 80, 83],  # Subdiv B satisfaction trend
-            [72, 73, 75, 78, 80, 81],  # Subdiv C satisfaction trend
-            [76, 77, 79, 80, 81, 83]   # Subdiv D satisfaction trend
-        ],
-        'subdiv_target': [92, 90, 94, 88],
-        'subdiv_realization': [85, 86, 88, 80],
-        'subdiv_velocity': [21.5, 23.2, 22.8, 20.5],
-        'subdiv_quality': [86, 88, 90, 84],
-        'subdiv_current_emp': [12, 10, 15, 11],
-        'subdiv_required_emp': [13, 12, 15, 10],
-        'subdiv_competency': [3.7, 3.9, 4.0, 3.6],
-        'turnover_ratio': 13.8
-    }
-    bu_data.append(bu1)
-    
-    # BU2 data
-    bu2 = {
-        'subdivs': ['Proker A', 'Proker B', 'Proker C'],
-        'products': ['Service X', 'Service Y', 'Service Z', 'Service W'],
-        'subdiv_budget': [320_000, 280_000, 350_000],
-        'subdiv_expense': [310_000, 260_000, 350_000],
-        'subdiv_profit': [125_000, 120_000, 135_000],
-        'subdiv_profit_change': [10.8, 12.5, 9.4],
-        'subdiv_revenue': [350_000, 320_000, 380_000],
-        'subdiv_revenue_change': [7.8, 8.5, 6.3],
-        'subdiv_financial_health': [80, 88, 75],
-        'subdiv_customers': [
-            [120, 140, 90, 70],  # Proker A customers by product
-            [100, 120, 80, 60],  # Proker B customers by product
-            [90, 80, 70, 50]     # Proker C customers by product
-        ],
-        'subdiv_satisfaction': [
-            [76, 78, 80, 82, 83, 85],  # Proker A satisfaction trend
-            [74, 75, 77, 80, 81, 83],  # Proker B satisfaction trend
-            [77, 78, 80, 82, 84, 86]   # Proker C satisfaction trend
-        ],
-        'subdiv_target': [88, 92, 90],
-        'subdiv_realization': [83, 88, 84],
-        'subdiv_velocity': [20.8, 24.5, 22.0],
-        'subdiv_quality': [85, 90, 88],
-        'subdiv_current_emp': [18, 16, 18],
-        'subdiv_required_emp': [20, 18, 17],
-        'subdiv_competency': [4.0, 4.3, 3.9],
-        'turnover_ratio': 15.2
-    }
-    bu_data.append(bu2)
-    
-    # BU3 data
-    bu3 = {
-        'subdivs': ['Proker X', 'Proker Y', 'Proker Z', 'Proker W', 'Proker V'],
-        'products': ['Product A', 'Product B', 'Product C'],
-        'subdiv_budget': [320_000, 280_000, 350_000, 300_000, 250_000],
-        'subdiv_expense': [290_000, 250_000, 320_000, 280_000, 210_000],
-        'subdiv_profit': [140_000, 120_000, 150_000, 130_000, 110_000],
-        'subdiv_profit_change': [14.2, 10.5, 16.8, 12.3, 9.5],
-        'subdiv_revenue': [380_000, 320_000, 410_000, 350_000, 240_000],
-        'subdiv_revenue_change': [9.8, 7.5, 12.3, 8.6, 6.2],
-        'subdiv_financial_health': [92, 85, 88, 90, 87],
-        'subdiv_customers': [
-            [180, 150, 120],  # Proker X customers by product
-            [160, 140, 100],  # Proker Y customers by product
-            [200, 180, 140],  # Proker Z customers by product
-            [140, 120, 90],   # Proker W customers by product
-            [120, 100, 80]    # Proker V customers by product
-        ],
-        'subdiv_satisfaction': [
-            [78, 80, 82, 84, 85, 86],  # Proker X satisfaction trend
-            [77, 79, 80, 82, 83, 85],  # Proker Y satisfaction trend
-            [80, 82, 83, 85, 87, 88],  # Proker Z satisfaction trend
-            [76, 77, 79, 81, 83, 84],  # Proker W satisfaction trend
-            [75, 76, 78, 80, 82, 84]   # Proker V satisfaction trend
-        ],
-        'subdiv_target': [94, 90, 92, 93, 91],
-        'subdiv_realization': [90, 85, 89, 91, 88],
-        'subdiv_velocity': [25.6, 23.4, 26.0, 24.2, 22.8],
-        'subdiv_quality': [92, 89, 91, 93, 90],
-        'subdiv_current_emp': [14, 12, 15, 13, 13],
-        'subdiv_required_emp': [15, 14, 15, 14, 12],
-        'subdiv_competency': [3.8, 3.7, 4.2, 4.0, 3.9],
-        'turnover_ratio': 12.8
-    }
-    bu_data.append(bu3)
-    
+    subdivs = _subdiv_labels(n_subdivs)
+    products = _product_labels(n_products)
+    bu_data = [
+        {
+            'subdivs': subdivs,
+            'products': products,
+            'subdiv_budget': subdiv_budget[i].tolist(),
+            'subdiv_expense': subdiv_expense[i].tolist(),
+            'subdiv_profit': subdiv_profit[i].tolist(),
+            'subdiv_profit_change': subdiv_profit_change[i].tolist(),
+            'subdiv_revenue': subdiv_revenue[i].tolist(),
+            'subdiv_revenue_change': subdiv_revenue_change[i].tolist(),
+            'subdiv_financial_health': subdiv_financial_health[i].tolist(),
+            'subdiv_customers': customers[i].tolist(),
+            'subdiv_satisfaction': subdiv_satisfaction[i].tolist(),
+            'subdiv_target': subdiv_target[i].tolist(),
+            'subdiv_realization': subdiv_realization[i].tolist(),
+            'subdiv_velocity': subdiv_velocity[i].tolist(),
+            'subdiv_quality': subdiv_quality[i].tolist(),
+            'subdiv_current_emp': subdiv_current_emp[i].tolist(),
+            'subdiv_required_emp': subdiv_required_emp[i].tolist(),
+            'subdiv_competency': subdiv_competency[i].tolist(),
+            'turnover_ratio': float(bu_turnover[i])
+        }
+        for i in range(n_bus)
+    ]
+
     # Return all data in a dictionary
     return {
         'overall_budget': overall_budget,
@@ -207,3 +173,163 @@ def generate_mock_data():
         'turnover_ratio': turnover_ratio,
         'bu_data': bu_data
     }
+
+def generate_overall_frame(n_bus=3, n_months=6, seed=42, start=START_MONTH, with_totals=True):
+    """
+    Generate a typed frame shaped like Overall_BU.csv after schema parsing.
+
+    Rows are ordered month by month, each month's BU rows followed by its
+    'Total <Mon>' summary row, as in the real export.
+
+    Args:
+        n_bus (int): Number of business units
+        n_months (int): Number of months
+        seed (int): Random seed
+        start (str): First month, 'YYYY-MM'
+        with_totals (bool): Append a 'Total <Mon>' row per month
+
+    Returns:
+        pd.DataFrame: Frame with the canonical columns of data_schema.OVERALL_SCHEMA
+    """
+    rng = np.random.default_rng(seed)
+    bus = _bu_labels(n_bus)
+    month_range = _month_range(n_months, start)
+    shape = (n_months, n_bus)
+
+    budget = np.broadcast_to(rng.integers(4, 7, n_bus) * 100, shape)
+    expense = np.round(budget * rng.uniform(0.65, 1.0, shape)).astype('int64')
+    revenue = np.broadcast_to(rng.integers(40, 80, n_bus) * 100, shape)
+    profit = np.round(revenue * rng.uniform(0.3, 0.55, shape)).astype('int64')
+    customers = rng.integers(40, 80, shape)
+    satisfaction = np.round(rng.uniform(4.0, 4.8, shape), 1)
+    target = np.broadcast_to(rng.integers(4, 7, n_bus) * 100, shape)
+    realization = np.round(target * rng.uniform(0.85, 0.98, shape)).astype('int64')
+    velocity = rng.integers(80, 100, shape).astype('float64')
+    quality = rng.integers(80, 100, shape).astype('float64')
+    needed_mp = np.broadcast_to(rng.integers(140, 210, n_bus), shape)
+    current_mp = needed_mp - rng.integers(0, 15, shape)
+    competency = rng.integers(85, 100, shape).astype('float64')
+    turnover = rng.integers(2, 9, shape).astype('float64')
+
+    labels = np.broadcast_to(np.array(bus, dtype=object), shape)
+    amounts = [budget, expense, revenue, profit, customers, target, realization, current_mp, needed_mp]
+    means = [satisfaction, velocity, quality, competency, turnover]
+    if with_totals:
+        # Summary rows: column sums for amounts, rounded means for ratios
+        total_labels = np.array('Total ' + month_range.strftime('%b'), dtype=object)[:, None]
+        labels = np.hstack([labels, total_labels])
+        amounts = [np.hstack([a, a.sum(axis=1, keepdims=True)]) for a in amounts]
+        means = [np.hstack([m, np.round(m.mean(axis=1, keepdims=True), 1)]) for m in means]
+    budget, expense, revenue, profit, customers, target, realization, current_mp, needed_mp = amounts
+    satisfaction, velocity, quality, competency, turnover = means
+    rows_per_month = labels.shape[1]
+
+    return pd.DataFrame({
+        'BU': pd.Categorical(labels.ravel()),
+        'Budget': _nullable_int(budget.ravel()),
+        'Expense': _nullable_int(expense.ravel()),
+        'Usage': np.round(expense / budget * 100).ravel().astype('float32'),
+        'Revenue': _nullable_int(revenue.ravel()),
+        'Profit': _nullable_int(profit.ravel()),
+        '#of customer': _nullable_int(customers.ravel()),
+        'Customer satisfaction': satisfaction.ravel().astype('float32'),
+        'Target': _nullable_int(target.ravel()),
+        'Realization': _nullable_int(realization.ravel()),
+        'Target vs Real': np.round(realization / target * 100).ravel().astype('float32'),
+        'Velocity': velocity.ravel().astype('float32'),
+        'Quality': quality.ravel().astype('float32'),
+        'Current MP': _nullable_int(current_mp.ravel()),
+        'Needed MP': _nullable_int(needed_mp.ravel()),
+        'Competency': competency.ravel().astype('float32'),
+        'Turnover ratio': turnover.ravel().astype('float32'),
+        'Month': month_range.repeat(rows_per_month)
+    })
+
+def generate_bu_frame(n_subdivs=6, n_products=5, n_months=6, seed=42, start=START_MONTH):
+    """
+    Generate a typed long-format frame shaped like BU1.csv after schema parsing.
+
+    Rows come in perspective blocks (Financial, Customer n Service, Quality,
+    Employee), each block ordered month by month, and every row only fills
+    the columns of its own perspective, as in the real export.
+
+    Args:
+        n_subdivs (int): Number of subdivisions
+        n_products (int): Number of products
+        n_months (int): Number of months
+        seed (int): Random seed
+        start (str): First month, 'YYYY-MM'
+
+    Returns:
+        pd.DataFrame: Frame with the canonical columns of data_schema.BU_SCHEMA
+    """
+    rng = np.random.default_rng(seed)
+    month_range = _month_range(n_months, start)
+    n_sub = n_months * n_subdivs
+    n_prod = n_months * n_products
+    n_rows = 3 * n_sub + n_prod
+
+    # Row ranges of each perspective block
+    fin = slice(0, n_sub)
+    cust = slice(n_sub, n_sub + n_prod)
+    qual = slice(n_sub + n_prod, 2 * n_sub + n_prod)
+    emp = slice(2 * n_sub + n_prod, n_rows)
+
+    def int_column(block, values):
+        column = np.zeros(n_rows, dtype='int64')
+        mask = np.ones(n_rows, dtype=bool)
+        column[block] = values
+        mask[block] = False
+        return _nullable_int(column, mask)
+
+    def float_column(block, values):
+        column = np.full(n_rows, np.nan, dtype='float32')
+        column[block] = values
+        return column
+
+    budget = np.full(n_sub, 100)
+    expense = rng.integers(75, 106, n_sub)
+    target = np.full(n_sub, 100)
+    realization = rng.integers(85, 101, n_sub)
+    needed_mp = np.tile(rng.integers(20, 51, n_subdivs), n_months)
+    current_mp = needed_mp - rng.integers(0, 8, n_sub)
+
+    subdiv_codes = np.tile(np.arange(n_subdivs), n_months)
+    sub_codes = np.full(n_rows, -1)
+    for block in (fin, qual, emp):
+        sub_codes[block] = subdiv_codes
+    product_codes = np.full(n_rows, -1)
+    product_codes[cust] = np.tile(np.arange(n_products), n_months)
+
+    perspective_codes = np.repeat(np.arange(4), [n_sub, n_prod, n_sub, n_sub])
+    months = np.concatenate([
+        month_range.repeat(n_subdivs).asi8,
+        month_range.repeat(n_products).asi8,
+        month_range.repeat(n_subdivs).asi8,
+        month_range.repeat(n_subdivs).asi8,
+    ])
+
+    return pd.DataFrame({
+        'Perspective': pd.Categorical.from_codes(
+            perspective_codes, ['Financial', 'Customer n Service', 'Quality', 'Employee']
+        ),
+        'Subdiv': pd.Categorical.from_codes(sub_codes, _subdiv_labels(n_subdivs)),
+        'Budget': int_column(fin, budget),
+        'Expense': int_column(fin, expense),
+        'Usage': float_column(fin, np.round(expense / budget * 100)),
+        'Revenue': int_column(fin, np.tile(rng.integers(10, 15, n_subdivs) * 100, n_months)),
+        'Profit': int_column(fin, np.tile(rng.integers(1, 9, n_subdivs) * 100, n_months)),
+        'Month': pd.PeriodIndex.from_ordinals(months, freq='M'),
+        'Product': pd.Categorical.from_codes(product_codes, _product_labels(n_products)),
+        '#of customer': int_column(cust, rng.integers(4, 15, n_prod)),
+        'Customer satisfaction': float_column(cust, np.round(rng.uniform(3.8, 4.9, n_prod), 1)),
+        'Target': int_column(qual, target),
+        'Realization': int_column(qual, realization),
+        'Target vs Real': float_column(qual, np.round(realization / target * 100)),
+        'Velocity': float_column(qual, rng.integers(74, 121, n_sub)),
+        'Quality': float_column(qual, rng.integers(76, 101, n_sub)),
+        'Current MP': int_column(emp, current_mp),
+        'Needed MP': int_column(emp, needed_mp),
+        'Competency': float_column(emp, rng.integers(75, 101, n_sub)),
+        'Turnover ratio': float_column(emp, rng.integers(2, 11, n_sub)),
+    })
@@ -0,0 +1,283 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import profiling
+from data_schema import OVERALL_SCHEMA, PERSPECTIVES, read_months, read_typed_csv, schema_for_file, split_perspectives
+from kpi_engine import bu_kpis, index_kpis, merge_kpis, overall_kpis, perspective_frame, reconcile
+from metric_series import build_series, update_series
+from period_index import build_period_index
+from snapshot_store import has_fresh_snapshot, list_months_for_file, read_snapshot_for_file
+
+# ---------------------------
+# Data loading and processing core
+# ---------------------------
+# Streamlit-free versions of the dashboard's load and process steps. The
+# dashboard wraps these with caching and st.error / st.warning reporting;
+# command-line tools (benchmarks, batch jobs) call them directly.
+#
+# Several files are loaded on a bounded thread pool (DASHBOARD_LOAD_WORKERS,
+# default: CPU count, at most 8): CSV parsing and Parquet reads spend most of
+# their time outside the GIL, so loading N files takes about as long as the
+# slowest one.
+#
+# Views read only the columns they show (VIEW_COLUMNS) and, with
+# DASHBOARD_HISTORY_MONTHS set, only that many of the latest months of an
+# export served from the snapshot store (default 0: every month); the month
+# picker then offers those months, and changes from earlier ones are shown
+# as missing.
+
+LOAD_WORKERS = int(os.environ.get("DASHBOARD_LOAD_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+HISTORY_MONTHS = int(os.environ.get("DASHBOARD_HISTORY_MONTHS", "0"))
+
+# Canonical columns each view reads, per schema: every Overall_BU column is
+# shown in its month table; BU sheets are split into the perspective tables
+VIEW_COLUMNS = {
+    'overall': [name for name, _ in OVERALL_SCHEMA['columns'].values()],
+    'bu': list(dict.fromkeys(
+        ['Perspective', 'Month']
+        + [key for key, _ in PERSPECTIVES.values()]
+        + [column for _, columns in PERSPECTIVES.values() for column in columns]
+    )),
+}
+
+
+def read_data_file(file_path, months=None, columns=None):
+    """
+    Read a BU export, from the snapshot store when it holds the current
+    version of the file, otherwise by parsing the CSV against its schema.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        months (list): Periods ('YYYY-MM') to read, None for all
+        columns (list): Canonical column names to read, None for all
+
+    Returns:
+        tuple: (pd.DataFrame, list of malformed-value problems)
+    """
+    if has_fresh_snapshot(file_path):
+        return read_snapshot_for_file(file_path, months=months, columns=columns), []
+
+    df, problems = read_typed_csv(file_path, schema_for_file(file_path))
+    if months is not None:
+        df = df[df['Month'].isin(pd.PeriodIndex(months, freq='M'))]
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df, problems
+
+
+def view_columns(file_path):
+    """
+    Canonical columns the view of an export reads (see VIEW_COLUMNS).
+    """
+    return VIEW_COLUMNS[schema_for_file(file_path)['name']]
+
+
+def view_months(file_path, history=HISTORY_MONTHS):
+    """
+    Months the view of an export reads.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        history (int): Number of latest months to read, 0 for all
+
+    Returns:
+        list: 'YYYY-MM' strings, oldest first, or None for all months (no
+            history limit, or an export whose months are only known once
+            its CSV is parsed)
+    """
+    if not history or not has_fresh_snapshot(file_path):
+        return None
+    return [str(period) for period in list_months_for_file(file_path)[-history:]]
+
+
+def export_months(file_path):
+    """
+    Months of an export, without loading its rows: listed from the snapshot
+    store when it holds the current version of the file, otherwise read
+    from the CSV's month column alone.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+
+    Returns:
+        list: Months as pd.Period, oldest first
+    """
+    if has_fresh_snapshot(file_path):
+        return list_months_for_file(file_path)
+    return read_months(file_path, schema_for_file(file_path))
+
+
+def load_files(paths, load=read_data_file, max_workers=LOAD_WORKERS):
+    """
+    Load several files concurrently, isolating per-file failures.
+
+    Args:
+        paths (iterable): Files to load
+        load (callable): Loader called with each path (default: read_data_file)
+        max_workers (int): Upper bound on concurrent loads
+
+    Returns:
+        dict: Path -> (loader result or None, exception or None), in input order
+    """
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+
+    def attempt(path):
+        try:
+            with profiling.stage(f'load {os.path.basename(path)}') as record:
+                result = load(path)
+                if isinstance(result, tuple) and isinstance(result[0], pd.DataFrame):
+                    record['rows'] = len(result[0])
+            return result, None
+        except Exception as e:
+            return None, e
+
+    # Each task runs in a copy of the caller's context, so its stages are
+    # recorded in the caller's profiling run
+    contexts = [contextvars.copy_context() for _ in paths]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(paths)))) as pool:
+        return dict(zip(paths, pool.map(lambda context, path: context.run(attempt, path), contexts, paths)))
+
+
+def process_overall_data(df_overall):
+    """
+    Build the period index of an Overall_BU frame.
+
+    Args:
+        df_overall (pd.DataFrame): Typed Overall_BU frame, or None
+
+    Returns:
+        dict: Period index (see period_index.py)
+    """
+    return build_period_index(df_overall)
+
+
+def process_bu_data(df_bu):
+    """
+    Split a BU frame into perspective tables and index its Financial table.
+
+    Args:
+        df_bu (pd.DataFrame): Typed BU frame, or None
+
+    Returns:
+        tuple: (period index of the Financial table, dict of perspective tables)
+    """
+    tables = split_perspectives(df_bu)
+    return build_period_index(tables.get('Financial')), tables
+
+
+def overall_view(df_overall):
+    """
+    Process an Overall_BU frame into everything its view shows.
+
+    Args:
+        df_overall (pd.DataFrame): Typed Overall_BU frame, or None
+
+    Returns:
+        dict: 'index' (period index), 'kpis' (KPI frame per BU, see
+            kpi_engine.py), 'reconciliation' (KPI mismatches with the
+            export's own totals and percentages) and 'series' (metric
+            series of the KPIs, see metric_series.py); the last three are
+            None without data
+    """
+    view = {'index': process_overall_data(df_overall), 'kpis': None, 'reconciliation': None, 'series': None}
+    if df_overall is not None and not df_overall.empty:
+        view['kpis'] = overall_kpis(df_overall)
+        view['reconciliation'] = reconcile(view['kpis'], df_overall, 'BU')
+        view['series'] = build_series(view['kpis'])
+    return view
+
+
+def bu_view(df_bu):
+    """
+    Process a BU frame into everything its view shows.
+
+    Args:
+        df_bu (pd.DataFrame): Typed BU frame, or None
+
+    Returns:
+        dict: As overall_view, with KPIs per subdiv, plus 'tables' (the
+            perspective tables)
+    """
+    index, tables = process_bu_data(df_bu)
+    kpis = bu_kpis(tables)
+    view = {'index': index, 'tables': tables, 'kpis': kpis, 'reconciliation': None, 'series': build_series(kpis)}
+    if kpis is not None:
+        view['reconciliation'] = reconcile(kpis, perspective_frame(tables), 'Subdiv')
+    return view
+
+
+def index_view(index):
+    """
+    View data of a source whose rows are not at hand (streamed aggregates,
+    SQL totals): the period index, with KPIs over its totals.
+
+    Args:
+        index (dict): Period index (see period_index.py)
+
+    Returns:
+        dict: As overall_view, with ALL_LABEL KPI rows only
+    """
+    kpis = index_kpis(index) if index else None
+    return {'index': index, 'kpis': kpis, 'reconciliation': None, 'series': build_series(kpis)}
+
+
+def _without_months(frame, months, level=False):
+    """Rows of a frame outside the given months ('Month' column or index level)."""
+    if level:
+        return frame[~frame.index.get_level_values('Month').isin(months)]
+    return frame[~frame['Month'].isin(months)]
+
+
+def merge_view(view, update, months):
+    """
+    Replace some months of a view with a view built from all rows of those
+    months, e.g. after rows were appended to the export.
+
+    Args:
+        view (dict): View data from overall_view / bu_view
+        update (dict): View data of the same kind, built from the rows of
+            the given months only
+        months (iterable): Periods the update covers
+
+    Returns:
+        dict: New view data; neither input is modified
+    """
+    months = list(months)
+    merged = dict(view)
+
+    index = {period: entry for period, entry in view['index'].items() if period not in months}
+    index.update(update['index'])
+    merged['index'] = {period: index[period] for period in sorted(index)}
+
+    if view.get('kpis') is None:
+        merged['kpis'] = update.get('kpis')
+    elif update.get('kpis') is None:
+        merged['kpis'] = _without_months(view['kpis'], months, level=True)
+    else:
+        merged['kpis'] = merge_kpis(view['kpis'], update['kpis'])
+    # Only the points of the updated months and those reading them are redone
+    merged['series'] = update_series(view.get('series'), merged['kpis'], months)
+
+    parts = []
+    if view.get('reconciliation') is not None:
+        parts.append(_without_months(view['reconciliation'], months))
+    if update.get('reconciliation') is not None:
+        parts.append(update['reconciliation'])
+    merged['reconciliation'] = pd.concat(parts, ignore_index=True) if parts else None
+
+    if 'tables' in view:
+        tables = {}
+        for name in [*view['tables'], *(t for t in update['tables'] if t not in view['tables'])]:
+            parts = []
+            if name in view['tables']:
+                parts.append(_without_months(view['tables'][name], months, level=True))
+            if name in update['tables']:
+                parts.append(update['tables'][name])
+            tables[name] = pd.concat(parts).sort_index()
+        merged['tables'] = tables
+    return merged
@@ -0,0 +1,350 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------
+# Declared CSV schemas
+# ---------------------------
+# Each schema maps the raw CSV header to (canonical column name, kind).
+# Both exports are normalised to the same canonical names, so downstream code
+# can use 'Budget', 'Expense', 'Month', ... regardless of the source file.
+#
+# Kinds:
+# - 'category' : repeated labels, stored as pandas categoricals
+# - 'int'      : counts and amounts, stored in the smallest nullable integer type
+# - 'float'    : plain decimals, stored as float32
+# - 'percent'  : strings like '91%', stored as float32 percentage points (91.0)
+# - 'month'    : dd/mm/yyyy dates, stored as monthly periods
+
+OVERALL_SCHEMA = {
+    'name': 'overall',
+    'columns': {
+        'BU': ('BU', 'category'),
+        'Budget Finance': ('Budget', 'int'),
+        'Expense Finance': ('Expense', 'int'),
+        'Usage Finance': ('Usage', 'percent'),
+        'Revenue Finance': ('Revenue', 'int'),
+        'Profit Finance': ('Profit', 'int'),
+        '#of customer Customer': ('#of customer', 'int'),
+        'Customer satisfaction Customer': ('Customer satisfaction', 'float'),
+        'Target Quality': ('Target', 'int'),
+        'Realization Quality': ('Realization', 'int'),
+        'Target vs Real Quality': ('Target vs Real', 'percent'),
+        'Velocity Quality': ('Velocity', 'percent'),
+        'Quality': ('Quality', 'percent'),
+        'Current MP Employee': ('Current MP', 'int'),
+        'Needed MP Employee': ('Needed MP', 'int'),
+        'Competency Employee': ('Competency', 'percent'),
+        'Turnover ratio Employee': ('Turnover ratio', 'percent'),
+        'Bulan Quality': ('Month', 'month'),
+    },
+    'required': ['BU', 'Bulan Quality'],
+}
+
+BU_SCHEMA = {
+    'name': 'bu',
+    'columns': {
+        'Perspective': ('Perspective', 'category'),
+        'Subdiv': ('Subdiv', 'category'),
+        'Budget': ('Budget', 'int'),
+        'Expense': ('Expense', 'int'),
+        'Usage': ('Usage', 'percent'),
+        'Revenue': ('Revenue', 'int'),
+        'Profit': ('Profit', 'int'),
+        'Bulan': ('Month', 'month'),
+        'Produk': ('Product', 'category'),
+        '#of customer': ('#of customer', 'int'),
+        'Customer satisfaction': ('Customer satisfaction', 'float'),
+        'Target': ('Target', 'int'),
+        'Realization': ('Realization', 'int'),
+        'Target vs Real': ('Target vs Real', 'percent'),
+        'Velocity': ('Velocity', 'percent'),
+        'Quality': ('Quality', 'percent'),
+        'Current MP': ('Current MP', 'int'),
+        'Needed MP': ('Needed MP', 'int'),
+        'Competency': ('Competency', 'percent'),
+        'Turnover ratio': ('Turnover ratio', 'percent'),
+    },
+    'required': ['Perspective', 'Bulan'],
+}
+
+DATE_FORMAT = '%d/%m/%Y'
+
+_INT_DTYPES = [pd.Int8Dtype(), pd.Int16Dtype(), pd.Int32Dtype(), pd.Int64Dtype()]
+
+
+def schema_for_file(file_path):
+    """
+    Pick the declared schema for a CSV export based on its file name.
+
+    Args:
+        file_path (str): Path of the CSV file
+
+    Returns:
+        dict: OVERALL_SCHEMA for Overall_*.csv files, BU_SCHEMA otherwise
+    """
+    name = os.path.basename(file_path).lower()
+    return OVERALL_SCHEMA if name.startswith('overall') else BU_SCHEMA
+
+
+def _compact_int(values):
+    """Store integral floats in the smallest nullable integer type that fits."""
+    valid = values.dropna()
+    if not valid.empty and not np.all(np.mod(valid.to_numpy(), 1) == 0):
+        return values.astype('float32')
+    lo = valid.min() if not valid.empty else 0
+    hi = valid.max() if not valid.empty else 0
+    for dtype in _INT_DTYPES:
+        info = np.iinfo(dtype.numpy_dtype)
+        if info.min <= lo and hi <= info.max:
+            return values.astype(dtype)
+    return values.astype('float64')
+
+
+def _convert_column(raw, kind):
+    """
+    Convert one raw string column to its declared kind.
+
+    Args:
+        raw (pd.Series): Column as read from the CSV
+        kind (str): Declared kind of the column
+
+    Returns:
+        pd.Series: The typed column; unparseable cells become missing values
+    """
+    if kind == 'category':
+        return raw.astype('category')
+
+    text = raw.astype('string').str.strip()
+    if kind == 'month':
+        dates = pd.to_datetime(text, format=DATE_FORMAT, errors='coerce')
+        return dates.dt.to_period('M')
+    if kind == 'percent':
+        text = text.str.rstrip('%').str.strip()
+
+    numbers = pd.to_numeric(text, errors='coerce').astype('float64')
+    if kind == 'int':
+        return _compact_int(numbers)
+    return numbers.astype('float32')
+
+
+def _check_on_error(on_error):
+    if on_error not in ('report', 'reject', 'raise'):
+        raise ValueError(f"on_error must be 'report', 'reject' or 'raise', got {on_error!r}")
+
+
+def _parser_problems(caught):
+    """Turn captured pandas ParserWarnings (skipped bad lines) into problem dicts."""
+    problems = []
+    for warning in caught:
+        if issubclass(warning.category, pd.errors.ParserWarning):
+            for message in str(warning.message).strip().splitlines():
+                problems.append({'row': None, 'column': None, 'value': None, 'reason': message})
+    return problems
+
+
+def _raw_csv_kwargs(schema):
+    """pd.read_csv arguments reading only the declared columns, as strings."""
+    columns = schema['columns']
+    # Labels are read as strings too: the C parser's internal chunks cannot
+    # merge categoricals when a chunk holds only empty cells for a column
+    return {
+        'encoding': 'utf-8-sig',
+        'usecols': lambda name: name.strip() in columns,
+        'dtype': {raw_name: 'string' for raw_name in columns},
+        'on_bad_lines': 'warn',
+    }
+
+
+def apply_schema(raw, schema, on_error='report', row_offset=0):
+    """
+    Convert a frame of raw export values to the declared schema.
+
+    Args:
+        raw (pd.DataFrame): Frame with the raw header names, as read from the export
+        schema (dict): One of the declared schemas (OVERALL_SCHEMA, BU_SCHEMA)
+        on_error (str): 'report', 'reject' or 'raise' (see read_typed_csv)
+        row_offset (int): Added to reported row numbers, for chunked reads
+
+    Returns:
+        tuple: (pd.DataFrame, list of problem dicts)
+    """
+    _check_on_error(on_error)
+    columns = schema['columns']
+    raw = raw.rename(columns=lambda name: str(name).strip())
+    raw = raw[[name for name in raw.columns if name in columns]]
+
+    missing = [name for name in schema['required'] if name not in raw.columns]
+    if missing:
+        raise ValueError(f"{schema['name']} CSV is missing required column(s): {', '.join(missing)}")
+
+    problems = []
+    typed = {}
+    bad_rows = np.zeros(len(raw), dtype=bool)
+    for raw_name in raw.columns:
+        name, kind = columns[raw_name]
+        column = _convert_column(raw[raw_name], kind)
+
+        failed = column.isna().to_numpy() & raw[raw_name].notna().to_numpy()
+        if kind != 'category':
+            failed &= (raw[raw_name].astype('string').str.strip() != '').fillna(False).to_numpy()
+        if raw_name in schema['required']:
+            failed |= column.isna().to_numpy()
+
+        for row in np.flatnonzero(failed):
+            value = raw[raw_name].iat[row]
+            problems.append({
+                'row': int(row) + row_offset,
+                'column': raw_name,
+                'value': None if pd.isna(value) else str(value),
+                'reason': f"missing required {kind}" if pd.isna(value) else f"not a valid {kind}",
+            })
+        bad_rows |= failed
+        typed[name] = column
+
+    df = pd.DataFrame(typed, index=raw.index)
+
+    if problems and on_error == 'raise':
+        first = problems[0]
+        raise ValueError(f"{len(problems)} malformed value(s) in {schema['name']} CSV, first: {first}")
+    if on_error == 'reject' and bad_rows.any():
+        df = df[~bad_rows].reset_index(drop=True)
+        for name in df.columns:
+            if isinstance(df[name].dtype, pd.CategoricalDtype):
+                df[name] = df[name].cat.remove_unused_categories()
+
+    return df, problems
+
+
+def read_typed_csv(file_path, schema, on_error='report', row_offset=0, **read_kwargs):
+    """
+    Read a CSV export and convert it to the declared schema in a single pass.
+
+    The header BOM is stripped, only declared columns are kept, and every
+    column is renamed to its canonical name and converted to its declared type.
+
+    Args:
+        file_path (str or file-like): CSV file to read
+        schema (dict): One of the declared schemas (OVERALL_SCHEMA, BU_SCHEMA)
+        on_error (str): What to do with malformed rows:
+            'report' keeps the row with the bad cells set to missing,
+            'reject' drops the row, 'raise' raises ValueError
+        row_offset (int): Added to reported row numbers, for reads of rows
+            appended to an export
+        **read_kwargs: Extra keyword arguments passed to pd.read_csv
+
+    Returns:
+        tuple: (pd.DataFrame, list of problem dicts with keys
+            'row', 'column', 'value' and 'reason')
+    """
+    _check_on_error(on_error)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', pd.errors.ParserWarning)
+        raw = pd.read_csv(file_path, **_raw_csv_kwargs(schema), **read_kwargs)
+
+    problems = _parser_problems(caught)
+    df, value_problems = apply_schema(raw, schema, on_error, row_offset)
+    return df, problems + value_problems
+
+
+def iter_typed_csv(file_path, schema, chunksize, on_error='report', **read_kwargs):
+    """
+    Read a CSV export in chunks, converting each chunk to the declared schema.
+
+    Categorical columns are typed per chunk, so their categories can differ
+    between chunks.
+
+    Args:
+        file_path (str or file-like): CSV file to read
+        schema (dict): One of the declared schemas (OVERALL_SCHEMA, BU_SCHEMA)
+        chunksize (int): Rows per chunk
+        on_error (str): 'report', 'reject' or 'raise' (see read_typed_csv)
+        **read_kwargs: Extra keyword arguments passed to pd.read_csv
+
+    Yields:
+        tuple: (pd.DataFrame, list of problem dicts) per chunk
+    """
+    _check_on_error(on_error)
+    row_offset = 0
+    with pd.read_csv(file_path, chunksize=chunksize, **_raw_csv_kwargs(schema), **read_kwargs) as reader:
+        while True:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always', pd.errors.ParserWarning)
+                try:
+                    raw = next(reader)
+                except StopIteration:
+                    return
+            df, problems = apply_schema(raw.reset_index(drop=True), schema, on_error, row_offset)
+            row_offset += len(raw)
+            yield df, _parser_problems(caught) + problems
+
+
+# ---------------------------
+# Perspective tables
+# ---------------------------
+# BU exports are long-format sheets where every perspective shares one wide
+# layout. Each perspective only fills its own columns, keyed by subdiv or
+# product: perspective -> (key column, value columns).
+
+PERSPECTIVES = {
+    'Financial': ('Subdiv', ['Budget', 'Expense', 'Usage', 'Revenue', 'Profit']),
+    'Customer n Service': ('Product', ['#of customer', 'Customer satisfaction']),
+    'Quality': ('Subdiv', ['Target', 'Realization', 'Target vs Real', 'Velocity', 'Quality']),
+    'Employee': ('Subdiv', ['Current MP', 'Needed MP', 'Competency', 'Turnover ratio']),
+}
+
+
+def read_months(file_path, schema):
+    """
+    Read the months of a CSV export, parsing only its month column.
+
+    Args:
+        file_path (str): Path of the CSV file
+        schema (dict): One of the declared schemas
+
+    Returns:
+        list: Distinct months as pd.Period, oldest first; unparseable dates
+            are left out
+    """
+    month_column = next(raw_name for raw_name, (_, kind) in schema['columns'].items() if kind == 'month')
+    raw = pd.read_csv(
+        file_path, encoding='utf-8-sig', usecols=lambda name: name.strip() == month_column,
+        dtype='string', on_bad_lines='skip'
+    )
+    if raw.empty or raw.columns.empty:
+        return []
+    months = _convert_column(raw.iloc[:, 0], 'month').dropna().unique()
+    return sorted(months)
+
+
+def split_perspectives(df):
+    """
+    Split a typed BU frame into dense per-perspective tables.
+
+    Each table keeps only its own value columns and is indexed by
+    (Month, Subdiv) or (Month, Product), sorted for fast period slicing.
+
+    Args:
+        df (pd.DataFrame): Typed frame read with BU_SCHEMA
+
+    Returns:
+        dict: Perspective name -> pd.DataFrame (perspectives without rows are omitted)
+    """
+    tables = {}
+    if df is None or df.empty or 'Perspective' not in df.columns:
+        return tables
+
+    for perspective, positions in df.groupby('Perspective', observed=True).indices.items():
+        if perspective not in PERSPECTIVES:
+            continue
+        key, value_columns = PERSPECTIVES[perspective]
+        if key not in df.columns:
+            continue
+        columns = ['Month', key] + [c for c in value_columns if c in df.columns]
+        table = df.iloc[positions][columns]
+        table = table.assign(**{key: table[key].cat.remove_unused_categories()})
+        tables[perspective] = table.set_index(['Month', key]).sort_index()
+
+    return tables
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------
+# Series downsampling
+# ---------------------------
+# Largest-Triangle-Three-Buckets (LTTB) keeps the points that preserve the
+# visual shape of a line: the first and last points are always kept, the
+# rest of the series is split into equal buckets and from each bucket the
+# point forming the largest triangle with its neighbours is chosen.
+#
+# Series are put in x order first when x has one (numbers, datetimes,
+# periods); labels such as category names are kept in the order given.
+
+
+def numeric_axis(values):
+    """
+    Map x values to floats for downsampling.
+
+    Datetimes and periods map to their integer representation, numbers are
+    used as they are, anything else (e.g. month labels) maps to its position.
+
+    Args:
+        values (pd.Series): x values, in plotting order
+
+    Returns:
+        np.ndarray: float64 x coordinates
+    """
+    if isinstance(values.dtype, pd.PeriodDtype):
+        return values.array.asi8.astype('float64')
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values.astype('int64').to_numpy(dtype='float64')
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype='float64')
+    return np.arange(len(values), dtype='float64')
+
+
+def _ordered_axis(values):
+    """Whether x values have a natural order to sort a series by."""
+    return (
+        isinstance(values.dtype, pd.PeriodDtype)
+        or pd.api.types.is_datetime64_any_dtype(values.dtype)
+        or (pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype))
+    )
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select the positions of the points kept by LTTB.
+
+    Args:
+        x (np.ndarray): x coordinates, sorted ascending
+        y (np.ndarray): y values
+        n_out (int): Number of points to keep (at least 3)
+
+    Returns:
+        np.ndarray: Sorted integer positions of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Mean of every bucket, used as the third triangle vertex for the previous bucket
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        bx, by = x[start:stop], y[start:stop]
+        area = np.abs(
+            (x[previous] - mean_x[bucket]) * (by - y[previous])
+            - (x[previous] - bx) * (mean_y[bucket] - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_frame(data, x, y, max_points, group=None):
+    """
+    Downsample every series of a long-format frame with LTTB.
+
+    Args:
+        data (pd.DataFrame): Long-format data
+        x (str): Column name for x values
+        y (str): Column name for y values
+        max_points (int): Maximum points kept per series
+        group (str): Column identifying the series (None for a single series)
+
+    Returns:
+        pd.DataFrame: The kept rows, each series sorted by x if x is numeric
+            or datetime-like, else in input order
+    """
+    groups = [data] if group is None else [g for _, g in data.groupby(group, sort=False, observed=True)]
+    parts = []
+    for series in groups:
+        if len(series) > max_points:
+            if _ordered_axis(series[x]):
+                series = series.sort_values(x, kind='stable')
+            values = series[y].to_numpy(dtype='float64', na_value=np.nan)
+            keep = np.flatnonzero(~np.isnan(values))
+            positions = lttb_indices(numeric_axis(series[x].iloc[keep]), values[keep], max_points)
+            series = series.iloc[keep[positions]]
+        parts.append(series)
+    return pd.concat(parts) if parts else data
@@ -0,0 +1,178 @@
+import argparse
+import datetime
+import os
+import re
+import time
+
+import pandas as pd
+
+from bu_sources import OVERALL_FILE
+from data_cache import file_fingerprint
+from data_schema import BU_SCHEMA, DATE_FORMAT, OVERALL_SCHEMA, apply_schema
+from snapshot_store import SNAPSHOT_DIR, drop_sources, ingest_frame, load_manifest, record_workbook
+
+try:
+    import openpyxl
+except ImportError:  # optional: only needed to read workbooks directly
+    openpyxl = None
+
+# ---------------------------
+# Workbook ingestion
+# ---------------------------
+# The CSV exports come from one Excel workbook: a sheet with the overall BU
+# table and one sheet per BU. The workbook can be ingested directly instead:
+#
+#   python excel_ingest.py BU_Performance.xlsx
+#
+# or, for the dashboard, by setting DASHBOARD_WORKBOOK. All sheets are read
+# in a single read-only, streaming pass (openpyxl), each is recognised by its
+# header (the columns of OVERALL_SCHEMA or BU_SCHEMA), converted with the
+# same declared schema as the CSVs and written to the snapshot store as the
+# export it stands for: Overall_BU.csv, and <sheet name>.csv per BU sheet.
+# The dashboard then discovers and reads them from the store like archived
+# exports (a CSV of the same name, if present, still takes precedence); a BU
+# sheet not named BU<n> is shown under its sheet name.
+#
+# The store records the workbook's content digest, even when none of its
+# sheets is recognised, so the slow xlsx parse runs once per workbook
+# version; checking an unchanged workbook costs a stat call and a manifest
+# read. Sheets dropped from a newer workbook stop being served.
+#
+# Requires openpyxl.
+
+WORKBOOK = os.environ.get("DASHBOARD_WORKBOOK")
+
+# Sheet names that map to a BU label as is: BU1, BU12, ...
+_BU_SHEET = re.compile(r'^BU\d+$', re.IGNORECASE)
+
+
+def _cell_text(cell):
+    """
+    Cell value as the text a CSV export would hold, so the declared schema
+    converts workbook and CSV data the same way.
+    """
+    value = cell.value
+    if value is None:
+        return None
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, (int, float)) and '%' in (cell.number_format or ''):
+        # Percent-formatted cells store fractions: 0.91 is shown as 91%
+        return f"{value * 100:.10g}%"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _sheet_schema(header):
+    """The declared schema whose required columns a sheet header has, or None."""
+    names = {str(name).strip() for name in header if name is not None}
+    for schema in (OVERALL_SCHEMA, BU_SCHEMA):
+        if all(name in names for name in schema['required']):
+            return schema
+    return None
+
+
+def _source_key(sheet_name, schema):
+    """Export file name a sheet is served as."""
+    if schema is OVERALL_SCHEMA:
+        return OVERALL_FILE
+    name = sheet_name.strip()
+    return f"{name.upper() if _BU_SHEET.match(name) else name}.csv"
+
+
+def read_workbook(file_path):
+    """
+    Read and type every BU sheet of a workbook in one read-only pass.
+
+    Args:
+        file_path (str): .xlsx workbook
+
+    Returns:
+        dict: Export file name -> (typed pd.DataFrame, list of problems),
+            sheets in workbook order; sheets without a known header are skipped
+    """
+    if openpyxl is None:
+        raise ImportError("Reading workbooks requires openpyxl (pip install openpyxl)")
+
+    sheets = {}
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows()
+            header = None
+            for row in rows:
+                values = [cell.value for cell in row]
+                if any(value is not None for value in values):
+                    header = values
+                    break
+            schema = _sheet_schema(header or [])
+            if schema is None:
+                continue
+
+            # Only the declared columns are converted
+            wanted = [
+                (position, str(name).strip()) for position, name in enumerate(header)
+                if name is not None and str(name).strip() in schema['columns']
+            ]
+            records = []
+            for row in rows:
+                texts = [_cell_text(row[position]) if position < len(row) else None for position, _ in wanted]
+                if any(text is not None for text in texts):
+                    records.append(texts)
+            raw = pd.DataFrame(records, columns=[name for _, name in wanted], dtype='string')
+            sheets[_source_key(worksheet.title, schema)] = apply_schema(raw, schema)
+    finally:
+        workbook.close()
+    return sheets
+
+
+def ingest_workbook(file_path=WORKBOOK, store_dir=SNAPSHOT_DIR):
+    """
+    Convert a workbook into the snapshot store, unless the store already
+    holds this version of it.
+
+    Args:
+        file_path (str): .xlsx workbook (None: nothing to do)
+        store_dir (str): Root directory of the store
+
+    Returns:
+        list: Export file names written, empty if the workbook is unchanged
+    """
+    fingerprint = file_fingerprint(file_path) if file_path else None
+    if fingerprint is None:
+        return []
+
+    origin = os.path.basename(file_path)
+    manifest = load_manifest(store_dir)
+    if manifest.get('workbooks', {}).get(origin) == fingerprint[2]:
+        return []
+
+    sheets = read_workbook(file_path)
+    for source_key, (df, problems) in sheets.items():
+        ingest_frame(df, source_key, fingerprint[2], len(problems), store_dir, origin=origin)
+    previous = {key for key, source in manifest['sources'].items() if source.get('origin') == origin}
+    dropped = previous - set(sheets)
+    if dropped:
+        drop_sources(dropped, store_dir)
+    record_workbook(origin, fingerprint[2], store_dir)
+    return list(sheets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a BU performance workbook into the snapshot store.")
+    parser.add_argument("workbook", help=".xlsx workbook with the overall and per-BU sheets")
+    parser.add_argument("--store", default=SNAPSHOT_DIR, help="Store directory (default: %(default)s)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = ingest_workbook(args.workbook, args.store)
+    if not written:
+        print(f"{args.workbook}: unchanged or no BU sheets, nothing written to {args.store}")
+    for source_key in written:
+        print(f"{args.workbook}: sheet stored as {source_key}")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
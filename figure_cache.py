@@ -0,0 +1,216 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+import profiling
+
+# ---------------------------
+# Figure cache
+# ---------------------------
+# Chart builders decorated with @cached_figure return a previously built
+# figure when called again with the same data and parameters. Entries are
+# keyed by a stable hash of the arguments and evicted least-recently-used
+# once either limit is reached.
+#
+# A figure is serialized once, when it is built, and cached with its JSON
+# (entries are sized by its length). The cached figure hands that JSON out
+# instead of walking its traces again: st.plotly_chart (through to_dict),
+# to_json and pio.to_html all reuse it, so an unchanged chart skips both
+# construction and serialization on every rerun.
+#
+# Cached figures are shared between callers and sessions: do not mutate them.
+# Counters are reported with every profiling run (see profiling.py).
+#
+# Limits can be overridden from the environment:
+# - DASHBOARD_FIGURE_CACHE_ENTRIES : maximum number of cached figures
+# - DASHBOARD_FIGURE_CACHE_MB      : maximum total JSON size of the cached figures
+
+FIGURE_CACHE_MAX_ENTRIES = int(os.environ.get("DASHBOARD_FIGURE_CACHE_ENTRIES", "256"))
+FIGURE_CACHE_MAX_MB = float(os.environ.get("DASHBOARD_FIGURE_CACHE_MB", "64"))
+
+
+def _feed(digest, value):
+    """Feed a value into a hash in a type-aware, order-stable way."""
+    if isinstance(value, pd.DataFrame):
+        digest.update(b'DataFrame')
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(repr([str(t) for t in value.dtypes]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(b'Series')
+        digest.update(repr((value.name, str(value.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(b'ndarray')
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b'dict')
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(type(value).__name__.encode())
+        for item in value:
+            _feed(digest, item)
+    else:
+        digest.update(repr(value).encode())
+    digest.update(b'|')
+
+
+class SerializedFigure(go.Figure):
+    """
+    Figure cached with its serialized JSON, which to_dict and to_json return
+    (decoded, or as is) instead of serializing the traces again.
+
+    Args:
+        fig (plotly.graph_objects.Figure): Built figure
+        figure_json (str): fig.to_json()
+    """
+
+    def __init__(self, fig, figure_json):
+        super().__init__(fig)
+        self._figure_json = figure_json
+
+    def to_dict(self):
+        # A fresh dict per call, so callers cannot alter the cached figure
+        return json.loads(self._figure_json)
+
+    def to_json(self, *args, **kwargs):
+        if args or kwargs:
+            return super().to_json(*args, **kwargs)
+        return self._figure_json
+
+
+def figure_key(name, args, kwargs):
+    """
+    Build a stable cache key for a chart builder call.
+
+    Args:
+        name (str): Builder name
+        args (tuple): Positional arguments
+        kwargs (dict): Keyword arguments
+
+    Returns:
+        str: Hex digest identifying the call
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _feed(digest, name)
+    _feed(digest, args)
+    _feed(digest, kwargs)
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """
+    Thread-safe LRU cache of built figures.
+
+    Args:
+        max_entries (int): Maximum number of cached figures
+        max_bytes (int): Maximum total JSON size of the cached figures
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_MAX_ENTRIES, max_bytes=int(FIGURE_CACHE_MAX_MB * 1024 * 1024)):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, build):
+        """
+        Return the cached figure for a key, building and caching it on a miss.
+
+        Args:
+            key (str): Cache key from figure_key
+            build (callable): Zero-argument function building the figure
+
+        Returns:
+            SerializedFigure: The (shared) figure, or None if build returned None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        fig = build()
+        if fig is None:
+            return None
+        figure_json = fig.to_json()
+        fig = SerializedFigure(fig, figure_json)
+        nbytes = len(figure_json)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (fig, nbytes)
+                self._bytes += nbytes
+                self._evict()
+        return fig
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Cache counters for tuning.
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries and bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+    def clear(self):
+        """Drop all cached figures and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+FIGURE_CACHE = FigureCache()
+profiling.register_stats('figure_cache', FIGURE_CACHE.stats)
+
+
+def cached_figure(builder):
+    """
+    Decorator memoizing a chart builder in FIGURE_CACHE.
+
+    Args:
+        builder (callable): Function returning a plotly Figure
+
+    Returns:
+        callable: The memoized builder
+    """
+    name = f"{builder.__module__}.{builder.__qualname__}"
+
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = figure_key(name, args, kwargs)
+        return FIGURE_CACHE.get_or_build(key, lambda: builder(*args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,160 @@
+import hashlib
+import io
+import os
+import threading
+
+from data_loader import bu_view, merge_view, overall_view
+from data_schema import read_typed_csv, schema_for_file
+
+# ---------------------------
+# Incremental ingestion
+# ---------------------------
+# Monthly exports usually change by appending the rows of the newest month.
+# For each export read through here, the number of bytes consumed (up to the
+# last complete line), a checksum of those bytes, the row and problem counts
+# and the months seen are kept; the rows themselves are not. The view data
+# built from those bytes is tagged with the checksum ('ingested'). On the
+# next read, given that view data back:
+#
+# - the consumed bytes are hashed again; if they still match, only the bytes
+#   after them are parsed and, when they fall in months not seen before, the
+#   view data of those months is built and merged into the previous view
+#   data (data_loader.merge_view), so the work scales with the appended rows;
+# - if earlier content changed (or the file shrank), the appended rows add to
+#   a month already seen, or the previous view data is not at hand (e.g. it
+#   was evicted from the shared store), the file is read in full.
+#
+# A full read parses every row, including an unterminated last line; the next
+# read of such a file is a full one again. Only appended bytes are held back
+# up to their last complete line, until the writer finishes it.
+#
+# The checksum of the consumed bytes and the new tail are hashed in one pass
+# over the file, which is far cheaper than parsing it. State is kept per
+# process; the first read of an export is always a full one.
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Absolute path -> ingestion state
+_states = {}
+_lock = threading.Lock()
+
+
+def _read_prefix(f, length):
+    """Hash the first length bytes of an open file in fixed-size chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    remaining = length
+    while remaining:
+        chunk = f.read(min(_HASH_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest, remaining == 0
+
+
+def _build_view(df, overall):
+    return overall_view(df) if overall else bu_view(df)
+
+
+def _full_read(file_path, overall):
+    """
+    Read a whole export. All rows are parsed, including an unterminated last
+    line; the state then is not appendable ('complete' False), since the
+    writer may still extend that line.
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    end = content.rfind(b'\n') + 1
+    header_end = content.find(b'\n') + 1
+    df, problems = read_typed_csv(io.BytesIO(content), schema_for_file(file_path))
+    digest = hashlib.blake2b(content[:end], digest_size=16).hexdigest()
+    state = {
+        'complete': end == len(content),
+        'offset': end,
+        'digest': digest,
+        'header': content[:header_end],
+        'rows': len(df),
+        'problems': len(problems),
+        'months': frozenset(df['Month'].dropna().unique()) if 'Month' in df.columns else frozenset(),
+    }
+    return state, {**_build_view(df, overall), 'ingested': digest}, len(content)
+
+
+def _append(state, previous, file_path, overall):
+    """
+    (new state, view data, bytes parsed) after the rows appended since the
+    state was taken, or None if the file has to be read in full.
+    """
+    with open(file_path, 'rb') as f:
+        digest, complete = _read_prefix(f, state['offset'])
+        if not complete or digest.hexdigest() != state['digest']:
+            return None
+        tail = f.read()
+    end = tail.rfind(b'\n') + 1
+    if end == 0:
+        return state, previous, 0
+
+    digest.update(tail[:end])
+    rows, problems = read_typed_csv(
+        io.BytesIO(state['header'] + tail[:end]), schema_for_file(file_path), row_offset=state['rows']
+    )
+    months = frozenset(rows['Month'].dropna().unique()) if 'Month' in rows.columns else frozenset()
+    if months & state['months']:
+        # The rows of that month are not kept: rebuild it from the whole file
+        return None
+    view = previous
+    if months:
+        view = merge_view(previous, _build_view(rows[rows['Month'].isin(months)], overall), months)
+    new_state = {
+        **state,
+        'offset': state['offset'] + end,
+        'digest': digest.hexdigest(),
+        'rows': state['rows'] + len(rows),
+        'problems': state['problems'] + len(problems),
+        'months': state['months'] | months,
+    }
+    return new_state, {**view, 'ingested': new_state['digest']}, end
+
+
+def ingest(file_path, overall, previous=None):
+    """
+    Build the view data of a CSV export, parsing only the rows appended
+    since the previous call when earlier content is unchanged.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        overall (bool): Whether this is the Overall_BU export
+        previous (dict): View data the previous call returned for this
+            export, if still at hand (None: read the file in full)
+
+    Returns:
+        tuple: (view data as from data_loader.overall_view / bu_view, with
+            'ingested' set, number of malformed values, dict with 'mode'
+            ('full', 'append' or 'unchanged'), 'rows' (rows parsed) and
+            'bytes' (bytes parsed))
+    """
+    key = os.path.abspath(file_path)
+    with _lock:
+        state = _states.get(key)
+
+    result = None
+    if (state is not None and state['overall'] == overall and state['complete']
+            and previous is not None and previous.get('ingested') == state['digest']):
+        result = _append(state, previous, file_path, overall)
+    if result is None:
+        new_state, view, parsed = _full_read(file_path, overall)
+        new_state['overall'] = overall
+        mode, rows = 'full', new_state['rows']
+    else:
+        new_state, view, parsed = result
+        mode, rows = 'append' if parsed else 'unchanged', new_state['rows'] - state['rows']
+
+    with _lock:
+        _states[key] = new_state
+    return view, new_state['problems'], {'mode': mode, 'rows': rows, 'bytes': parsed}
+
+
+def forget(file_path):
+    """Drop the ingestion state of an export, e.g. once it is no longer shown."""
+    with _lock:
+        _states.pop(os.path.abspath(file_path), None)
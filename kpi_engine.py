@@ -0,0 +1,234 @@
+import pandas as pd
+
+from period_index import PERIOD_COLUMN, total_row_mask
+
+# ---------------------------
+# KPI engine
+# ---------------------------
+# Computes every derived metric of a typed table in one vectorized pass:
+# the rows are summed per (Month, entity), a per-month 'All' row is added
+# for the entities together, and then each KPI is a column operation over
+# that whole frame, for all entities and months at once:
+#
+# - 'Usage %'          : Expense / Budget
+# - 'Profit margin %'  : Profit / Revenue
+# - 'Target vs Real %' : Realization / Target
+# - 'Manpower gap'     : Needed MP - Current MP
+# - '<amount> MoM %'   : relative change of each amount from the previous month
+# - '<KPI> MoM change' : change of each KPI above from the previous month
+#
+# The previous month is the calendar month before (period - 1): after a gap
+# in the exports the change is missing rather than taken across the gap.
+#
+# Ratios of the 'All' rows are computed from the summed amounts, not averaged.
+# reconcile() checks the result against what the exports state themselves:
+# the 'Total <Mon>' rows and the precomputed 'Usage' / 'Target vs Real'
+# percentages.
+
+ALL_LABEL = 'All'
+
+AMOUNT_COLUMNS = [
+    'Budget', 'Expense', 'Revenue', 'Profit', '#of customer',
+    'Target', 'Realization', 'Current MP', 'Needed MP',
+]
+
+# KPI -> (numerator, denominator), in percent
+KPI_RATIOS = {
+    'Usage %': ('Expense', 'Budget'),
+    'Profit margin %': ('Profit', 'Revenue'),
+    'Target vs Real %': ('Realization', 'Target'),
+}
+
+# KPI -> (minuend, subtrahend)
+KPI_DIFFERENCES = {
+    'Manpower gap': ('Needed MP', 'Current MP'),
+}
+
+# KPI -> percentage column stored in the exports
+STORED_KPIS = {
+    'Usage %': 'Usage',
+    'Target vs Real %': 'Target vs Real',
+}
+
+# Exported percentages are rounded to whole points
+RECONCILE_TOLERANCE = 0.5
+
+
+def _flat(df):
+    """Typed table with its named index levels as columns."""
+    if any(name is not None for name in df.index.names):
+        return df.reset_index()
+    return df
+
+
+def compute_kpis(df, entity):
+    """
+    Compute the KPI frame of a typed table.
+
+    Args:
+        df (pd.DataFrame): Typed table with 'Month' and the entity as columns
+            or index levels; 'Total <Mon>' summary rows are ignored
+        entity (str): Column the rows belong to, e.g. 'BU' or 'Subdiv'
+
+    Returns:
+        pd.DataFrame: Indexed by (Month, entity), one row per entity and
+            month plus an ALL_LABEL row per month, with the amounts, the KPIs
+            and their month-over-month changes
+    """
+    flat = _flat(df)
+    flat = flat[~total_row_mask(flat, entity).to_numpy()]
+    amounts = [c for c in AMOUNT_COLUMNS if c in flat.columns]
+
+    values = flat[amounts].astype('float64')
+    keys = [flat[PERIOD_COLUMN], flat[entity].astype(str).rename(entity)]
+    per_entity = values.groupby(keys, observed=True, sort=False).sum(min_count=1)
+    per_month = per_entity.groupby(level=PERIOD_COLUMN, sort=False).sum(min_count=1)
+    per_month.index = pd.MultiIndex.from_arrays(
+        [per_month.index, [ALL_LABEL] * len(per_month)], names=[PERIOD_COLUMN, entity]
+    )
+    return _derive(pd.concat([per_entity, per_month]).sort_index(), amounts, entity)
+
+
+def _derive(kpis, amounts, entity):
+    """Add the KPIs and month-over-month changes to summed amounts."""
+    derived = []
+    for name, (numerator, denominator) in KPI_RATIOS.items():
+        if numerator in kpis.columns and denominator in kpis.columns:
+            kpis[name] = kpis[numerator] / kpis[denominator].where(kpis[denominator] != 0) * 100
+            derived.append(name)
+    for name, (minuend, subtrahend) in KPI_DIFFERENCES.items():
+        if minuend in kpis.columns and subtrahend in kpis.columns:
+            kpis[name] = kpis[minuend] - kpis[subtrahend]
+            derived.append(name)
+
+    # Each row is compared with its entity's row of the calendar month before,
+    # which is missing (NaN) when that month is not in the frame
+    months = kpis.index.get_level_values(PERIOD_COLUMN)
+    following = pd.MultiIndex.from_arrays(
+        [months + 1, kpis.index.get_level_values(entity)], names=kpis.index.names
+    )
+    previous = kpis.set_axis(following).reindex(kpis.index)
+    amount_change = (kpis[amounts] / previous[amounts].where(previous[amounts] != 0) - 1) * 100
+    kpi_change = kpis[derived] - previous[derived]
+    return pd.concat([
+        kpis,
+        amount_change.add_suffix(' MoM %'),
+        kpi_change.add_suffix(' MoM change'),
+    ], axis=1)
+
+
+def merge_kpis(kpis, update):
+    """
+    Replace the months of a KPI frame with those of a frame computed from
+    newer rows of the same months.
+
+    The KPIs and month-over-month changes are derived again over the merged
+    amounts, so the change into the first updated month is right.
+
+    Args:
+        kpis (pd.DataFrame): KPI frame from compute_kpis
+        update (pd.DataFrame): KPI frame of the updated months
+
+    Returns:
+        pd.DataFrame: The merged KPI frame
+    """
+    entity = kpis.index.names[1]
+    months = update.index.get_level_values(PERIOD_COLUMN).unique()
+    kept = kpis[~kpis.index.get_level_values(PERIOD_COLUMN).isin(months)]
+    amounts = [c for c in AMOUNT_COLUMNS if c in kpis.columns or c in update.columns]
+    merged = pd.concat([kept.reindex(columns=amounts), update.reindex(columns=amounts)])
+    return _derive(merged.sort_index(), amounts, entity)
+
+
+def perspective_frame(tables, key='Subdiv'):
+    """
+    Join the perspective tables of a BU sheet that share a key into one table.
+
+    Args:
+        tables (dict): Perspective tables from data_schema.split_perspectives
+        key (str): Index level the tables must be keyed by
+
+    Returns:
+        pd.DataFrame: Indexed by (Month, key), or None if no table matches
+    """
+    matching = [table for table in tables.values() if key in table.index.names]
+    if not matching:
+        return None
+    return pd.concat(matching, axis=1)
+
+
+def overall_kpis(df_overall):
+    """KPI frame of an Overall_BU table, per BU."""
+    return compute_kpis(df_overall, 'BU')
+
+
+def bu_kpis(tables):
+    """KPI frame of a BU sheet's perspective tables, per subdiv."""
+    frame = perspective_frame(tables)
+    return None if frame is None else compute_kpis(frame, 'Subdiv')
+
+
+def index_kpis(index):
+    """
+    KPI frame over the totals of a period index, for sources whose rows are
+    not at hand (streamed aggregates, SQL totals).
+
+    Args:
+        index (dict): Period index (see period_index.py)
+
+    Returns:
+        pd.DataFrame: ALL_LABEL rows only, indexed by (Month, 'Entity')
+    """
+    totals = pd.DataFrame([entry['totals'] for entry in index.values()], dtype='float64')
+    totals.index = pd.MultiIndex.from_arrays(
+        [pd.PeriodIndex(list(index), freq='M'), [ALL_LABEL] * len(index)], names=[PERIOD_COLUMN, 'Entity']
+    )
+    amounts = [c for c in AMOUNT_COLUMNS if c in totals.columns]
+    return _derive(totals[amounts], amounts, 'Entity')
+
+
+def reconcile(kpis, df, entity, tolerance=RECONCILE_TOLERANCE):
+    """
+    Compare computed KPIs with the figures stated in the export.
+
+    Checks the ALL_LABEL rows against the exported 'Total <Mon>' rows, and
+    every KPI in STORED_KPIS against the percentage stored in the rows.
+
+    Args:
+        kpis (pd.DataFrame): KPI frame from compute_kpis
+        df (pd.DataFrame): The typed table the KPIs were computed from
+        entity (str): Entity column, as passed to compute_kpis
+        tolerance (float): Largest difference accepted
+
+    Returns:
+        pd.DataFrame: One row per mismatch: Month, entity, KPI, Computed,
+            Reported and Difference
+    """
+    flat = _flat(df)
+    is_total = total_row_mask(flat, entity).to_numpy()
+    stored = {column: name for name, column in STORED_KPIS.items() if column in flat.columns}
+    compared = [c for c in AMOUNT_COLUMNS if c in flat.columns] + list(stored)
+
+    # Exported totals, filed under the ALL_LABEL rows
+    totals = flat[is_total]
+    reported_totals = totals[compared].astype('float64').groupby(totals[PERIOD_COLUMN], observed=True).last()
+    reported_totals.index = pd.MultiIndex.from_arrays(
+        [reported_totals.index, [ALL_LABEL] * len(reported_totals)], names=[PERIOD_COLUMN, entity]
+    )
+    # Percentages stored per row
+    rows = flat[~is_total]
+    reported_rows = rows[list(stored)].astype('float64').groupby(
+        [rows[PERIOD_COLUMN], rows[entity].astype(str).rename(entity)], observed=True
+    ).mean()
+
+    reported = pd.concat([reported_totals, reported_rows]).rename(columns=stored)
+    computed = kpis.reindex(reported.index)[[c for c in reported.columns if c in kpis.columns]]
+    reported = reported[computed.columns]
+
+    comparison = pd.DataFrame({
+        'Computed': computed.stack(future_stack=True),
+        'Reported': reported.stack(future_stack=True),
+    })
+    comparison['Difference'] = comparison['Computed'] - comparison['Reported']
+    mismatches = comparison[comparison['Difference'].abs() > tolerance]
+    return mismatches.rename_axis([PERIOD_COLUMN, entity, 'KPI']).reset_index()
@@ -0,0 +1,176 @@
+from kpi_engine import ALL_LABEL, AMOUNT_COLUMNS, KPI_DIFFERENCES, KPI_RATIOS
+from period_index import PERIOD_COLUMN
+
+# ---------------------------
+# Metric series
+# ---------------------------
+# Keeps, for every metric of a KPI frame (the amounts and the KPIs, see
+# kpi_engine.py) and every entity of it (each BU or subdiv, and the ALL_LABEL
+# rows), the metric's value per month, and precomputes for each of those
+# values a point with:
+# - 'value'     : the value itself
+# - 'MoM'       : change from the previous month
+# - 'YoY'       : change from the same month a year earlier
+# - '3M'        : change from the average of the ROLLING_MONTHS months before
+# - 'sparkline' : the values of the last SPARKLINE_MONTHS months, oldest first
+#
+# Amounts change in percent, KPIs in points, as in the KPI frame. A change is
+# None when the month it compares with has no value.
+#
+# A scorecard is then one dict lookup (series_point). When months are
+# replaced or appended (data_loader.merge_view), update_series reads the new
+# values of those months and recomputes only the points that depend on them:
+# the months themselves and the SPARKLINE_MONTHS / 12 months after.
+#
+# Series are shared between sessions: update_series returns a new series and
+# leaves the one it was given as it was.
+
+SPARKLINE_MONTHS = 12
+ROLLING_MONTHS = 3
+
+# Comparison -> (option label, delta text of a scorecard)
+COMPARISONS = {
+    'MoM': ("Previous month", "from last month"),
+    'YoY': ("Same month last year", "from a year earlier"),
+    '3M': (f"{ROLLING_MONTHS}-month average", f"from the {ROLLING_MONTHS}-month average"),
+}
+
+# Comparison -> months back
+_LAGS = {'MoM': 1, 'YoY': 12}
+
+# Months after a changed month whose points read its value
+_REACH = max(*_LAGS.values(), ROLLING_MONTHS, SPARKLINE_MONTHS - 1)
+
+
+def _metrics(kpis):
+    return [c for c in [*AMOUNT_COLUMNS, *KPI_RATIOS, *KPI_DIFFERENCES] if c in kpis.columns]
+
+
+def _change(metric, value, base):
+    if base is None:
+        return None
+    if metric in AMOUNT_COLUMNS:
+        return (value / base - 1) * 100 if base else None
+    return value - base
+
+
+def _point(values, metric, ordinal):
+    """Point of one month of a metric, from its values by month ordinal."""
+    value = values[ordinal]
+    point = {'value': value}
+    for comparison, lag in _LAGS.items():
+        point[comparison] = _change(metric, value, values.get(ordinal - lag))
+    window = [values.get(ordinal - months) for months in range(1, ROLLING_MONTHS + 1)]
+    point['3M'] = None if None in window else _change(metric, value, sum(window) / ROLLING_MONTHS)
+    point['sparkline'] = tuple(
+        values[month] for month in range(ordinal - SPARKLINE_MONTHS + 1, ordinal + 1) if month in values
+    )
+    return point
+
+
+def _read_values(kpis, months=None):
+    """(label, metric) -> {month ordinal: value} of the values of a KPI frame, NaN left out."""
+    rows = kpis
+    if months is not None:
+        rows = kpis[kpis.index.get_level_values(PERIOD_COLUMN).isin(months)]
+    ordinals = rows.index.get_level_values(PERIOD_COLUMN).asi8.tolist()
+    labels = rows.index.get_level_values(1).astype(str).tolist()
+    values = {}
+    for metric in _metrics(kpis):
+        column = rows[metric].to_numpy(dtype='float64').tolist()
+        for label, ordinal, value in zip(labels, ordinals, column):
+            if value == value:
+                values.setdefault((label, metric), {})[ordinal] = value
+    return values
+
+
+def _labels(kpis):
+    labels = kpis.index.get_level_values(1).astype(str).unique().tolist()
+    return [ALL_LABEL, *(label for label in labels if label != ALL_LABEL)] if ALL_LABEL in labels else labels
+
+
+def build_series(kpis):
+    """
+    Build the metric series of a KPI frame.
+
+    Args:
+        kpis (pd.DataFrame): KPI frame indexed by (Month, entity), as from
+            kpi_engine.compute_kpis or index_kpis (None: no series)
+
+    Returns:
+        dict: 'entity' (name of the entity level), 'labels' (entities,
+            ALL_LABEL first), 'values' ((label, metric) -> {month ordinal:
+            value}) and 'points' ((label, month ordinal) -> {metric: point}),
+            or None without a KPI frame
+    """
+    if kpis is None:
+        return None
+    values = _read_values(kpis)
+    points = {}
+    for (label, metric), by_month in values.items():
+        for ordinal in by_month:
+            points.setdefault((label, ordinal), {})[metric] = _point(by_month, metric, ordinal)
+    return {'entity': kpis.index.names[1], 'labels': _labels(kpis), 'values': values, 'points': points}
+
+
+def update_series(series, kpis, months):
+    """
+    Replace some months of a metric series with their values in a KPI frame,
+    recomputing only the points that depend on them.
+
+    Args:
+        series (dict): Series from build_series (None: build it from kpis)
+        kpis (pd.DataFrame): KPI frame holding the new values of the months
+        months (iterable): Periods that changed
+
+    Returns:
+        dict: New series; the given one is not modified
+    """
+    if series is None or kpis is None:
+        return build_series(kpis)
+    ordinals = {period.ordinal for period in months}
+    fresh = _read_values(kpis, list(months))
+    affected = {ordinal + after for ordinal in ordinals for after in range(_REACH + 1)}
+
+    values = dict(series['values'])
+    points = dict(series['points'])
+    for key in set(values) | set(fresh):
+        old = values.get(key, {})
+        if key not in fresh and ordinals.isdisjoint(old):
+            continue
+        by_month = {ordinal: value for ordinal, value in old.items() if ordinal not in ordinals}
+        by_month.update(fresh.get(key, {}))
+        if by_month:
+            values[key] = by_month
+        else:
+            values.pop(key, None)
+
+        label, metric = key
+        for ordinal in affected & (set(old) | set(by_month)):
+            point = dict(points.get((label, ordinal), {}))
+            if ordinal in by_month:
+                point[metric] = _point(by_month, metric, ordinal)
+            else:
+                point.pop(metric, None)
+            if point:
+                points[(label, ordinal)] = point
+            else:
+                points.pop((label, ordinal), None)
+    return {**series, 'labels': _labels(kpis), 'values': values, 'points': points}
+
+
+def series_point(series, label, period, metric):
+    """
+    Look up the point of one metric, entity and month.
+
+    Args:
+        series (dict): Series from build_series
+        label (str): Entity, or ALL_LABEL
+        period (pd.Period): Month
+        metric (str): KPI frame column, e.g. 'Budget' or 'Usage %'
+
+    Returns:
+        dict: 'value', the changes (see COMPARISONS) and 'sparkline', or
+            None if the metric has no value that month
+    """
+    return series['points'].get((label, period.ordinal), {}).get(metric)
@@ -0,0 +1,95 @@
+import pandas as pd
+
+# ---------------------------
+# Period index
+# ---------------------------
+# A typed frame (see data_schema.py) is grouped by its 'Month' column once.
+# The resulting index maps each monthly period, in chronological order, to:
+# - 'data'           : the rows of that period (summary rows excluded)
+# - 'totals'         : pre-summed SUM_COLUMNS over those rows
+# - 'reported_total' : the exported 'Total <Mon>' row for that period, if any
+# Looking up any month is then a dict lookup instead of a boolean mask scan.
+# Frames indexed by (Month, <key>), such as the perspective tables from
+# data_schema.split_perspectives, are grouped on the 'Month' index level and
+# their slices are keyed by the remaining level.
+
+PERIOD_COLUMN = 'Month'
+
+SUM_COLUMNS = ['Budget', 'Expense', 'Revenue', 'Profit', '#of customer', 'Current MP', 'Needed MP']
+
+TOTAL_ROW_PREFIX = 'Total'
+
+
+def total_row_mask(df, label_column='BU'):
+    """
+    Flag exported summary rows such as 'Total Jan'.
+
+    Args:
+        df (pd.DataFrame): Typed frame
+        label_column (str): Column holding the row label
+
+    Returns:
+        pd.Series: Boolean mask, True for summary rows
+    """
+    if label_column not in df.columns:
+        return pd.Series(False, index=df.index)
+    labels = df[label_column]
+    if isinstance(labels.dtype, pd.CategoricalDtype):
+        categories = labels.cat.categories
+        totals = categories[categories.astype(str).str.startswith(TOTAL_ROW_PREFIX)]
+        return labels.isin(totals)
+    return labels.astype('string').str.startswith(TOTAL_ROW_PREFIX).fillna(False)
+
+
+def build_period_index(df, sum_columns=None, label_column='BU'):
+    """
+    Group a typed frame into a period index in a single pass.
+
+    Args:
+        df (pd.DataFrame): Typed frame with a 'Month' period column or index level
+        sum_columns (list): Columns to pre-sum per period (defaults to SUM_COLUMNS)
+        label_column (str): Column used to recognise 'Total <Mon>' summary rows
+
+    Returns:
+        dict: Period -> {'data', 'totals', 'reported_total'}, in chronological order
+    """
+    index = {}
+    if df is None or df.empty:
+        return index
+    by_level = PERIOD_COLUMN in df.index.names
+    if not by_level and PERIOD_COLUMN not in df.columns:
+        return index
+
+    sum_columns = [c for c in (sum_columns or SUM_COLUMNS) if c in df.columns]
+    is_total = total_row_mask(df, label_column).to_numpy()
+    rows = df[~is_total]
+    total_rows = df[is_total]
+
+    # Compact integer columns are widened so sums cannot overflow
+    widened = rows[sum_columns].astype({
+        col: 'Int64' if pd.api.types.is_integer_dtype(rows[col].dtype) else 'float64'
+        for col in sum_columns
+    })
+
+    def period_keys(frame):
+        if by_level:
+            return frame.index.get_level_values(PERIOD_COLUMN)
+        return frame[PERIOD_COLUMN]
+
+    keys = period_keys(rows)
+    totals = widened.groupby(keys, observed=True, sort=True).sum(min_count=1)
+    reported = {
+        period: frame.iloc[-1]
+        for period, frame in total_rows.groupby(period_keys(total_rows), observed=True)
+    }
+
+    for period, positions in sorted(rows.groupby(keys, observed=True).indices.items()):
+        period_totals = totals.loc[period]
+        frame = rows.iloc[positions]
+        index[period] = {
+            'data': frame.droplevel(PERIOD_COLUMN) if by_level else frame,
+            'totals': {col: period_totals[col] for col in sum_columns},
+            'reported_total': reported.get(period),
+        }
+
+    return index
@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from bu_sources import DATA_DIR, discover_sources
+from dashboard_utils import period_chart_title, period_figure
+from data_cache import file_fingerprint
+from data_loader import bu_view, load_files, overall_view
+from snapshot_store import write_atomic
+
+# ---------------------------
+# Precomputed dashboard artifacts
+# ---------------------------
+# A batch job, run after each data drop, that does the dashboard's work ahead
+# of time: every export is loaded and processed, and for every view and month
+# the KPIs and the budget vs expense figure are built.
+#
+#   python precompute.py                  # exports found in DASHBOARD_DATA_DIR
+#   python precompute.py --out artifacts  # DASHBOARD_ARTIFACT_DIR by default
+#
+# Layout:
+#
+#   <artifacts>/_manifest.json   export -> content digest, view label, artifact
+#   <artifacts>/overall.pkl      view data of Overall_BU.csv
+#   <artifacts>/BU1.pkl          view data of BU1.csv
+#   <artifacts>/kpis.csv         KPIs of every view, entity and month, for other tools
+#
+# View data is what data_loader.overall_view / bu_view return (period index,
+# KPI frame, reconciliation, perspective tables) plus 'figures', which maps
+# each period ('2025-01') to its serialized figure. The dashboard serves a
+# view from its artifact while the export's content digest still matches the
+# manifest, and falls back to loading the export otherwise. An export whose
+# CSV is gone (e.g. archived to the snapshot store) is served from the
+# artifact of the version last precomputed.
+
+ARTIFACT_DIR = os.environ.get("DASHBOARD_ARTIFACT_DIR", "artifacts")
+
+MANIFEST_NAME = "_manifest.json"
+
+
+def load_artifact_manifest(artifact_dir=ARTIFACT_DIR):
+    """
+    Read the artifact manifest.
+
+    Args:
+        artifact_dir (str): Artifact directory
+
+    Returns:
+        dict: Manifest with a 'sources' entry (empty if nothing was precomputed)
+    """
+    try:
+        with open(os.path.join(artifact_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'sources': {}}
+
+
+def artifact_fingerprint(artifact_dir=ARTIFACT_DIR):
+    """
+    Fingerprint of the artifact manifest, which changes on every precompute.
+
+    Returns:
+        tuple: Fingerprint from data_cache.file_fingerprint, or None
+    """
+    return file_fingerprint(os.path.join(artifact_dir, MANIFEST_NAME))
+
+
+def period_figures(index, label):
+    """
+    Build and serialize the budget vs expense figure of every period.
+
+    Args:
+        index (dict): Period index
+        label (str): View label used in the chart titles
+
+    Returns:
+        dict: 'YYYY-MM' -> figure JSON, for the periods that can be plotted
+    """
+    figures = {}
+    for period, entry in index.items():
+        fig = period_figure(entry['data'], period_chart_title(label, period))
+        if fig is not None:
+            figures[str(period)] = fig.to_json()
+    return figures
+
+
+def _write_pickle(path, payload):
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    write_atomic(path, write)
+
+
+def precompute(sources, artifact_dir=ARTIFACT_DIR):
+    """
+    Load, process and chart every export, and write the artifacts.
+
+    Args:
+        sources (dict): {'overall': path or None, 'bus': {label: path}}, as
+            returned by bu_sources.discover_sources
+        artifact_dir (str): Output directory
+
+    Returns:
+        dict: Export path -> error message for the exports that failed
+    """
+    views = {}
+    if sources['overall']:
+        views[sources['overall']] = ('overall', 'Overall BU')
+    for label, path in sources['bus'].items():
+        views[path] = (label, label)
+
+    # Digests are taken before loading, so an export replaced meanwhile is
+    # recorded as stale rather than fresh
+    digests = {path: file_fingerprint(path) for path in views}
+    loaded = load_files(views)
+
+    manifest = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'sources': {}}
+    kpi_frames = []
+    errors = {}
+    for path, (name, label) in views.items():
+        result, error = loaded[path]
+        if error is not None:
+            errors[path] = str(error)
+            continue
+        df, problems = result
+        payload = overall_view(df) if path == sources['overall'] else bu_view(df)
+        payload['figures'] = period_figures(payload['index'], label)
+
+        artifact = f"{name}.pkl"
+        _write_pickle(os.path.join(artifact_dir, artifact), payload)
+        if payload['kpis'] is not None:
+            kpi_frames.append(payload['kpis'].reset_index().assign(View=label))
+        manifest['sources'][os.path.basename(path)] = {
+            'view': label,
+            'artifact': artifact,
+            'digest': digests[path][2] if digests[path] else None,
+            'problems': len(problems),
+            'periods': len(payload['index']),
+        }
+
+    if kpi_frames:
+        kpis = pd.concat(kpi_frames, ignore_index=True)
+        write_atomic(os.path.join(artifact_dir, 'kpis.csv'), lambda tmp_path: kpis.to_csv(tmp_path, index=False))
+
+    # The manifest goes last: readers only see artifacts that are complete
+    def write_manifest(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    write_atomic(os.path.join(artifact_dir, MANIFEST_NAME), write_manifest)
+    return errors
+
+
+def load_artifact(file_path, artifact_dir=ARTIFACT_DIR):
+    """
+    Load the precomputed artifact of an export, if it is still current.
+
+    A missing CSV counts as current when it was precomputed before.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        artifact_dir (str): Artifact directory
+
+    Returns:
+        dict: View data (see data_loader.overall_view / bu_view) with
+            'figures', or None if there is no artifact for the current file
+            contents
+    """
+    source = load_artifact_manifest(artifact_dir)['sources'].get(os.path.basename(file_path))
+    if source is None:
+        return None
+    fingerprint = file_fingerprint(file_path)
+    if fingerprint is not None and fingerprint[2] != source['digest']:
+        return None
+    try:
+        with open(os.path.join(artifact_dir, source['artifact']), 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute dashboard KPIs and figures for every BU and month.")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory with the CSV exports (default: %(default)s)")
+    parser.add_argument("--sources", help="JSON file listing the exports (see bu_sources.py)")
+    parser.add_argument("--out", default=ARTIFACT_DIR, help="Artifact directory (default: %(default)s)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sources = discover_sources(args.data_dir, args.sources)
+    errors = precompute(sources, args.out)
+    manifest = load_artifact_manifest(args.out)
+    for name, source in manifest['sources'].items():
+        print(f"{name}: {source['periods']} month(s) -> {source['artifact']}")
+    for path, message in errors.items():
+        print(f"{path}: FAILED: {message}")
+    print(f"Artifacts written to {args.out} in {time.perf_counter() - start:.1f}s")
+    if errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
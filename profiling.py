@@ -0,0 +1,238 @@
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import deque
+
+# ---------------------------
+# Stage profiling
+# ---------------------------
+# Stages of a dashboard rerun (file reads, processing, figure building,
+# table serialization) are wrapped in stage() blocks:
+#
+#   with profiling.run('rerun'):
+#       with profiling.stage('load BU1.csv') as record:
+#           df = load(...)
+#           record['rows'] = len(df)
+#
+# Inside a run, every stage records its wall time, rows processed and the
+# change in process RSS. Outside a run stage() is a shared no-op, so the
+# instrumentation costs one context variable lookup when profiling is off.
+# The active run is a context variable, so concurrent sessions each record
+# their own stages; data_loader.load_files carries it into worker threads.
+#
+# Finished runs are kept in memory (the last PROFILE_HISTORY of the process)
+# and, when DASHBOARD_PROFILE_LOG is set, appended to that file as JSON
+# lines, one stage per line, for offline analysis. A run can also be kept in
+# a caller's own history, such as the dashboard's per-session one, so a
+# session only sees its own runs. DASHBOARD_PROFILE=1 turns the
+# dashboard's profiling and performance panel on for every session.
+#
+# Caches report their counters (size, hit rate, ...) through register_stats();
+# every finished run records a snapshot of them under 'stats'.
+
+PROFILE_ENABLED = os.environ.get("DASHBOARD_PROFILE", "") not in ("", "0")
+PROFILE_LOG = os.environ.get("DASHBOARD_PROFILE_LOG")
+PROFILE_HISTORY = int(os.environ.get("DASHBOARD_PROFILE_HISTORY", "20"))
+
+_current_run = contextvars.ContextVar('profiling_run', default=None)
+_run_ids = itertools.count(1)
+_history = deque(maxlen=PROFILE_HISTORY)
+_lock = threading.Lock()
+_stats_sources = {}
+
+
+def rss_bytes():
+    """Current resident set size of the process, in bytes."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Not Linux: fall back to the lifetime peak
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class _NullStage:
+    """Stage used outside a run: records nothing."""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, run, name, rows):
+        self.run = run
+        self.record = {'stage': name, 'rows': rows}
+
+    def __enter__(self):
+        self._rss = rss_bytes()
+        self._start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, exc_type, *exc):
+        end = time.perf_counter()
+        self.record.update({
+            'offset_s': self._start - self.run['_t0'],
+            'seconds': end - self._start,
+            'mem_delta_mb': (rss_bytes() - self._rss) / 2**20,
+            'thread': threading.current_thread().name,
+            'error': exc_type.__name__ if exc_type is not None else None,
+        })
+        self.run['stages'].append(self.record)
+        return False
+
+
+def stage(name, rows=None):
+    """
+    Time a block as one stage of the current run.
+
+    Args:
+        name (str): Stage name
+        rows (int): Rows processed, if known up front; can also be set on
+            the yielded record
+
+    Returns:
+        Context manager yielding the stage's record dict
+    """
+    run = _current_run.get()
+    if run is None:
+        return _NULL_STAGE
+    return _Stage(run, name, rows)
+
+
+def register_stats(name, stats):
+    """
+    Report a component's counters with every run.
+
+    Args:
+        name (str): Component name, e.g. 'figure_cache'
+        stats (callable): Zero-argument function returning a JSON-serializable dict
+    """
+    with _lock:
+        _stats_sources[name] = stats
+
+
+def current_stats():
+    """
+    Snapshot of the counters of every registered component.
+
+    Returns:
+        dict: Component name -> counters
+    """
+    with _lock:
+        sources = dict(_stats_sources)
+    return {name: stats() for name, stats in sources.items()}
+
+
+def new_history():
+    """
+    Empty history of the last PROFILE_HISTORY runs, for run(history=...).
+
+    Returns:
+        collections.deque: Bounded run history
+    """
+    return deque(maxlen=PROFILE_HISTORY)
+
+
+@contextlib.contextmanager
+def run(name, enabled=True, history=None):
+    """
+    Record the stages executed inside the block as one run.
+
+    Args:
+        name (str): Run name, e.g. 'rerun'
+        enabled (bool): Record nothing when False
+        history (collections.deque): Also keep the finished run here, e.g. a
+            session's own history from new_history()
+
+    Yields:
+        dict: The run ({'run', 'name', 'started', 'seconds', 'stages',
+            'stats'}), or
+            None when disabled or nested in another run, which then absorbs
+            the stages
+    """
+    if not enabled or _current_run.get() is not None:
+        yield None
+        return
+
+    record = {'run': next(_run_ids), 'name': name, 'started': time.time(), 'stages': []}
+    record['_t0'] = time.perf_counter()
+    token = _current_run.set(record)
+    try:
+        yield record
+    finally:
+        _current_run.reset(token)
+        record['seconds'] = time.perf_counter() - record['_t0']
+        record['stats'] = current_stats()
+        with _lock:
+            _history.append(record)
+            if history is not None:
+                history.append(record)
+        if PROFILE_LOG:
+            export_jsonl(PROFILE_LOG, [record])
+
+
+def recent_runs(history=None):
+    """
+    Return the finished runs kept in memory, oldest first.
+
+    Args:
+        history (collections.deque): Caller's own history (default: the
+            runs of every caller in the process)
+
+    Returns:
+        list: Run dicts
+    """
+    with _lock:
+        return list(_history if history is None else history)
+
+
+def to_jsonl(runs):
+    """
+    Serialize runs as JSON lines, one stage per line tagged with its run,
+    then one line with the run's registered counters ('stats').
+
+    Args:
+        runs (list): Run dicts
+
+    Returns:
+        str: JSON-lines text
+    """
+    lines = []
+    for record in runs:
+        tag = {
+            'run': record['run'],
+            'run_name': record['name'],
+            'run_started': record['started'],
+            'run_seconds': record['seconds'],
+        }
+        for entry in record['stages']:
+            lines.append(json.dumps({**tag, **entry}))
+        if record.get('stats'):
+            lines.append(json.dumps({**tag, 'stats': record['stats']}))
+    return ''.join(line + '\n' for line in lines)
+
+
+def export_jsonl(file_path, runs=None):
+    """
+    Append runs to a JSON-lines file.
+
+    Args:
+        file_path (str): Output file
+        runs (list): Run dicts (default: all runs kept in memory)
+    """
+    text = to_jsonl(recent_runs() if runs is None else runs)
+    with _lock, open(file_path, 'a') as f:
+        f.write(text)
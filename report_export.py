@@ -0,0 +1,313 @@
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from background_refresh import build_view
+from bu_sources import DATA_DIR, discover_sources
+from dashboard_utils import SCORECARDS, create_line_chart, period_chart_title, period_figure, scorecard_text
+from data_loader import export_months
+from kpi_engine import ALL_LABEL, index_kpis
+from metric_series import COMPARISONS, build_series, series_point
+from snapshot_store import write_atomic
+
+# ---------------------------
+# Static HTML report pack
+# ---------------------------
+# Renders the Overall view and every BU view for one month into static HTML
+# pages, without a browser or a Streamlit server:
+#
+#   python report_export.py --out reports                 # latest month
+#   python report_export.py --out reports --month 2025-01 --workers 8
+#   python report_export.py --out reports --shared-plotly   # one plotly.js file
+#
+# Each page has the month's scorecards (with the change from the previous
+# month, the same month a year earlier and the 3-month average), the budget
+# vs expense chart (the precomputed one when precompute.py has run), the
+# Budget / Expense trend over all months, the month's rows and, for BU pages,
+# its other perspective tables. Views are loaded the way the dashboard loads them (see
+# background_refresh.build_view) and charted with the dashboard_utils
+# builders.
+#
+# Pages are built on a process pool, one page per task. By default every
+# page is self-contained: plotly.js is embedded once in its <head> and shared
+# by all of its charts, so a page can be mailed or opened on its own, without
+# the rest of the pack or network access. With --shared-plotly, plotly.js is
+# written once to PLOTLY_FILE_NAME in the output directory and every page
+# loads it from there, which keeps a large pack several MB per page smaller
+# but only works with the pages kept next to that file. index.html links
+# every page.
+#
+# Without --month, the latest month is taken from the Overall_BU export's
+# month column (or the store's listing of its months), not from a full load.
+
+PLOTLY_FILE_NAME = "plotly.min.js"
+
+_plotly_js = None
+
+
+def _plotly_script():
+    """Inline <script> with plotly.js, read once per process."""
+    global _plotly_js
+    if _plotly_js is None:
+        _plotly_js = f"<script type=\"text/javascript\">{get_plotlyjs()}</script>"
+    return _plotly_js
+
+_STYLE = """
+body { background-color: #f0f2f6; font-family: sans-serif; margin: 1rem 2rem; }
+.section { background: white; border-radius: 8px; box-shadow: 0 0 10px rgb(0 0 0 / 0.1); padding: 1rem; margin-bottom: 1rem; }
+.cards { display: flex; gap: 1rem; }
+.card { background: white; border-radius: 8px; box-shadow: 0 0 10px rgb(0 0 0 / 0.1); padding: 0.75rem 1rem; flex: 1; }
+.card .value { font-size: 1.8rem; }
+.card .delta { color: #555; font-size: 0.9rem; }
+table { border-collapse: collapse; font-size: 0.85rem; }
+th, td { border-bottom: 1px solid #ddd; padding: 0.25rem 0.5rem; text-align: right; }
+"""
+
+
+def _page(title, body, plotly=True, plotly_src=None):
+    """
+    Full HTML page. With plotly, plotly.js is embedded, or loaded from
+    plotly_src (a path relative to the page) if given.
+    """
+    if not plotly:
+        script = ""
+    elif plotly_src is not None:
+        script = f"<script type=\"text/javascript\" src=\"{html.escape(plotly_src)}\"></script>\n"
+    else:
+        script = f"{_plotly_script()}\n"
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{html.escape(title)}</title>\n"
+        + script
+        + f"<style>{_STYLE}</style>\n</head>\n<body>\n{body}\n</body>\n</html>\n"
+    )
+
+
+def _section(heading, content):
+    return f"<div class=\"section\"><h2>{html.escape(heading)}</h2>\n{content}\n</div>"
+
+
+def _figure_html(fig):
+    return pio.to_html(fig, full_html=False, include_plotlyjs=False)
+
+
+def _table_html(df):
+    if any(name is not None for name in df.index.names):
+        df = df.reset_index()
+    return df.to_html(index=False, na_rep="", float_format=lambda v: f"{v:,.1f}", border=0)
+
+
+def _scorecard_texts(series, period):
+    """
+    Title -> (value, delta texts) of the month's ALL_LABEL scorecards, one
+    delta per comparison, from the metric series.
+    """
+    texts = {}
+    for title, metric, suffix, unit in SCORECARDS:
+        point = series_point(series, ALL_LABEL, period, metric)
+        if point is None:
+            continue
+        deltas = [
+            scorecard_text(point['value'], point[comparison], suffix=suffix, change_unit=unit,
+                           compared_to=compared_to)
+            for comparison, (_, compared_to) in COMPARISONS.items()
+        ]
+        texts[title] = (deltas[0][0], [delta for _, delta in deltas if delta is not None])
+    return texts
+
+
+def _scorecards_html(texts):
+    cards = []
+    for title, (value, deltas) in texts.items():
+        cards.append(
+            f"<div class=\"card\"><div>{html.escape(title)}</div><div class=\"value\">{html.escape(value)}</div>"
+            f"<div class=\"delta\">{'<br>'.join(html.escape(delta) for delta in deltas)}</div></div>"
+        )
+    return f"<div class=\"cards\">{''.join(cards)}</div>"
+
+
+def _trend_figure(summary, label):
+    """Budget and expense of every month, as a line chart."""
+    columns = [c for c in ('Budget', 'Expense') if c in summary.columns]
+    if not columns or summary.empty:
+        return None
+    trend = summary[columns].copy()
+    trend.index = trend.index.to_timestamp()
+    trend = trend.rename_axis('Month').reset_index().melt(id_vars='Month', var_name='Type', value_name='Amount')
+    return create_line_chart(trend, 'Month', 'Amount', 'Type', f"{label} Budget vs Expense trend")
+
+
+def render_page(job):
+    """
+    Load one view and write its page. Runs in a worker process.
+
+    Args:
+        job (dict): 'label', 'path', 'overall', 'month' ('YYYY-MM'),
+            'out_dir', 'file_name' and 'plotly_src' (None to embed plotly.js)
+
+    Returns:
+        dict: 'label', 'file_name', 'seconds' and 'summary' (the month's
+            scorecard texts), or 'error' if the view could not be rendered
+    """
+    start = time.perf_counter()
+    label = job['label']
+    try:
+        view = build_view(job['path'], job['overall'])
+        index = view['index']
+        kpis = view.get('kpis')
+        if kpis is None and index:
+            kpis = index_kpis(index)
+        summary = kpis.xs(ALL_LABEL, level=1) if kpis is not None else pd.DataFrame()
+        series = view.get('series') or build_series(kpis)
+        period = pd.Period(job['month'], 'M')
+        texts = _scorecard_texts(series, period) if series is not None else {}
+        month_label = period.strftime('%B %Y')
+
+        parts = [f"<h1>{html.escape(label)} Performance &mdash; {month_label}</h1>", "<p><a href=\"index.html\">All pages</a></p>"]
+        if period in index:
+            parts.append(_scorecards_html(texts))
+            reconciliation = view.get('reconciliation')
+            if reconciliation is not None and not reconciliation.empty:
+                mismatches = reconciliation[reconciliation['Month'] == period]
+                if not mismatches.empty:
+                    parts.append(_section(
+                        f"{len(mismatches)} figure(s) differ from the export's own totals", _table_html(mismatches)
+                    ))
+
+            entry = index[period]
+            figure_json = (view.get('figures') or {}).get(str(period))
+            fig = pio.from_json(figure_json) if figure_json is not None else period_figure(
+                entry['data'], period_chart_title(label, period))
+            if fig is not None:
+                parts.append(_section("Budget vs Expense", _figure_html(fig)))
+            trend = _trend_figure(summary, label)
+            if trend is not None:
+                parts.append(_section("Trend", _figure_html(trend)))
+            parts.append(_section(f"{month_label} Data", _table_html(entry['data'])))
+
+            for perspective, table in (view.get('tables') or {}).items():
+                if perspective == 'Financial' or period not in table.index.get_level_values('Month'):
+                    continue
+                parts.append(_section(perspective, _table_html(table.xs(period, level='Month'))))
+        else:
+            parts.append(f"<p>No {html.escape(label)} data for {month_label}.</p>")
+
+        page = _page(f"{label} Performance {month_label}", "\n".join(parts), plotly_src=job.get('plotly_src'))
+        write_atomic(os.path.join(job['out_dir'], job['file_name']), lambda tmp_path: _write_text(tmp_path, page))
+
+        return {'label': label, 'file_name': job['file_name'], 'seconds': time.perf_counter() - start,
+                'summary': {title: value for title, (value, _) in texts.items()}}
+    except Exception as e:
+        return {'label': label, 'file_name': None, 'seconds': time.perf_counter() - start, 'error': str(e)}
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _index_page(results, month):
+    month_label = pd.Period(month, 'M').strftime('%B %Y')
+    titles = [title for title, *_ in SCORECARDS]
+    rows = []
+    for result in results:
+        if 'error' in result:
+            cells = f"<td colspan=\"{len(titles)}\">Failed: {html.escape(result['error'])}</td>"
+            name = html.escape(result['label'])
+        else:
+            cells = ''.join(f"<td>{html.escape(result['summary'].get(title, ''))}</td>" for title in titles)
+            name = f"<a href=\"{html.escape(result['file_name'])}\">{html.escape(result['label'])}</a>"
+        rows.append(f"<tr><td style=\"text-align: left\">{name}</td>{cells}</tr>")
+    header = ''.join(f"<th>{html.escape(title)}</th>" for title in titles)
+    body = (
+        f"<h1>BU Performance &mdash; {month_label}</h1>\n"
+        f"<div class=\"section\"><table><tr><th></th>{header}</tr>\n" + "\n".join(rows) + "</table></div>"
+    )
+    return _page(f"BU Performance {month_label}", body, plotly=False)
+
+
+def _latest_month(sources):
+    """
+    Latest month of the Overall_BU export (or the first BU export), read
+    from its month column only.
+    """
+    path = sources['overall'] or next(iter(sources['bus'].values()), None)
+    if path is None:
+        return None
+    months = export_months(path)
+    return str(months[-1]) if months else None
+
+
+def export_reports(sources, out_dir, month=None, max_workers=None, shared_plotly=False):
+    """
+    Render the Overall page and every BU page of a month to static HTML.
+
+    Args:
+        sources (dict): {'overall': path or None, 'bus': {label: path}}, as
+            returned by bu_sources.discover_sources
+        out_dir (str): Output directory
+        month (str): 'YYYY-MM' (default: the latest month of the exports)
+        max_workers (int): Worker processes (default: CPU count)
+        shared_plotly (bool): Write plotly.js once to PLOTLY_FILE_NAME in
+            out_dir and load it from there, instead of embedding it in
+            every page
+
+    Returns:
+        list: render_page results, Overall first, then BUs in source order
+    """
+    month = month or _latest_month(sources)
+    if month is None:
+        raise ValueError("No data to report on")
+
+    os.makedirs(out_dir, exist_ok=True)
+    plotly_src = None
+    if shared_plotly:
+        plotly_src = PLOTLY_FILE_NAME
+        write_atomic(os.path.join(out_dir, PLOTLY_FILE_NAME), lambda tmp_path: _write_text(tmp_path, get_plotlyjs()))
+
+    jobs = []
+    if sources['overall']:
+        jobs.append({'label': "Overall BU", 'path': sources['overall'], 'overall': True, 'file_name': "overall.html"})
+    for label, path in sources['bus'].items():
+        jobs.append({'label': label, 'path': path, 'overall': False, 'file_name': f"{label}.html"})
+    for job in jobs:
+        job.update(month=month, out_dir=out_dir, plotly_src=plotly_src)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(render_page, jobs))
+
+    page = _index_page(results, month)
+    write_atomic(os.path.join(out_dir, "index.html"), lambda tmp_path: _write_text(tmp_path, page))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the Overall and every BU view to static HTML pages.")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory with the CSV exports (default: %(default)s)")
+    parser.add_argument("--sources", help="JSON file listing the exports (see bu_sources.py)")
+    parser.add_argument("--out", default="reports", help="Output directory (default: %(default)s)")
+    parser.add_argument("--month", help="Month to report, YYYY-MM (default: the latest)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--shared-plotly", action="store_true",
+                        help=f"Write plotly.js once to {PLOTLY_FILE_NAME} instead of embedding it in every page")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sources = discover_sources(args.data_dir, args.sources)
+    results = export_reports(sources, args.out, args.month, args.workers, args.shared_plotly)
+    failed = [result for result in results if 'error' in result]
+    for result in failed:
+        print(f"{result['label']}: FAILED: {result['error']}")
+    print(f"{len(results) - len(failed)} page(s) written to {args.out} in {time.perf_counter() - start:.1f}s")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
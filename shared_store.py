@@ -0,0 +1,315 @@
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import profiling
+from data_cache import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+
+# ---------------------------
+# Shared dataset store
+# ---------------------------
+# Loaded frames and processed view data are held once per server process and
+# handed to every session by reference, so N sessions looking at the same BU
+# share one copy instead of each unpickling its own. Entries are keyed by the
+# caller (typically a kind, the file path and its fingerprints), so a new
+# version of a file gets a new entry and the old one ages out.
+#
+# The store has a memory budget. Once the estimated size of the entries
+# exceeds it, the least recently used entries that no session references are
+# evicted. Unreferenced entries are also evicted once unused for
+# DASHBOARD_CACHE_TTL seconds, or beyond DASHBOARD_CACHE_MAX_ENTRIES entries
+# of one kind (the first element of a tuple key, e.g. 'bu_view'), so the
+# entries of superseded file versions do not wait for the budget to run out
+# (see data_cache.py). Sessions reference what they are showing through a Lease: an entry
+# stays while any lease holds it, and a lease drops its references when the
+# session moves on or is garbage-collected.
+#
+# Stored values are shared between sessions and threads: do not mutate them.
+# Size and hit rate are reported with every profiling run (see profiling.py).
+#
+# The budget can be overridden from the environment:
+# - DASHBOARD_SHARED_STORE_MB : memory budget of the store
+
+SHARED_STORE_MAX_MB = float(os.environ.get("DASHBOARD_SHARED_STORE_MB", "1024"))
+
+
+def estimate_bytes(value, _seen=None):
+    """
+    Estimate the memory held by a value, counting shared objects once.
+
+    Args:
+        value: Frame, array or (nested) dict / list / tuple of them
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_bytes(k, seen) + estimate_bytes(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_bytes(item, seen) for item in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ('value', 'nbytes', 'refs', 'used')
+
+    def __init__(self, value, nbytes):
+        self.value = value
+        self.nbytes = nbytes
+        self.refs = 0
+        self.used = time.monotonic()
+
+
+def _kind(key):
+    return key[0] if isinstance(key, tuple) and key else None
+
+
+class SharedStore:
+    """
+    Thread-safe, reference-counted LRU store of immutable datasets.
+
+    Args:
+        max_bytes (int): Memory budget; unreferenced entries are evicted
+            least-recently-used to stay within it
+        ttl (float): Seconds an unreferenced entry is kept unused (None:
+            no expiry)
+        max_entries (int): Most entries of one kind; unreferenced ones are
+            evicted least-recently-used beyond it
+    """
+
+    def __init__(self, max_bytes=int(SHARED_STORE_MAX_MB * 1024 * 1024), ttl=CACHE_TTL_SECONDS,
+                 max_entries=CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._next_expiry = 0.0
+        self._entries = OrderedDict()
+        self._building = {}
+        self._leases = weakref.WeakSet()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _hit(self, key, lease):
+        entry = self._entries[key]
+        self._entries.move_to_end(key)
+        entry.used = time.monotonic()
+        self.hits += 1
+        if lease is not None:
+            self._retain(key, lease)
+        self._expire()
+        return entry.value
+
+    def _retain(self, key, lease):
+        if key not in lease._keys:
+            lease._keys.add(key)
+            self._entries[key].refs += 1
+
+    def get(self, key, build, lease=None):
+        """
+        Return the stored value for a key, building and storing it on a miss.
+
+        Concurrent misses on the same key build it once; the other callers
+        wait for that build and share its result.
+
+        Args:
+            key (hashable): Entry key
+            build (callable): Zero-argument function building the value
+            lease (Lease): Lease to reference the entry from (None to only
+                use it for this call)
+
+        Returns:
+            The (shared) value
+        """
+        with self._lock:
+            if key in self._entries:
+                return self._hit(key, lease)
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    return self._hit(key, lease)
+            try:
+                value = build()
+                nbytes = estimate_bytes(value)
+                with self._lock:
+                    self.misses += 1
+                    self._entries[key] = _Entry(value, nbytes)
+                    self._bytes += nbytes
+                    if lease is not None:
+                        self._retain(key, lease)
+                    self._evict()
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+        return value
+
+    def peek(self, key, lease=None):
+        """
+        Return the stored value for a key without building it.
+
+        Args:
+            key (hashable): Entry key
+            lease (Lease): Lease to reference the entry from, if found
+
+        Returns:
+            The (shared) value, or None if the key is not stored
+        """
+        with self._lock:
+            if key in self._entries:
+                return self._hit(key, lease)
+        return None
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def release(self, keys):
+        """
+        Drop one reference to each of the keys, e.g. when a lease lets go.
+
+        Args:
+            keys (iterable): Keys previously retained by a lease
+        """
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry.refs > 0:
+                    entry.refs -= 1
+            self._evict()
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
+        self.evictions += 1
+
+    def _expire(self):
+        """Evict unreferenced entries unused for longer than the TTL, at most every tenth of it."""
+        now = time.monotonic()
+        if self.ttl is None or now < self._next_expiry:
+            return
+        self._next_expiry = now + self.ttl / 10
+        for key in [k for k, entry in self._entries.items() if entry.refs == 0 and now - entry.used > self.ttl]:
+            self._drop(key)
+
+    def _evict(self):
+        self._expire()
+        counts = {}
+        for key in self._entries:
+            counts[_kind(key)] = counts.get(_kind(key), 0) + 1
+        # Least recently used first
+        for key in [k for k, entry in self._entries.items() if entry.refs == 0]:
+            kind = _kind(key)
+            if counts[kind] > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(key)
+                counts[kind] -= 1
+
+    def stats(self):
+        """
+        Store counters for tuning.
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries, referenced
+                (entries held by a lease), references, bytes and max_bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'referenced': sum(1 for entry in self._entries.values() if entry.refs),
+                'references': sum(entry.refs for entry in self._entries.values()),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        """
+        Drop all entries and reset the counters.
+
+        Leases keep the values they handed out but hold no references any
+        more: entries fetched through them afterwards are referenced anew.
+        """
+        with self._lock:
+            # Held until the lock is released: a lease collected under it
+            # would release through the lock
+            leases = list(self._leases)
+            for lease in leases:
+                lease._keys.clear()
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+class Lease:
+    """
+    One session's references into a SharedStore.
+
+    Entries fetched through the lease stay in the store until the lease
+    releases them; a lease that is garbage-collected (e.g. with the session
+    state holding it) releases everything it holds.
+
+    Args:
+        store (SharedStore): Store to reference entries in
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._keys = set()
+        with store._lock:
+            store._leases.add(self)
+        self._finalizer = weakref.finalize(self, store.release, self._keys)
+
+    def get(self, key, build):
+        """Fetch an entry as SharedStore.get and keep a reference to it."""
+        return self.store.get(key, build, lease=self)
+
+    def peek(self, key):
+        """Look up an entry as SharedStore.peek and keep a reference to it if found."""
+        return self.store.peek(key, lease=self)
+
+    def keep_only(self, keys):
+        """
+        Release every referenced entry except the given keys.
+
+        Args:
+            keys (iterable): Keys to keep referencing
+        """
+        keys = set(keys)
+        with self.store._lock:
+            dropped = self._keys - keys
+            self._keys &= keys
+        self.store.release(dropped)
+
+    def close(self):
+        """Release everything the lease references."""
+        self.keep_only(())
+
+
+SHARED_STORE = SharedStore()
+profiling.register_stats('shared_store', SHARED_STORE.stats)
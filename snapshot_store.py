@@ -0,0 +1,367 @@
+import argparse
+import json
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_cache import file_fingerprint
+from data_schema import read_typed_csv, schema_for_file
+
+# ---------------------------
+# Columnar snapshot store
+# ---------------------------
+# Typed exports are converted once into Parquet files partitioned by month
+# (and by BU for per-BU exports):
+#
+#   <store>/overall/month=2025-01/part.parquet
+#   <store>/bu/bu=BU1/month=2025-01/part.parquet
+#   <store>/_manifest.json
+#
+# The manifest records the content digest of every ingested source file and
+# of every partition, so re-ingesting a grown export only writes the months
+# that are new or changed, and deletes the months the export no longer has. Readers pick partitions by directory name and read
+# only the requested columns, memory-mapped. Excel workbooks are converted
+# into the same store, one source per sheet (see excel_ingest.py).
+#
+# The store location can be set with DASHBOARD_SNAPSHOT_DIR.
+
+SNAPSHOT_DIR = os.environ.get("DASHBOARD_SNAPSHOT_DIR", "snapshots")
+
+MANIFEST_NAME = "_manifest.json"
+PART_NAME = "part.parquet"
+
+_NULLABLE_INTS = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+}
+
+
+def _manifest_path(store_dir):
+    return os.path.join(store_dir, MANIFEST_NAME)
+
+
+def load_manifest(store_dir=SNAPSHOT_DIR):
+    """
+    Read the store manifest.
+
+    Args:
+        store_dir (str): Root directory of the store
+
+    Returns:
+        dict: Manifest with 'sources' and 'partitions' entries (empty if no
+            store) and, once a workbook was ingested, 'workbooks'
+    """
+    try:
+        with open(_manifest_path(store_dir)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'sources': {}, 'partitions': {}}
+
+
+def write_atomic(path, write):
+    """Write a file through a temporary sibling so readers never see partial files."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _save_manifest(store_dir, manifest):
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    write_atomic(_manifest_path(store_dir), write)
+
+
+def _table_for_file(file_path):
+    """Return (table name, BU label) a CSV export is stored under."""
+    schema = schema_for_file(file_path)
+    if schema['name'] == 'overall':
+        return 'overall', None
+    return 'bu', os.path.splitext(os.path.basename(file_path))[0]
+
+
+def _table_dir(store_dir, table, bu=None):
+    if bu is None:
+        return os.path.join(store_dir, table)
+    return os.path.join(store_dir, table, f"bu={bu}")
+
+
+def _frame_digest(frame):
+    """Stable content hash of a partition frame."""
+    hashed = pd.util.hash_pandas_object(frame, index=False)
+    return format(int(hashed.sum()) & 0xFFFFFFFFFFFFFFFF, '016x') + f"-{len(frame)}"
+
+
+def ingest_csv(file_path, store_dir=SNAPSHOT_DIR):
+    """
+    Convert a CSV export into the store, writing only new or changed months
+    and deleting the months the export no longer has.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        store_dir (str): Root directory of the store
+
+    Returns:
+        list: Relative paths of the partitions that were written
+    """
+    fingerprint = file_fingerprint(file_path)
+    if fingerprint is None:
+        raise FileNotFoundError(file_path)
+
+    manifest = load_manifest(store_dir)
+    source_key = os.path.basename(file_path)
+    source = manifest['sources'].get(source_key)
+    if source is not None and source['digest'] == fingerprint[2]:
+        return []
+
+    df, problems = read_typed_csv(file_path, schema_for_file(file_path))
+    return ingest_frame(df, source_key, fingerprint[2], len(problems), store_dir)
+
+
+def ingest_frame(df, source_key, digest, problem_count=0, store_dir=SNAPSHOT_DIR, origin=None):
+    """
+    Store a typed frame as the given export, writing only new or changed
+    months and deleting the stored months the frame does not have.
+
+    Args:
+        df (pd.DataFrame): Typed frame (see data_schema.py)
+        source_key (str): Export file name the frame is served as, e.g. 'BU1.csv'
+        digest (str): Content digest of the data the frame was read from
+        problem_count (int): Number of malformed values found while reading it
+        store_dir (str): Root directory of the store
+        origin (str): File the frame was converted from, if not the export
+            itself (e.g. a workbook)
+
+    Returns:
+        list: Relative paths of the partitions that were written
+    """
+    manifest = load_manifest(store_dir)
+    table, bu = _table_for_file(source_key)
+    table_dir = _table_dir(store_dir, table, bu)
+
+    written = []
+    months = set()
+    for period, frame in df.groupby('Month', observed=True, sort=True):
+        months.add(period)
+        part_dir = os.path.join(table_dir, f"month={period}")
+        rel_path = os.path.relpath(os.path.join(part_dir, PART_NAME), store_dir)
+        # The month is implied by the partition, so it is not stored in the file
+        frame = frame.drop(columns='Month').reset_index(drop=True)
+        part_digest = _frame_digest(frame)
+        if manifest['partitions'].get(rel_path) == part_digest:
+            continue
+
+        arrow_table = pa.Table.from_pandas(frame, preserve_index=False)
+        write_atomic(
+            os.path.join(part_dir, PART_NAME),
+            lambda tmp_path: pq.write_table(arrow_table, tmp_path),
+        )
+        manifest['partitions'][rel_path] = part_digest
+        written.append(rel_path)
+
+    # Months removed from the export stop being served
+    for period in list_months(table, bu, store_dir):
+        if period not in months:
+            part_dir = os.path.join(table_dir, f"month={period}")
+            shutil.rmtree(part_dir, ignore_errors=True)
+            manifest['partitions'].pop(os.path.relpath(os.path.join(part_dir, PART_NAME), store_dir), None)
+
+    manifest['sources'][source_key] = {
+        'table': table,
+        'bu': bu,
+        'digest': digest,
+        'problems': problem_count,
+    }
+    if origin is not None:
+        manifest['sources'][source_key]['origin'] = origin
+    _save_manifest(store_dir, manifest)
+    return written
+
+
+def drop_sources(source_keys, store_dir=SNAPSHOT_DIR):
+    """
+    Stop serving exports from the store; their partitions stay on disk.
+
+    Args:
+        source_keys (iterable): Export file names, e.g. 'BU1.csv'
+        store_dir (str): Root directory of the store
+    """
+    manifest = load_manifest(store_dir)
+    for key in source_keys:
+        manifest['sources'].pop(key, None)
+    _save_manifest(store_dir, manifest)
+
+
+def record_workbook(origin, digest, store_dir=SNAPSHOT_DIR):
+    """
+    Record the content digest of the workbook version last converted into
+    the store, whether or not any of its sheets was recognised.
+
+    Args:
+        origin (str): Workbook file name
+        digest (str): Content digest of the workbook
+        store_dir (str): Root directory of the store
+    """
+    manifest = load_manifest(store_dir)
+    manifest.setdefault('workbooks', {})[origin] = digest
+    _save_manifest(store_dir, manifest)
+
+
+def manifest_fingerprint(store_dir=SNAPSHOT_DIR):
+    """
+    Fingerprint of the store manifest, which changes on every ingest.
+
+    Args:
+        store_dir (str): Root directory of the store
+
+    Returns:
+        tuple: Fingerprint from data_cache.file_fingerprint, or None if no store
+    """
+    return file_fingerprint(_manifest_path(store_dir))
+
+
+def has_fresh_snapshot(file_path, store_dir=SNAPSHOT_DIR):
+    """
+    Check whether the store holds the current version of a CSV export.
+
+    A missing CSV counts as fresh when the store has ingested it before, so
+    history stays readable after old exports are archived.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        store_dir (str): Root directory of the store
+
+    Returns:
+        bool: True if the export can be served from the store
+    """
+    source = load_manifest(store_dir)['sources'].get(os.path.basename(file_path))
+    if source is None:
+        return False
+    fingerprint = file_fingerprint(file_path)
+    return fingerprint is None or fingerprint[2] == source['digest']
+
+
+def list_months(table, bu=None, store_dir=SNAPSHOT_DIR):
+    """
+    List the months stored for a table.
+
+    Args:
+        table (str): 'overall' or 'bu'
+        bu (str): BU label for the 'bu' table
+        store_dir (str): Root directory of the store
+
+    Returns:
+        list: Stored months as pd.Period, oldest first
+    """
+    table_dir = _table_dir(store_dir, table, bu)
+    if not os.path.isdir(table_dir):
+        return []
+    return sorted(
+        pd.Period(name.split('=', 1)[1], 'M')
+        for name in os.listdir(table_dir)
+        if name.startswith('month=') and os.path.exists(os.path.join(table_dir, name, PART_NAME))
+    )
+
+
+def read_snapshot(table, bu=None, months=None, columns=None, store_dir=SNAPSHOT_DIR):
+    """
+    Read part of a stored table.
+
+    Only the partitions of the requested months are opened, and only the
+    requested columns are read from them (memory-mapped).
+
+    Args:
+        table (str): 'overall' or 'bu'
+        bu (str): BU label for the 'bu' table
+        months (list): Periods (or 'YYYY-MM' strings) to read, None for all
+        columns (list): Canonical column names to read, None for all
+        store_dir (str): Root directory of the store
+
+    Returns:
+        pd.DataFrame: The typed rows, or None if nothing is stored
+    """
+    stored = list_months(table, bu, store_dir)
+    if months is not None:
+        wanted = {pd.Period(m, 'M') for m in months}
+        stored = [m for m in stored if m in wanted]
+    if not stored:
+        return None
+
+    table_dir = _table_dir(store_dir, table, bu)
+    file_columns = None
+    if columns is not None:
+        # Columns the export never had are skipped, as when reading the CSV
+        names = set(pq.read_schema(os.path.join(table_dir, f"month={stored[-1]}", PART_NAME)).names)
+        file_columns = [c for c in columns if c != 'Month' and c in names]
+    parts = [
+        pq.read_table(
+            os.path.join(table_dir, f"month={period}", PART_NAME),
+            columns=file_columns,
+            memory_map=True,
+        )
+        for period in stored
+    ]
+    # Partitions ingested from different exports may use different integer
+    # widths; widen them to a common type and map back to nullable pandas ints
+    combined = pa.concat_tables(parts, promote_options='permissive').replace_schema_metadata(None)
+    df = combined.to_pandas(types_mapper=_NULLABLE_INTS.get)
+
+    if columns is None or 'Month' in columns:
+        lengths = [part.num_rows for part in parts]
+        df['Month'] = pd.PeriodIndex(stored, freq='M').repeat(lengths)
+    return df
+
+
+def read_snapshot_for_file(file_path, months=None, columns=None, store_dir=SNAPSHOT_DIR):
+    """
+    Read the stored copy of a CSV export.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export the data came from
+        months (list): Periods to read, None for all
+        columns (list): Canonical column names to read, None for all
+        store_dir (str): Root directory of the store
+
+    Returns:
+        pd.DataFrame: The typed rows, or None if nothing is stored
+    """
+    table, bu = _table_for_file(file_path)
+    return read_snapshot(table, bu, months=months, columns=columns, store_dir=store_dir)
+
+
+def list_months_for_file(file_path, store_dir=SNAPSHOT_DIR):
+    """
+    List the months stored for a CSV export, without reading them.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export the data came from
+        store_dir (str): Root directory of the store
+
+    Returns:
+        list: Stored months as pd.Period, oldest first
+    """
+    table, bu = _table_for_file(file_path)
+    return list_months(table, bu, store_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest BU CSV exports into the columnar snapshot store.")
+    parser.add_argument("files", nargs="+", help="Overall and per-BU CSV exports")
+    parser.add_argument("--store", default=SNAPSHOT_DIR, help="Store directory (default: %(default)s)")
+    args = parser.parse_args()
+
+    for file_path in args.files:
+        written = ingest_csv(file_path, args.store)
+        print(f"{file_path}: {len(written)} partition(s) written")
+        for rel_path in written:
+            print(f"  {rel_path}")
+
+
+if __name__ == "__main__":
+    main()
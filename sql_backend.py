@@ -0,0 +1,310 @@
+import argparse
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from data_cache import file_fingerprint
+from data_loader import read_data_file
+from data_schema import BU_SCHEMA, OVERALL_SCHEMA, PERSPECTIVES, schema_for_file
+from period_index import SUM_COLUMNS, TOTAL_ROW_PREFIX
+
+try:
+    import duckdb
+except ImportError:  # optional: SQLite from the standard library otherwise
+    duckdb = None
+
+# ---------------------------
+# Embedded SQL backend
+# ---------------------------
+# Typed exports can be loaded into one embedded database file, which several
+# dashboard processes then query instead of each holding the full frames:
+#
+#   python sql_backend.py Overall_BU.csv BU1.csv --db dashboard.db
+#
+# The per-period sums and per-BU / per-subdiv breakdowns run as SQL inside
+# the database, and only their small results come back to pandas. DuckDB is
+# used when installed, SQLite otherwise.
+#
+# Layout: one table per schema ('overall', 'bu') with the canonical columns,
+# 'Month' as 'YYYY-MM' text and a 'Source' column naming the export ('BU1',
+# 'Overall_BU'), plus a '_sources' table recording the content digest of each
+# ingested export, so freshness is checked like the snapshot store's.
+#
+# The dashboard reads from the database set in DASHBOARD_SQL_DB, for the
+# exports it holds the current version of.
+
+SQL_DB = os.environ.get("DASHBOARD_SQL_DB")
+
+SCHEMAS = {'overall': OVERALL_SCHEMA, 'bu': BU_SCHEMA}
+
+_SQL_TYPES = {'category': 'TEXT', 'month': 'TEXT', 'int': 'BIGINT', 'float': 'DOUBLE', 'percent': 'DOUBLE'}
+
+# Key the rows of a period are broken down by, per table
+BREAKDOWN_KEYS = {'overall': 'BU', 'bu': 'Subdiv'}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect(db_path, read_only=False):
+    """
+    Open the database.
+
+    Args:
+        db_path (str): Database file
+        read_only (bool): Open read-only, so several processes can share it
+
+    Returns:
+        DuckDB or sqlite3 connection
+    """
+    if duckdb is not None:
+        return duckdb.connect(db_path, read_only=read_only)
+    if read_only:
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    return sqlite3.connect(db_path)
+
+
+def query(con, sql, params=()):
+    """
+    Run a query and return its result as a DataFrame.
+    """
+    if duckdb is not None:
+        return con.execute(sql, list(params)).df()
+    return pd.read_sql_query(sql, con, params=list(params))
+
+
+def _create_tables(con):
+    for table, schema in SCHEMAS.items():
+        columns = [f"{_quote(name)} {_SQL_TYPES[kind]}" for name, kind in schema['columns'].values()]
+        con.execute(f"CREATE TABLE IF NOT EXISTS {table} (Source TEXT, {', '.join(columns)})")
+        con.execute(f"CREATE INDEX IF NOT EXISTS {table}_source_month ON {table} (Source, Month)")
+    con.execute("CREATE TABLE IF NOT EXISTS _sources (Name TEXT PRIMARY KEY, Source TEXT, Tbl TEXT, Digest TEXT)")
+
+
+def _sql_frame(df, schema, source):
+    """Typed frame -> plain columns in table order, ready to insert."""
+    columns = {'Source': pd.Series(source, index=df.index, dtype=object)}
+    for name, kind in schema['columns'].values():
+        if name not in df.columns:
+            values = pd.Series(None, index=df.index, dtype=object)
+        elif kind == 'month':
+            values = df[name].astype(str)
+        elif kind == 'category':
+            values = df[name].astype(object)
+        else:
+            values = df[name].astype('float64')
+        columns[name] = values.astype(object).where(values.notna(), None)
+    return pd.DataFrame(columns)
+
+
+def ingest_file(file_path, db_path):
+    """
+    Load an export into the database, replacing the rows of its previous version.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        db_path (str): Database file (created if missing)
+
+    Returns:
+        int: Number of rows written
+    """
+    schema = schema_for_file(file_path)
+    table = schema['name']
+    name = os.path.basename(file_path)
+    source = os.path.splitext(name)[0]
+    df, _ = read_data_file(file_path)
+    frame = _sql_frame(df, schema, source)
+
+    con = connect(db_path)
+    try:
+        _create_tables(con)
+        con.execute("BEGIN")
+        con.execute(f"DELETE FROM {table} WHERE Source = ?", [source])
+        if duckdb is not None:
+            con.register('_ingest', frame)
+            con.execute(f"INSERT INTO {table} SELECT * FROM _ingest")
+            con.unregister('_ingest')
+        else:
+            placeholders = ', '.join('?' * len(frame.columns))
+            con.executemany(f"INSERT INTO {table} VALUES ({placeholders})", frame.itertuples(index=False, name=None))
+        con.execute("DELETE FROM _sources WHERE Name = ?", [name])
+        con.execute("INSERT INTO _sources VALUES (?, ?, ?, ?)", [name, source, table, file_fingerprint(file_path)[2]])
+        con.execute("COMMIT")
+    finally:
+        con.close()
+    return len(frame)
+
+
+def source_for_file(file_path, db_path=SQL_DB):
+    """
+    Look up the database rows of an export, if they are its current version.
+
+    A missing CSV counts as current when it was ingested before.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        db_path (str): Database file
+
+    Returns:
+        tuple: (table, source) to query, or None
+    """
+    if not db_path or not os.path.exists(db_path):
+        return None
+    con = connect(db_path, read_only=True)
+    try:
+        found = query(con, "SELECT Source, Tbl, Digest FROM _sources WHERE Name = ?", [os.path.basename(file_path)])
+    except Exception:
+        return None
+    finally:
+        con.close()
+    if found.empty:
+        return None
+    fingerprint = file_fingerprint(file_path)
+    if fingerprint is not None and fingerprint[2] != found['Digest'].iloc[0]:
+        return None
+    return found['Tbl'].iloc[0], found['Source'].iloc[0]
+
+
+def _sum_columns(table):
+    """SUM_COLUMNS of a table; the Financial perspective's for BU sheets."""
+    if table == 'bu':
+        names = set(PERSPECTIVES['Financial'][1])
+    else:
+        names = {name for name, _ in SCHEMAS[table]['columns'].values()}
+    return [c for c in SUM_COLUMNS if c in names]
+
+
+def _row_filter(table):
+    """Rows entering sums: no summary rows, Financial rows only in BU sheets."""
+    if table == 'overall':
+        return f"BU NOT LIKE '{TOTAL_ROW_PREFIX}%'"
+    return "Perspective = 'Financial'"
+
+
+def period_totals(con, table, source, columns=None):
+    """
+    Per-month sums, computed in SQL.
+
+    Args:
+        con: Connection from connect()
+        table (str): 'overall' or 'bu'
+        source (str): Export name, e.g. 'BU1'
+        columns (list): Columns to sum (default: the SUM_COLUMNS of the table)
+
+    Returns:
+        pd.DataFrame: 'Month' ('YYYY-MM') and the sum of every column
+    """
+    columns = columns or _sum_columns(table)
+    sums = ', '.join(f"SUM({_quote(c)}) AS {_quote(c)}" for c in columns)
+    sql = (
+        f"SELECT Month, {sums} FROM {table} "
+        f"WHERE Source = ? AND {_row_filter(table)} GROUP BY Month ORDER BY Month"
+    )
+    return query(con, sql, [source])
+
+
+def breakdown(con, table, source, month, columns=None):
+    """
+    Sums of one month per BU (overall) or per subdiv (BU sheets), in SQL.
+
+    Args:
+        con: Connection from connect()
+        table (str): 'overall' or 'bu'
+        source (str): Export name
+        month (str): 'YYYY-MM'
+        columns (list): Columns to sum (default: the SUM_COLUMNS of the table)
+
+    Returns:
+        pd.DataFrame: One row per key, with the key as first column
+    """
+    key = _quote(BREAKDOWN_KEYS[table])
+    columns = columns or _sum_columns(table)
+    sums = ', '.join(f"SUM({_quote(c)}) AS {_quote(c)}" for c in columns)
+    sql = (
+        f"SELECT {key}, {sums} FROM {table} "
+        f"WHERE Source = ? AND Month = ? AND {_row_filter(table)} GROUP BY {key} ORDER BY {key}"
+    )
+    return query(con, sql, [source, month])
+
+
+class _LazyPeriod(dict):
+    """
+    Period index entry whose 'data' is queried on first access. Entries are
+    shared between sessions, so the query runs once, under a lock.
+    """
+
+    def __init__(self, db_path, table, source, month, **entry):
+        super().__init__(entry)
+        self._query = (db_path, table, source, month)
+        self._lock = threading.Lock()
+
+    def __missing__(self, key):
+        if key != 'data':
+            raise KeyError(key)
+        with self._lock:
+            if 'data' in self:
+                return dict.__getitem__(self, 'data')
+            db_path, table, source, month = self._query
+            con = connect(db_path, read_only=True)
+            try:
+                data = breakdown(con, table, source, month)
+            finally:
+                con.close()
+            self['data'] = data
+        return data
+
+
+def period_index(file_path, db_path=SQL_DB):
+    """
+    Build a period index (see period_index.py) from the database.
+
+    The totals of every month come from one aggregate query; the rows of a
+    month are queried only when its 'data' entry is first read.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export held by the database
+        db_path (str): Database file
+
+    Returns:
+        dict: Period -> {'data', 'totals', 'reported_total'}, or {} if the
+            database does not hold the current version of the export
+    """
+    found = source_for_file(file_path, db_path)
+    if found is None:
+        return {}
+    table, source = found
+    con = connect(db_path, read_only=True)
+    try:
+        totals = period_totals(con, table, source)
+    finally:
+        con.close()
+
+    index = {}
+    columns = [c for c in totals.columns if c != 'Month']
+    for row in totals.itertuples(index=False):
+        values = dict(zip(totals.columns, row))
+        index[pd.Period(values['Month'], 'M')] = _LazyPeriod(
+            db_path, table, source, values['Month'],
+            totals={c: values[c] for c in columns},
+            reported_total=None,
+        )
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load BU CSV exports into an embedded SQL database.")
+    parser.add_argument("files", nargs="+", help="Overall_BU.csv / BU<n>.csv exports")
+    parser.add_argument("--db", default=SQL_DB or "dashboard.db", help="Database file (default: %(default)s)")
+    args = parser.parse_args()
+
+    print(f"Backend: {'DuckDB' if duckdb is not None else 'SQLite'}")
+    for file_path in args.files:
+        rows = ingest_file(file_path, args.db)
+        print(f"{file_path}: {rows:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_schema import iter_typed_csv, schema_for_file
+from period_index import total_row_mask
+
+# ---------------------------
+# Streaming ingestion
+# ---------------------------
+# Oversized exports are read in chunks, and each chunk is folded into running
+# per-(Month, BU) aggregates (per-(Month, Subdiv) for a per-BU export) before
+# the next one is read, so raw rows are never held in memory all at once and
+# peak memory stays flat with file size. The aggregates carry what the
+# summary views need: Budget, Expense, Revenue and Profit sums, customer
+# counts and mean customer satisfaction. In a per-BU export the Customer n
+# Service rows have no Subdiv; they are keyed by their Product instead, as in
+# the BU view's perspective tables. A sum or mean over no values (e.g. the
+# customer count of a subdiv) is NaN, not 0.
+#
+# Files above DASHBOARD_STREAMING_THRESHOLD_MB (default 256), Overall or
+# per-BU, are served to the dashboard as summary views from these aggregates.
+
+STREAMING_THRESHOLD_MB = float(os.environ.get("DASHBOARD_STREAMING_THRESHOLD_MB", "256"))
+STREAMING_CHUNK_ROWS = int(os.environ.get("DASHBOARD_STREAMING_CHUNK_ROWS", "100000"))
+
+AGGREGATE_SUMS = ['Budget', 'Expense', 'Revenue', 'Profit', '#of customer']
+AGGREGATE_MEANS = ['Customer satisfaction']
+
+
+def needs_streaming(file_path, threshold_mb=STREAMING_THRESHOLD_MB):
+    """
+    Check whether a file is large enough to be ingested by streaming.
+
+    Args:
+        file_path (str): Export to check
+        threshold_mb (float): Size above which streaming is used
+
+    Returns:
+        bool: True if the file exists and exceeds the threshold
+    """
+    try:
+        return os.path.getsize(file_path) > threshold_mb * 1024 * 1024
+    except OSError:
+        return False
+
+
+def _fold_chunk(df, bu):
+    """
+    Aggregate one typed chunk per (Month, BU), or per (Month, Subdiv) for a
+    per-BU export.
+
+    Sums are kept as float64 and means as (sum, count) pairs, so partial
+    aggregates of consecutive chunks can simply be added together; sums
+    carry a count of their values too, so empty ones can be told from 0.
+    """
+    entity = next((name for name in ('BU', 'Subdiv') if name in df.columns), None)
+    if entity is not None:
+        df = df[~total_row_mask(df, entity).to_numpy()]
+        keys = df[entity].astype('string')
+        if entity == 'Subdiv' and 'Product' in df.columns:
+            # Customer n Service rows are keyed by product
+            keys = keys.fillna(df['Product'].astype('string'))
+    else:
+        entity = 'BU'
+        keys = pd.Series(bu, index=df.index, dtype='string')
+
+    parts = {'Rows': np.ones(len(df))}
+    for name in AGGREGATE_SUMS:
+        if name in df.columns:
+            values = df[name].astype('float64').to_numpy(na_value=np.nan)
+            parts[name] = values
+            parts[f'{name} count'] = ~np.isnan(values)
+    for name in AGGREGATE_MEANS:
+        if name in df.columns:
+            values = df[name].astype('float64').to_numpy(na_value=np.nan)
+            parts[f'{name} sum'] = values
+            parts[f'{name} count'] = ~np.isnan(values)
+
+    values = pd.DataFrame(parts, index=df.index)
+    return values.groupby([df['Month'].rename('Month'), keys.rename(entity)], observed=True).sum()
+
+
+def aggregate_csv(file_path, bu=None, chunksize=STREAMING_CHUNK_ROWS):
+    """
+    Stream an export into per-(Month, BU) aggregates, or per-(Month,
+    Subdiv) aggregates for a per-BU export.
+
+    Args:
+        file_path (str): Overall or per-BU CSV export
+        bu (str): BU label for exports with neither a BU nor a Subdiv column
+            (default: the file name, e.g. 'BU1')
+        chunksize (int): Rows read per chunk
+
+    Returns:
+        tuple: (pd.DataFrame with Month, BU (or Subdiv, or Product for
+            customer rows), the AGGREGATE_SUMS sums, the AGGREGATE_MEANS means
+            and the row count 'Rows'; number of malformed values reported)
+    """
+    if bu is None:
+        bu = os.path.splitext(os.path.basename(file_path))[0]
+
+    totals = None
+    problem_count = 0
+    for chunk, problems in iter_typed_csv(file_path, schema_for_file(file_path), chunksize):
+        problem_count += len(problems)
+        part = _fold_chunk(chunk, bu)
+        totals = part if totals is None else totals.add(part, fill_value=0)
+
+    if totals is None:
+        return pd.DataFrame(columns=['Month', 'BU'] + AGGREGATE_SUMS + AGGREGATE_MEANS + ['Rows']), problem_count
+    entity = totals.index.names[1]
+
+    for name in AGGREGATE_SUMS:
+        if name in totals.columns:
+            counts = totals.pop(f'{name} count')
+            totals[name] = totals[name].where(counts > 0)
+    for name in AGGREGATE_MEANS:
+        if f'{name} sum' in totals.columns:
+            counts = totals.pop(f'{name} count')
+            totals[name] = (totals.pop(f'{name} sum') / counts.where(counts > 0)).astype('float32')
+    totals['Rows'] = totals['Rows'].astype('int64')
+
+    result = totals.sort_index().reset_index()
+    result[entity] = result[entity].astype('category')
+    return result, problem_count
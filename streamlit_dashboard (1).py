@@ -1,26 +1,104 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import contextlib
+import datetime
 import os
 
+import plotly.io as pio
+
+import profiling
+from background_refresh import REFRESH_SECONDS, REFRESHER
+from bu_sources import discover_sources
+from dashboard_utils import (
+    SCORECARDS,
+    category_column,
+    create_budget_vs_expense_chart,
+    create_paginated_table,
+    create_scorecard,
+    period_chart_title,
+)
+from data_cache import file_fingerprint
+from data_loader import bu_view, index_view, load_files, overall_view, read_data_file, view_columns, view_months
+from excel_ingest import WORKBOOK, ingest_workbook
+from figure_cache import FIGURE_CACHE, figure_key
+from kpi_engine import ALL_LABEL, index_kpis
+from metric_series import COMPARISONS, build_series, series_point
+from period_index import build_period_index
+from precompute import artifact_fingerprint, load_artifact
+from shared_store import SHARED_STORE, Lease
+from snapshot_store import has_fresh_snapshot, manifest_fingerprint
+from sql_backend import SQL_DB
+from sql_backend import period_index as sql_period_index
+from streaming_ingest import aggregate_csv, needs_streaming
+
 # ---------------------------
 # Streamlit Dashboard for BU Performance using CSV files
 # ---------------------------
 # This dashboard reads data from CSV files:
 # - Overall_BU.csv : Contains overall BU performance data (originally from sheet 1)
-# - BU1.csv        : Contains BU1 specific data (originally from sheet 2)
+# - BU<n>.csv      : One per BU, with that BU's specific data (originally from sheet 2)
+#
+# The files are discovered in DASHBOARD_DATA_DIR or listed in a sources.json
+# (see bu_sources.py). The dashboard has one view per file, picked from a
+# selector at the top: Overall BU Performance, then BU1, BU2, ...
 #
-# The dashboard has 4 tabs:
-# 1. Overall BU Performance (loads Overall_BU.csv)
-# 2. BU1 (loads BU1.csv)
-# 3. BU2 (placeholder text)
-# 4. BU3 (placeholder text)
+# All files are loaded concurrently into the cache on the first run, so cold
+# start takes about as long as the slowest file, and a file that fails to
+# load only affects its own view. Only the selected view is sliced and charted
+# on a rerun. Each view is a Streamlit fragment, so changing a widget inside
+# it (e.g. the month) reruns just that view.
+# Tables are paginated: search, filters and sorting run on the server and
+# only the visible page is sent to the browser (see table_query.py).
 #
 # If CSV files are missing, mock data will be used as fallback.
 #
+# Loaded and processed data is held once per server process in the shared
+# store and handed to every session by reference, keyed on each file's path
+# and fingerprint (mtime, size, content hash), so a changed file is picked up
+# automatically. The store evicts data no session is showing once it exceeds
+# its memory budget (see shared_store.py).
+#
 # CSV files must have the expected columns as per the original Excel structure.
-# For example, the date column is expected to be named 'Unnamed: 19' with date strings like '28/02/2025'.
-# Adjust column names if your CSV structure differs.
+# Each file is parsed against a declared schema (see data_schema.py): percent
+# strings become float32, dd/mm/yyyy dates become monthly periods in 'Month',
+# repeated labels become categoricals, and both files share canonical column
+# names ('Budget', 'Expense', ...). Adjust the schema if your CSV structure differs.
+#
+# With DASHBOARD_WORKBOOK set, the Excel workbook itself is read instead:
+# its sheets are converted once per workbook version and served like the
+# CSVs they replace (see excel_ingest.py).
+#
+# Files converted into the columnar snapshot store (python snapshot_store.py
+# Overall_BU.csv BU1.csv) are read from Parquet instead, touching only the
+# months and columns requested, as long as the store matches the CSV contents.
+# Exports larger than DASHBOARD_STREAMING_THRESHOLD_MB are streamed in chunks
+# into per-month, per-BU aggregates for the summary view (streaming_ingest.py).
+#
+# Scorecards compare a month with the previous one, the same month a year
+# earlier or the 3-month average, for the whole view or one BU / subdiv. The
+# values, changes and sparklines are precomputed per metric and entity with
+# the view data, and kept up to date month by month (see metric_series.py).
+#
+# After each data drop, python precompute.py can build every view's KPIs and
+# figures ahead of time; views whose export is unchanged since are served
+# from those artifacts without loading or charting anything.
+#
+# python report_export.py renders the same views of a month to static HTML
+# pages, without a server (see report_export.py).
+#
+# With DASHBOARD_SQL_DB set to a database built by python sql_backend.py,
+# views are summed and broken down by SQL queries on that shared file
+# instead of frames held by each process (see sql_backend.py).
+#
+# A background worker (background_refresh.py) watches the exports and
+# rebuilds the view data of a changed file off the request path; sessions
+# keep seeing the previous version until the new one is complete and
+# validated, then the two are swapped. DASHBOARD_REFRESH_SECONDS=0 turns it
+# off, and views are loaded on the request path as they are requested.
+#
+# Open the app with ?debug=1 (or set DASHBOARD_PROFILE=1) for a sidebar panel
+# timing each stage of the rerun: loads, processing, figure building and
+# table serialization (see profiling.py).
 # ---------------------------
 
 st.set_page_config(page_title="BU Performance Dashboard", layout="wide")
@@ -45,83 +123,294 @@ st.markdown("""
 # Data Loading Functions
 # ---------------------------
 
-def load_csv_data(file_path):
+def _session_lease():
+    """
+    This session's references into the shared store, released when the
+    session state is dropped.
+    """
+    if '_lease' not in st.session_state:
+        st.session_state['_lease'] = Lease(SHARED_STORE)
+    return st.session_state['_lease']
+
+def shared(key, build):
+    """
+    Fetch view data from the shared store, building it on a miss. The entry
+    is referenced by this session, so it is not evicted while shown.
+    """
+    st.session_state.setdefault('_view_keys', set()).add(key)
+    return _session_lease().get(key, build)
+
+@contextlib.contextmanager
+def view_references():
+    """
+    Reference only the shared entries fetched inside the block (the view
+    being drawn), releasing those of views the session no longer shows.
+    """
+    keys = st.session_state['_view_keys'] = set()
+    try:
+        yield
+    finally:
+        _session_lease().keep_only(keys)
+
+def _read_csv_cached(file_path, fingerprint, store_fingerprint, months=None, columns=None):
+    """
+    Read a CSV export, from the snapshot store when it holds the current
+    version of the file, otherwise by parsing the CSV against its declared
+    schema. The frame is kept in the shared store; the fingerprints are only
+    part of the key, so a new version of the file (or a re-ingested store)
+    gets a new entry instead of a stale hit. Raw frames are not referenced
+    by sessions: once processed they are the first to be evicted.
+
+    Returns:
+    - (DataFrame, list of malformed-value problems)
+    """
+    key = ('read', file_path, fingerprint, store_fingerprint, months, columns)
+    return SHARED_STORE.get(key, lambda: read_data_file(file_path, months=months, columns=columns))
+
+def load_csv_data(file_path, months=None, columns=None):
     """
     Load CSV data from the given file path.
     Returns a pandas DataFrame or None if file not found.
+    Parsed frames are served from the shared store while the file is unchanged.
+
+    Parameters:
+    - months: optional list of periods ('YYYY-MM') to load, default all
+    - columns: optional list of canonical column names to load, default all
     """
-    if os.path.exists(file_path):
-        try:
-            df = pd.read_csv(file_path)
-            return df
-        except Exception as e:
-            st.error(f"Error loading {file_path}: {e}")
-            return None
-    else:
+    fingerprint = file_fingerprint(file_path)
+    if fingerprint is None and not has_fresh_snapshot(file_path):
         return None
+    try:
+        with profiling.stage(f"load {os.path.basename(file_path)}") as record:
+            df, problems = _read_csv_cached(
+                file_path,
+                fingerprint,
+                manifest_fingerprint(),
+                tuple(str(m) for m in months) if months is not None else None,
+                tuple(columns) if columns is not None else None
+            )
+            record['rows'] = len(df)
+    except Exception as e:
+        st.error(f"Error loading {file_path}: {e}")
+        return None
+    if problems:
+        st.warning(f"{file_path}: {len(problems)} malformed value(s) were skipped, first: {problems[0]}")
+    return df
+
+def prefetch_csv_data(paths):
+    """
+    Load several CSV exports into the shared store concurrently, so a cold
+    start waits for the slowest file instead of the sum of all files.
+    Failures are left for the view that shows the file to report.
+
+    Parameters:
+    - paths: files to load, with the months and columns their views read;
+      done once per session and again when any of them (or the snapshot
+      store) changes
+    """
+    store_fingerprint = manifest_fingerprint()
+    fingerprints = {path: file_fingerprint(path) for path in paths}
+    state = (store_fingerprint, tuple(fingerprints.items()))
+    if st.session_state.get('_prefetched') == state:
+        return
+
+    def load(path):
+        months = view_months(path)
+        return _read_csv_cached(path, fingerprints[path], store_fingerprint,
+                                tuple(months) if months is not None else None, tuple(view_columns(path)))
+
+    with profiling.stage("prefetch", rows=len(paths)):
+        load_files(paths, load)
+    st.session_state['_prefetched'] = state
 
 # ---------------------------
 # Data Processing Functions
 # ---------------------------
 
-def process_csv_data(df_overall, df_bu1):
+def _process_overall_cached(file_path, fingerprint, store_fingerprint, df):
     """
-    Process the loaded CSV data into a dictionary of dataframes and summary info.
-    This function is adapted from the original process_excel_data logic.
-    
-    Parameters:
-    - df_overall: DataFrame loaded from Overall_BU.csv
-    - df_bu1: DataFrame loaded from BU1.csv
-    
+    Shared overall_view. Only the path and fingerprints make up the key;
+    the frame is read from the same file version.
+    """
+    return shared(('overall_view', file_path, fingerprint, store_fingerprint), lambda: overall_view(df))
+
+def _process_bu_cached(file_path, fingerprint, store_fingerprint, df):
+    """
+    Shared bu_view, keyed like _process_overall_cached.
+    """
+    return shared(('bu_view', file_path, fingerprint, store_fingerprint), lambda: bu_view(df))
+
+def load_overall_data(file_path):
+    """
+    Load and process an Overall_BU export into its view data: the period
+    index (period -> {'data', 'totals', 'reported_total'}, see
+    period_index.py), the KPI frame and the reconciliation with the export's
+    own totals. Each frame is grouped by its 'Month' period once, so any
+    month can be looked up directly and new months need no code changes.
+
+    Only the months and columns the view shows are read (see
+    data_loader.view_months / view_columns).
+
+    Returns:
+    - view dict (see data_loader.overall_view); its index is {} if the file
+      cannot be loaded or processed
+    """
+    df = load_csv_data(file_path, view_months(file_path), view_columns(file_path))
+    try:
+        with profiling.stage(f"process {os.path.basename(file_path)}", rows=0 if df is None else len(df)):
+            return _process_overall_cached(file_path, file_fingerprint(file_path), manifest_fingerprint(), df)
+    except Exception as e:
+        st.warning(f"Error processing {file_path} data: {e}")
+        return {'index': {}}
+
+def load_bu_data(file_path):
+    """
+    Load a per-BU export, split the long-format sheet into perspective
+    tables once and compute its KPIs.
+
+    Only the months and columns the view shows are read, as for the
+    Overall_BU export.
+
     Returns:
-    - data: dict containing processed data for dashboard use
-    """
-    data = {}
-
-    # Process Overall BU data
-    if df_overall is not None:
-        # Filter data for Feb 28, 2025 and Jan 31, 2025 based on 'Month' column (date column)
-        feb_data_overall = df_overall[df_overall['Month'] == '2025-02']
-        jan_data_overall = df_overall[df_overall['Month'] == '2025-01']
-
-        try:
-            data['overall'] = {
-                'feb_budget': feb_data_overall['Budget'].sum() if 'Budget' in feb_data_overall.columns else None,
-                'feb_expense': feb_data_overall['Expense'].sum() if 'Expense' in feb_data_overall.columns else None,
-                'jan_budget': jan_data_overall['Budget'].sum() if 'Budget' in jan_data_overall.columns else None,
-                'jan_expense': jan_data_overall['Expense'].sum() if 'Expense' in jan_data_overall.columns else None,
-                'feb_data': feb_data_overall,
-                'jan_data': jan_data_overall
-            }
-        except Exception as e:
-            st.warning(f"Error processing Overall_BU.csv data: {e}")
-            data['overall'] = {}
+    - view dict (see data_loader.bu_view): period index over the Financial
+      table, perspective tables, KPI frame and reconciliation
+    """
+    df = load_csv_data(file_path, view_months(file_path), view_columns(file_path))
+    try:
+        with profiling.stage(f"process {os.path.basename(file_path)}", rows=0 if df is None else len(df)):
+            return _process_bu_cached(file_path, file_fingerprint(file_path), manifest_fingerprint(), df)
+    except Exception as e:
+        st.warning(f"Error processing {file_path} data: {e}")
+        return {'index': {}}
+
+def _aggregate_csv_cached(file_path, fingerprint):
+    """
+    Shared aggregate_csv, keyed on the file fingerprint.
+    """
+    return shared(('aggregate', file_path, fingerprint), lambda: aggregate_csv(file_path))
 
-    else:
-        data['overall'] = {}
-
-    # Process BU1 data
-    if df_bu1 is not None:
-        # Filter data for Feb 28, 2025 and Jan 31, 2025 based on 'Bulan Quality' column (date column)
-        feb_data_bu1 = df_bu1[df_bu1['Bulan Quality'] == '2025-02']
-        jan_data_bu1 = df_bu1[df_bu1['Bulan Quality'] == '2025-01']
-
-        try:
-            data['bu1'] = {
-                'feb_budget': feb_data_bu1['Budget Finance'].sum() if 'Budget Finance' in feb_data_bu1.columns else None,
-                'feb_expense': feb_data_bu1['Expense Finance'].sum() if 'Expense Finance' in feb_data_bu1.columns else None,
-                'jan_budget': jan_data_bu1['Budget Finance'].sum() if 'Budget Finance' in jan_data_bu1.columns else None,
-                'jan_expense': jan_data_bu1['Expense Finance'].sum() if 'Expense Finance' in jan_data_bu1.columns else None,
-                'feb_data': feb_data_bu1,
-                'jan_data': jan_data_bu1
-            }
-        except Exception as e:
-            st.warning(f"Error processing BU1.csv data: {e}")
-            data['bu1'] = {}
-    else:
-        data['bu1'] = {}
+def load_streamed_summary(file_path):
+    """
+    Stream an oversized export into per-(Month, BU) aggregates (per-(Month,
+    Subdiv), and per-(Month, Product) for customer rows, for a per-BU export)
+    and index them by period, without materializing its rows. Used for
+    summary views.
+
+    Returns:
+    - view dict over the aggregates (see data_loader.index_view), with an
+      empty index if the file cannot be read
+    """
+    fingerprint = file_fingerprint(file_path)
+    try:
+        aggregates, problem_count = _aggregate_csv_cached(file_path, fingerprint)
+    except Exception as e:
+        st.error(f"Error streaming {file_path}: {e}")
+        return {'index': {}}
+    if problem_count:
+        st.warning(f"{file_path}: {problem_count} malformed value(s) were skipped.")
+    return shared(('streamed_view', file_path, fingerprint), lambda: index_view(build_period_index(aggregates)))
+
+def _load_artifact_cached(file_path, fingerprint, artifact_fingerprint):
+    """
+    Shared load_artifact, keyed on the export and artifact manifest fingerprints.
+    """
+    return shared(('artifact', file_path, fingerprint, artifact_fingerprint), lambda: load_artifact(file_path))
+
+def precomputed(file_path):
+    """
+    Return the artifact written by precompute.py for the current version of
+    an export: its period index, perspective tables, KPIs and figures.
 
-    return data
+    Returns:
+    - dict, or None if the export has no fresh artifact
+    """
+    try:
+        with profiling.stage(f"artifact {os.path.basename(file_path)}"):
+            return _load_artifact_cached(file_path, file_fingerprint(file_path), artifact_fingerprint())
+    except Exception:
+        # An unreadable artifact only costs the precomputation
+        return None
+
+def _sql_view_cached(file_path, fingerprint, db_fingerprint):
+    """
+    Shared view over sql_backend.period_index, keyed on the export and
+    database fingerprints.
+    """
+    return shared(('sql', file_path, fingerprint, db_fingerprint),
+                  lambda: index_view(sql_period_index(file_path)))
+
+def load_sql_view(file_path):
+    """
+    Build the view data of an export from the shared SQL database
+    (DASHBOARD_SQL_DB): month totals are summed in the database, and a
+    month's rows are queried when the month is shown.
+
+    Returns:
+    - view dict (see data_loader.index_view), or None if no database is set
+      or it does not hold the current version of the export
+    """
+    if not SQL_DB:
+        return None
+    try:
+        with profiling.stage(f"sql {os.path.basename(file_path)}"):
+            view = _sql_view_cached(file_path, file_fingerprint(file_path), file_fingerprint(SQL_DB))
+    except Exception as e:
+        st.warning(f"Error querying {SQL_DB} for {file_path}: {e}")
+        return None
+    return view if view['index'] else None
+
+def refreshed_view(file_path):
+    """
+    Return the view data the background worker last published for an export,
+    with the warnings of that version and a note when a newer version of
+    the file was rejected.
+
+    Returns:
+    - view dict, or None if the worker is off, has not published one yet or
+      the shared store was cleared since
+    """
+    if not REFRESHER.running or file_path is None:
+        return None
+    key = REFRESHER.view_key(file_path)
+    if key is None:
+        return None
+    # Referenced by this session like any shared view, so it is not evicted while shown
+    st.session_state.setdefault('_view_keys', set()).add(key)
+    view = _session_lease().peek(key)
+    if view is None:
+        return None
+    status = REFRESHER.status(file_path)
+    if status['rejected']:
+        loaded = datetime.datetime.fromtimestamp(status['loaded'])
+        st.caption(
+            f"Showing {os.path.basename(file_path)} as loaded at {loaded:%H:%M:%S}; "
+            f"a newer version was not loaded: {status['rejected']}"
+        )
+    for warning in status['warnings']:
+        st.warning(f"{file_path}: {warning}.")
+    if view.get('problems'):
+        st.warning(f"{file_path}: {view['problems']} malformed value(s) were skipped.")
+    return view
+
+def sync_workbook():
+    """
+    Convert the workbook set in DASHBOARD_WORKBOOK into the snapshot store
+    if it changed, so its sheets are discovered like CSV exports. The xlsx
+    parse runs once per workbook version.
+    """
+    if not WORKBOOK:
+        return
+    try:
+        with profiling.stage("workbook"):
+            ingest_workbook(WORKBOOK)
+    except Exception as e:
+        st.warning(f"Error reading workbook {WORKBOOK}: {e}")
+
+def data_available(file_path):
+    """
+    Check whether a data file can be loaded, without loading it.
+    """
+    return file_fingerprint(file_path) is not None or has_fresh_snapshot(file_path)
 
 # ---------------------------
 # Mock Data Generation (Fallback)
@@ -129,43 +418,26 @@ def process_csv_data(df_overall, df_bu1):
 
 def generate_mock_data():
     """
-    Generate mock data dictionary for dashboard when CSV files are missing.
+    Generate mock data dictionary for dashboard when CSV files are missing:
+    the overall view data and the view data of each BU label.
     """
+    months = pd.PeriodIndex(['2025-01'] * 3 + ['2025-02'] * 3, freq='M')
+    mock_overall = pd.DataFrame({
+        'BU': pd.Categorical(['BU1', 'BU2', 'BU3'] * 2),
+        'Budget': [90000, 95000, 95000, 100000, 100000, 100000],
+        'Expense': [85000, 90000, 85000, 90000, 80000, 80000],
+        'Month': months
+    })
+    mock_bu1 = pd.DataFrame({
+        'Perspective': pd.Categorical(['Financial'] * 2),
+        'Subdiv': pd.Categorical(['Subdiv 1'] * 2),
+        'Budget': [90000, 100000],
+        'Expense': [85000, 90000],
+        'Month': pd.PeriodIndex(['2025-01', '2025-02'], freq='M')
+    })
     mock_data = {
-        'overall': {
-            'feb_budget': 300000,
-            'feb_expense': 250000,
-            'jan_budget': 280000,
-            'jan_expense': 230000,
-            'feb_data': pd.DataFrame({
-                'BU': ['BU1', 'BU2', 'BU3'],
-                'Budget': [100000, 100000, 100000],
-                'Expense': [90000, 80000, 80000],
-                'Month': ['2025-02', '2025-02', '2025-02']
-            }),
-            'jan_data': pd.DataFrame({
-                'BU': ['BU1', 'BU2', 'BU3'],
-                'Budget': [90000, 95000, 95000],
-                'Expense': [85000, 90000, 85000],
-                'Month': ['2025-01', '2025-01', '2025-01']
-            })
-        },
-        'bu1': {
-            'feb_budget': 100000,
-            'feb_expense': 90000,
-            'jan_budget': 90000,
-            'jan_expense': 85000,
-            'feb_data': pd.DataFrame({
-                'Budget Finance': [100000],
-                'Expense Finance': [90000],
-                'Bulan Quality': ['2025-02']
-            }),
-            'jan_data': pd.DataFrame({
-                'Budget Finance': [90000],
-                'Expense Finance': [85000],
-                'Bulan Quality': ['2025-01']
-            })
-        }
+        'overall': overall_view(mock_overall),
+        'bus': {'BU1': bu_view(mock_bu1)}
     }
     return mock_data
 
@@ -173,100 +445,306 @@ def generate_mock_data():
 # Visualization Functions
 # ---------------------------
 
-def plot_budget_vs_expense(df, title):
+def plot_budget_vs_expense(df, title, figure_json=None):
     """
     Plot a bar chart comparing Budget vs Expense from a dataframe.
-    Expects dataframe with columns 'Category', 'Budget', 'Expense' or their equivalents.
+    Expects dataframe with canonical 'Budget' and 'Expense' columns and a 'BU',
+    'Subdiv' or 'Category' column (or index level) to group the bars by,
+    such as a period slice of the Financial perspective table.
+    A figure precomputed for the same data (figure_json) is shown as is;
+    it is decoded once per process and shared through the figure cache.
     """
+    if figure_json is not None:
+        with profiling.stage("load figure"):
+            key = figure_key('plotly.io.from_json', (figure_json,), {})
+            fig = FIGURE_CACHE.get_or_build(key, lambda: pio.from_json(figure_json))
+        with profiling.stage("plotly_chart"):
+            st.plotly_chart(fig, use_container_width=True)
+        return
+
     if df is None or df.empty:
         st.info("No data available to plot.")
         return
 
+    if any(name is not None for name in df.index.names):
+        df = df.reset_index()
+
     # Determine which columns to use for Budget and Expense
     if 'Budget' in df.columns and 'Expense' in df.columns:
         budget_col = 'Budget'
         expense_col = 'Expense'
-        category_col = 'BU' if 'BU' in df.columns else 'Category'
-    elif 'Budget Finance' in df.columns and 'Expense Finance' in df.columns:
-        budget_col = 'Budget Finance'
-        expense_col = 'Expense Finance'
-        # For BU1, no explicit category column, create one for plotting
-        category_col = 'Category'
-        df = df.copy()
-        df[category_col] = 'BU1'
+        category_col = category_column(df)
     else:
         st.info("Data columns for Budget and Expense not found.")
         return
 
-    df_melted = df.melt(id_vars=[category_col], value_vars=[budget_col, expense_col], var_name='Type', value_name='Amount')
-    fig = px.bar(df_melted, x=category_col, y='Amount', color='Type', barmode='group', title=title)
-    st.plotly_chart(fig, use_container_width=True)
+    if category_col is None:
+        st.info("No BU or Subdiv column found to plot by.")
+        return
+
+    # Figure is memoized on the data and parameters (see figure_cache.py)
+    with profiling.stage("build figure", rows=len(df)):
+        fig = create_budget_vs_expense_chart(df, category_col, title, budget=budget_col, expense=expense_col)
+    with profiling.stage("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+def render_scorecards(series, period, key):
+    """
+    Show the month's scorecards for all entities or a picked one, with the
+    change from the picked comparison and a sparkline of recent months.
+    Each card is a lookup in the view's metric series (metric_series.py).
+    """
+    controls = st.columns(2)
+    label = ALL_LABEL
+    if len(series['labels']) > 1:
+        label = controls[0].selectbox(series['entity'], series['labels'], key=f"{key}_scope")
+    comparison = controls[1].selectbox(
+        "Compare with",
+        list(COMPARISONS),
+        format_func=lambda c: COMPARISONS[c][0],
+        key=f"{key}_compare"
+    )
+    points = [(card, series_point(series, label, period, card[1])) for card in SCORECARDS]
+    cards = [(card, point) for card, point in points if point is not None]
+    for col, ((title, _, suffix, unit), point) in zip(st.columns(max(1, len(cards))), cards):
+        with col:
+            create_scorecard(title, point['value'], point[comparison], suffix=suffix, change_unit=unit,
+                             compared_to=COMPARISONS[comparison][1], trend=point['sparkline'])
+
+def render_period_view(view, label, key):
+    """
+    Render one month of a view: a month picker, KPI scorecards with the
+    change from an earlier period, the rows and a chart.
+
+    Parameters:
+    - view: dict with
+      - 'index': period index from build_period_index
+      - 'kpis': optional KPI frame (kpi_engine.py); derived from the index
+        totals when missing
+      - 'series': optional metric series of the KPIs (metric_series.py);
+        built from them when missing
+      - 'reconciliation': optional KPI mismatches with the export's totals
+      - 'tables': optional perspective tables from split_perspectives; the
+        non-financial ones are shown for the selected month
+      - 'figures': optional precomputed figures ('YYYY-MM' -> figure JSON)
+    - label: display name used in headings, e.g. "BU1"
+    - key: unique widget key prefix for this view
+    """
+    index = view['index']
+    if not index:
+        st.info(f"No {label} data available.")
+        return
+    series = view.get('series')
+    if series is None:
+        kpis = view.get('kpis')
+        series = build_series(index_kpis(index) if kpis is None else kpis)
+
+    available = list(index)
+    period = st.selectbox(
+        "Month",
+        available[::-1],
+        format_func=lambda p: p.strftime('%B %Y'),
+        key=f"{key}_period"
+    )
+    entry = index[period]
+    render_scorecards(series, period, key)
+
+    month_label = period.strftime('%b %Y')
+    reconciliation = view.get('reconciliation')
+    if reconciliation is not None and not reconciliation.empty:
+        mismatches = reconciliation[reconciliation['Month'] == period]
+        if not mismatches.empty:
+            with st.expander(f"{len(mismatches)} figure(s) differ from the export's own totals ({month_label})"):
+                st.dataframe(mismatches, hide_index=True)
+
+    st.subheader(f"{period.strftime('%B %Y')} Data")
+    with profiling.stage("dataframe", rows=len(entry['data'])):
+        create_paginated_table(entry['data'], key=f"{key}_table")
+    figure_json = (view.get('figures') or {}).get(str(period))
+    plot_budget_vs_expense(entry['data'], period_chart_title(label, period), figure_json)
+
+    for perspective, table in (view.get('tables') or {}).items():
+        if perspective == 'Financial':
+            continue
+        months = table.index.get_level_values('Month')
+        if period not in months:
+            continue
+        with st.expander(f"{perspective} ({month_label})"):
+            create_paginated_table(table.xs(period, level='Month'), key=f"{key}_{perspective}_table")
 
 # ---------------------------
 # Main Dashboard Logic
 # ---------------------------
 
-def main():
-    st.title("BU Performance Dashboard (CSV Data)")
+OVERALL_VIEW = "Overall BU Performance"
 
-    # Load CSV files
-    df_overall = load_csv_data("Overall_BU.csv")
-    df_bu1 = load_csv_data("BU1.csv")
+# Seconds a cold start waits for the background worker's first poll before
+# loading views itself
+REFRESH_READY_TIMEOUT = 60
 
-    # Process data
-    data = process_csv_data(df_overall, df_bu1)
-
-    # If no data loaded, use mock data
-    if (df_overall is None) and (df_bu1 is None):
-        st.warning("CSV files not found. Using mock data.")
-        data = generate_mock_data()
-
-    # Tabs
-    tabs = st.tabs(["Overall BU Performance", "BU1", "BU2", "BU3"])
-
-    # Tab 1: Overall BU Performance
-    with tabs[0]:
-        st.header("Overall BU Performance")
-        if data['overall'].get('feb_data') is not None and not data['overall']['feb_data'].empty:
-            st.subheader("February 2025 Data")
-            st.dataframe(data['overall']['feb_data'])
-            plot_budget_vs_expense(data['overall']['feb_data'], "Overall BU Budget vs Expense (Feb 2025)")
+@st.fragment
+def render_overall_view(file_path, mock_data=None):
+    """
+    Overall BU Performance view. Loads and renders only the Overall_BU export.
+    """
+    st.header("Overall BU Performance")
+    # Fragment reruns are profiled on their own; full reruns absorb this run
+    with profiling.run("Overall view", enabled=st.session_state.get("_profile", False),
+                       history=_profile_history()), view_references():
+        refreshed = refreshed_view(file_path) if mock_data is None else None
+        artifact = precomputed(file_path) if mock_data is None and refreshed is None and file_path else None
+        sql_view = load_sql_view(file_path) if mock_data is None and refreshed is None and artifact is None and file_path else None
+        if mock_data is not None:
+            view = mock_data['overall']
+        elif refreshed is not None:
+            view = refreshed
+            if view.get('streamed'):
+                st.caption("Large export: showing per-BU monthly aggregates.")
+        elif artifact is not None:
+            view = artifact
+        elif sql_view is not None:
+            view = sql_view
+        elif file_path is None:
+            view = {'index': {}}
+        elif needs_streaming(file_path):
+            # Oversized export: serve the summary from streamed aggregates
+            view = load_streamed_summary(file_path)
+            st.caption("Large export: showing per-BU monthly aggregates.")
         else:
-            st.info("No Overall BU data available for February 2025.")
+            view = load_overall_data(file_path)
+        render_period_view(view, "Overall BU", key="overall")
 
-        if data['overall'].get('jan_data') is not None and not data['overall']['jan_data'].empty:
-            st.subheader("January 2025 Data")
-            st.dataframe(data['overall']['jan_data'])
-            plot_budget_vs_expense(data['overall']['jan_data'], "Overall BU Budget vs Expense (Jan 2025)")
-        else:
-            st.info("No Overall BU data available for January 2025.")
-
-    # Tab 2: BU1
-    with tabs[1]:
-        st.header("BU1 Performance")
-        if data['bu1'].get('feb_data') is not None and not data['bu1']['feb_data'].empty:
-            st.subheader("February 2025 Data")
-            st.dataframe(data['bu1']['feb_data'])
-            plot_budget_vs_expense(data['bu1']['feb_data'], "BU1 Budget vs Expense (Feb 2025)")
+@st.fragment
+def render_bu_view(label, file_path, mock_data=None):
+    """
+    Per-BU view. Loads and renders only that BU's export.
+    """
+    st.header(f"{label} Performance")
+    with profiling.run(f"{label} view", enabled=st.session_state.get("_profile", False),
+                       history=_profile_history()), view_references():
+        refreshed = refreshed_view(file_path) if mock_data is None else None
+        artifact = precomputed(file_path) if mock_data is None and refreshed is None else None
+        sql_view = load_sql_view(file_path) if mock_data is None and refreshed is None and artifact is None else None
+        if mock_data is not None:
+            view = mock_data['bus'][label]
+        elif refreshed is not None:
+            view = refreshed
+            if view.get('streamed'):
+                st.caption("Large export: showing per-subdiv and per-product monthly aggregates.")
+        elif artifact is not None:
+            view = artifact
+        elif sql_view is not None:
+            # Financial totals and breakdowns only; perspective tables stay in the database
+            view = sql_view
+        elif needs_streaming(file_path):
+            # Oversized export: serve the summary from streamed aggregates
+            view = load_streamed_summary(file_path)
+            st.caption("Large export: showing per-subdiv and per-product monthly aggregates.")
         else:
-            st.info("No BU1 data available for February 2025.")
+            view = load_bu_data(file_path)
+        render_period_view(view, label, key=label.lower())
 
-        if data['bu1'].get('jan_data') is not None and not data['bu1']['jan_data'].empty:
-            st.subheader("January 2025 Data")
-            st.dataframe(data['bu1']['jan_data'])
-            plot_budget_vs_expense(data['bu1']['jan_data'], "BU1 Budget vs Expense (Jan 2025)")
-        else:
-            st.info("No BU1 data available for January 2025.")
+def _profile_history():
+    """
+    This session's recent profiling runs; other sessions' runs are not
+    included.
+    """
+    if '_profile_runs' not in st.session_state:
+        st.session_state['_profile_runs'] = profiling.new_history()
+    return st.session_state['_profile_runs']
+
+def render_performance_panel(run):
+    """
+    Debug sidebar: the stages of the last rerun, shared store and figure
+    cache counters and a JSON-lines download of this session's recent runs
+    (see profiling.py).
+    """
+    with st.sidebar:
+        st.header("Performance")
+        if run is None:
+            return
+        st.caption(f"Last rerun: {run['seconds'] * 1000:,.0f} ms in {len(run['stages'])} stages")
+        if run['stages']:
+            stages = pd.DataFrame(run['stages'])
+            stages['ms'] = stages['seconds'] * 1000
+            st.dataframe(
+                stages[['stage', 'ms', 'rows', 'mem_delta_mb', 'thread']],
+                hide_index=True,
+                column_config={'ms': st.column_config.NumberColumn(format="%.1f"),
+                               'mem_delta_mb': st.column_config.NumberColumn("MB", format="%.1f")}
+            )
+        stats = run['stats'].get('shared_store')
+        if stats is not None:
+            st.caption(
+                f"Shared store: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+                f"{stats['entries']} entries ({stats['referenced']} in use by {stats['references']} references), "
+                f"{stats['bytes'] / 2**20:.1f} of {stats['max_bytes'] / 2**20:,.0f} MB, {stats['evictions']} evictions"
+            )
+        stats = run['stats'].get('figure_cache')
+        if stats is not None:
+            st.caption(
+                f"Figure cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+                f"{stats['entries']} entries, {stats['bytes'] / 2**20:.1f} MB, {stats['evictions']} evictions"
+            )
+        st.download_button(
+            "Download runs (JSON lines)",
+            profiling.to_jsonl(profiling.recent_runs(_profile_history())),
+            file_name="dashboard_profile.jsonl",
+            mime="application/x-ndjson"
+        )
+
+def render_views():
+    """
+    Discover the data files, warm the cache and draw the selected view.
+    """
+    if REFRESHER.running:
+        # The background worker loads every view; only a cold start waits for it
+        with profiling.stage("refresh wait"):
+            REFRESHER.wait_ready(REFRESH_READY_TIMEOUT)
+        if REFRESHER.workbook_error:
+            st.warning(f"Error reading workbook {WORKBOOK}: {REFRESHER.workbook_error}")
+    else:
+        sync_workbook()
+
+    # BU files are discovered from the data directory or sources file
+    sources = discover_sources()
+    overall_path = sources['overall'] if sources['overall'] and data_available(sources['overall']) else None
+    bu_paths = {label: path for label, path in sources['bus'].items() if data_available(path)}
+
+    # If no data file is available, use mock data
+    mock_data = None
+    if overall_path is None and not bu_paths:
+        st.warning("CSV files not found. Using mock data.")
+        mock_data = generate_mock_data()
+        bu_paths = dict.fromkeys(mock_data['bus'])
+    elif not REFRESHER.running:
+        # Warm the cache for every view at once; precomputed views need no load
+        # and oversized exports are streamed on demand
+        paths = [
+            p for p in [overall_path, *bu_paths.values()]
+            if p is not None and not needs_streaming(p) and precomputed(p) is None and load_sql_view(p) is None
+        ]
+        prefetch_csv_data(paths)
+
+    # One view per discovered BU; only the selected view is computed and drawn on each rerun
+    view = st.radio("View", [OVERALL_VIEW, *bu_paths], horizontal=True, label_visibility="collapsed", key="view")
+
+    if view == OVERALL_VIEW:
+        render_overall_view(overall_path, mock_data)
+    else:
+        render_bu_view(view, bu_paths[view], mock_data)
 
-    # Tab 3: BU2 placeholder
-    with tabs[2]:
-        st.header("BU2 Performance")
-        st.info("No BU2 data available yet.")
+def main():
+    st.title("BU Performance Dashboard (CSV Data)")
 
-    # Tab 4: BU3 placeholder
-    with tabs[3]:
-        st.header("BU3 Performance")
-        st.info("No BU3 data available yet.")
+    # Profiling: on for everyone with DASHBOARD_PROFILE=1, or per session with ?debug=1
+    st.session_state["_profile"] = profiling.PROFILE_ENABLED or st.query_params.get("debug") == "1"
+    if REFRESH_SECONDS > 0:
+        REFRESHER.start()
+    with profiling.run("rerun", enabled=st.session_state["_profile"], history=_profile_history()) as run:
+        render_views()
+    if st.session_state["_profile"]:
+        render_performance_panel(run)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_generator import START_MONTH, generate_bu_frame, generate_overall_frame
+from data_schema import BU_SCHEMA, DATE_FORMAT, OVERALL_SCHEMA, PERSPECTIVES
+
+# ---------------------------
+# Synthetic CSV exports
+# ---------------------------
+# Writes Overall_BU.csv / BU<n>.csv files in the exact production format:
+# BOM-prefixed header with the raw column names, CRLF line endings, '91%'
+# percent strings, dd/mm/yyyy month-end dates, 'Total <Mon>' summary rows and
+# BU sheets laid out as perspective blocks with empty cells for the columns
+# of other perspectives.
+#
+# Data is generated and written a chunk of months at a time, so memory stays
+# bounded by the chunk size whatever the total row count.
+#
+#   python synthetic_csv.py --out-dir synthetic --bus 100 --months 60 --subdivs 500
+
+LINE_TERMINATOR = '\r\n'
+DEFAULT_CHUNK_ROWS = 200_000
+
+
+def format_for_schema(df, schema):
+    """
+    Turn a typed frame back into the raw string columns of an export.
+
+    Args:
+        df (pd.DataFrame): Typed frame with canonical column names
+        schema (dict): Declared schema of the export (see data_schema.py)
+
+    Returns:
+        pd.DataFrame: String frame with the raw header names, in schema order
+    """
+    formatted = {}
+    for raw_name, (name, kind) in schema['columns'].items():
+        column = df[name]
+        if kind == 'category':
+            text = column.astype('string')
+        elif kind == 'month':
+            text = pd.Series(column.array.asfreq('D', how='end').strftime(DATE_FORMAT), index=df.index)
+        elif kind == 'int':
+            text = column.astype('Int64').astype('string')
+        elif kind == 'percent':
+            text = column.astype('float64').round().astype('Int64').astype('string') + '%'
+        else:
+            text = column.astype('float64').round(1).astype('string')
+        formatted[raw_name] = text.fillna('')
+    return pd.DataFrame(formatted, index=df.index)
+
+
+def _months_per_chunk(rows_per_month, chunk_rows):
+    return max(1, chunk_rows // max(1, rows_per_month))
+
+
+def _chunk_starts(n_months, months_per_chunk, start):
+    """Yield (chunk index, first month, number of months) for each chunk."""
+    first = pd.Period(start, 'M')
+    for index, offset in enumerate(range(0, n_months, months_per_chunk)):
+        yield index, str(first + offset), min(months_per_chunk, n_months - offset)
+
+
+def iter_overall_chunks(n_bus, n_months, seed=42, start=START_MONTH, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Generate an Overall_BU export as typed frames of at most ~chunk_rows rows.
+
+    Args:
+        n_bus (int): Number of business units
+        n_months (int): Number of months
+        seed (int): Random seed
+        start (str): First month, 'YYYY-MM'
+        chunk_rows (int): Target rows per chunk (at least one month per chunk)
+
+    Yields:
+        pd.DataFrame: Typed frames in file order
+    """
+    months_per_chunk = _months_per_chunk(n_bus + 1, chunk_rows)
+    for index, chunk_start, chunk_months in _chunk_starts(n_months, months_per_chunk, start):
+        yield generate_overall_frame(n_bus, chunk_months, seed=[seed, index], start=chunk_start)
+
+
+def iter_bu_chunks(n_subdivs, n_products, n_months, seed=42, start=START_MONTH, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Generate a BU export as typed frames of bounded size, in file order.
+
+    The file is laid out perspective by perspective, each block spanning all
+    months. Every chunk of months is regenerated from the same seed for each
+    block, so the blocks stay consistent without holding the whole file.
+
+    Args:
+        n_subdivs (int): Number of subdivisions
+        n_products (int): Number of products
+        n_months (int): Number of months
+        seed (int or list): Random seed
+        start (str): First month, 'YYYY-MM'
+        chunk_rows (int): Target rows per chunk (at least one month per chunk)
+
+    Yields:
+        pd.DataFrame: Typed frames in file order
+    """
+    months_per_chunk = _months_per_chunk(3 * n_subdivs + n_products, chunk_rows)
+    for perspective in PERSPECTIVES:
+        for index, chunk_start, chunk_months in _chunk_starts(n_months, months_per_chunk, start):
+            frame = generate_bu_frame(
+                n_subdivs, n_products, chunk_months, seed=[*np.atleast_1d(seed), index], start=chunk_start
+            )
+            yield frame[frame['Perspective'] == perspective]
+
+
+def write_csv(file_path, chunks, schema):
+    """
+    Stream typed chunks to a CSV file in the production export format.
+
+    Args:
+        file_path (str): Output path
+        chunks (iterable): Typed frames, in file order
+        schema (dict): Declared schema of the export
+
+    Returns:
+        int: Number of data rows written
+    """
+    rows = 0
+    with open(file_path, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write(','.join(schema['columns']) + LINE_TERMINATOR)
+        for chunk in chunks:
+            format_for_schema(chunk, schema).to_csv(f, header=False, index=False, lineterminator=LINE_TERMINATOR)
+            rows += len(chunk)
+    return rows
+
+
+def write_dataset(out_dir, n_bus=3, n_subdivs=6, n_products=5, n_months=2, bu_files=None, seed=42,
+                  start=START_MONTH, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Write an Overall_BU.csv and one BU<n>.csv per BU into a directory.
+
+    Args:
+        out_dir (str): Output directory (created if missing)
+        n_bus (int): Number of BUs in Overall_BU.csv
+        n_subdivs (int): Subdivisions per BU file
+        n_products (int): Products per BU file
+        n_months (int): Number of months
+        bu_files (int): Number of BU<n>.csv files to write (default: n_bus)
+        seed (int): Random seed
+        start (str): First month, 'YYYY-MM'
+        chunk_rows (int): Target rows generated and written at a time
+
+    Returns:
+        dict: File path -> number of data rows written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    written = {}
+
+    overall_path = os.path.join(out_dir, 'Overall_BU.csv')
+    written[overall_path] = write_csv(
+        overall_path, iter_overall_chunks(n_bus, n_months, seed, start, chunk_rows), OVERALL_SCHEMA
+    )
+
+    for bu in range(1, (n_bus if bu_files is None else bu_files) + 1):
+        bu_path = os.path.join(out_dir, f'BU{bu}.csv')
+        chunks = iter_bu_chunks(n_subdivs, n_products, n_months, [seed, bu], start, chunk_rows)
+        written[bu_path] = write_csv(bu_path, chunks, BU_SCHEMA)
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic BU exports in the production CSV format.")
+    parser.add_argument("--out-dir", default="synthetic", help="Output directory (default: %(default)s)")
+    parser.add_argument("--bus", type=int, default=3, help="BUs in Overall_BU.csv (default: %(default)s)")
+    parser.add_argument("--bu-files", type=int, default=None, help="BU<n>.csv files to write (default: --bus)")
+    parser.add_argument("--subdivs", type=int, default=6, help="Subdivisions per BU file (default: %(default)s)")
+    parser.add_argument("--products", type=int, default=5, help="Products per BU file (default: %(default)s)")
+    parser.add_argument("--months", type=int, default=2, help="Number of months (default: %(default)s)")
+    parser.add_argument("--start", default=START_MONTH, help="First month, YYYY-MM (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: %(default)s)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="Rows generated per chunk (default: %(default)s)")
+    args = parser.parse_args()
+
+    written = write_dataset(
+        args.out_dir, args.bus, args.subdivs, args.products, args.months,
+        bu_files=args.bu_files, seed=args.seed, start=args.start, chunk_rows=args.chunk_rows
+    )
+    for file_path, rows in written.items():
+        print(f"{file_path}: {rows:,} rows")
+
+
+if __name__ == "__main__":
+    main()
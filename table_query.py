@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------
+# Server-side table queries
+# ---------------------------
+# Filtering, search and sorting for the dashboard's tables run here, on the
+# frame held by the server, and resolve to an array of row positions. Only
+# the rows of the visible page are then taken from the frame and sent to the
+# browser, so the payload is bounded by the page size, not the row count.
+#
+# Label columns (BU, Subdiv, Product) are usually categoricals, so a search
+# is matched against the few distinct categories and then mapped to rows by
+# code instead of comparing strings row by row.
+
+LABEL_COLUMNS = ('BU', 'Subdiv', 'Product')
+
+
+def column_values(df, name):
+    """
+    Values of a column or named index level, as a positional Series.
+
+    Args:
+        df (pd.DataFrame): Table
+        name (str): Column or index level name
+
+    Returns:
+        pd.Series: Values in row order, with a default RangeIndex
+    """
+    if name in df.columns:
+        values = df[name]
+    else:
+        values = df.index.get_level_values(name).to_series()
+    return values.reset_index(drop=True)
+
+
+def label_columns(df):
+    """
+    Return the LABEL_COLUMNS present in a table, as columns or index levels.
+    """
+    names = set(df.columns) | {n for n in df.index.names if n is not None}
+    return [name for name in LABEL_COLUMNS if name in names]
+
+
+def _matching(values, search):
+    """Boolean array: values containing the search text, case-insensitively."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories
+        hits = categories[categories.astype(str).str.casefold().str.contains(search, regex=False)]
+        return values.isin(hits).to_numpy()
+    text = values.astype('string').str.casefold()
+    return text.str.contains(search, regex=False).fillna(False).to_numpy(dtype=bool)
+
+
+def select_rows(df, search=None, filters=None, sort_by=None, ascending=True):
+    """
+    Resolve a table query to row positions.
+
+    Args:
+        df (pd.DataFrame): Table
+        search (str): Text to look for in the label columns (None for all rows)
+        filters (dict): Column or index level -> values to keep; empty or None
+            lists keep everything
+        sort_by (str): Column or index level to sort by (None keeps row order)
+        ascending (bool): Sort direction; missing values always sort last
+
+    Returns:
+        np.ndarray: Positions of the matching rows, in display order
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for name, values in (filters or {}).items():
+        if values:
+            mask &= column_values(df, name).isin(values).to_numpy()
+
+    if search:
+        needle = search.strip().casefold()
+        found = np.zeros(len(df), dtype=bool)
+        for name in label_columns(df):
+            found |= _matching(column_values(df, name), needle)
+        mask &= found
+
+    positions = np.flatnonzero(mask)
+    if sort_by is not None and len(positions) > 1:
+        values = column_values(df, sort_by).iloc[positions].reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+def page_count(n_rows, page_size):
+    """Number of pages needed for n_rows rows, at least 1."""
+    return max(1, -(-n_rows // page_size))
+
+
+def page_rows(df, positions, page, page_size):
+    """
+    Take one page of a query result from the table.
+
+    Args:
+        df (pd.DataFrame): Table
+        positions (np.ndarray): Row positions from select_rows
+        page (int): Page number, starting at 1
+        page_size (int): Rows per page
+
+    Returns:
+        pd.DataFrame: The rows of that page
+    """
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
@@ -0,0 +1,138 @@
+import pandas as pd
+
+from background_refresh import Refresher
+from shared_store import SharedStore
+
+JAN, FEB = pd.Period('2025-01', 'M'), pd.Period('2025-02', 'M')
+
+
+def _export(tmp_path, text='BU,Budget\nBU1,600\n'):
+    path = str(tmp_path / 'BU1.csv')
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+
+def _refresher(path, views, store=None, settle=0):
+    """Refresher of one export whose builds return the given views in turn."""
+    builds = []
+
+    def build(file_path, overall, previous):
+        builds.append(previous)
+        view = views[min(len(builds), len(views)) - 1]
+        return view(file_path) if callable(view) else view
+
+    refresher = Refresher(
+        settle=settle,
+        discover=lambda: {'overall': None, 'bus': {'BU1': path}},
+        build=build,
+        store=store or SharedStore(ttl=None),
+    )
+    return refresher, builds
+
+
+def _view(*months, problems=0):
+    return {'index': {month: {} for month in months}, 'problems': problems}
+
+
+def test_recent_file_is_read_once_settled(tmp_path):
+    path = _export(tmp_path)
+    refresher, builds = _refresher(path, [_view(JAN)], settle=3600)
+
+    assert refresher.scan() == {}
+    assert builds == []
+    assert refresher.view(path) is None
+
+    refresher.settle = 0
+    refresher.scan()
+    assert refresher.view(path) == _view(JAN)
+
+
+def test_file_changed_between_polls_waits_for_the_next(tmp_path):
+    path = _export(tmp_path)
+    refresher, builds = _refresher(path, [_view(JAN), _view(JAN, FEB)])
+    refresher.scan()
+
+    _export(tmp_path, 'BU,Budget\nBU1,600\nBU1,480\n')
+    refresher.scan()
+    assert len(builds) == 1
+    refresher.scan()
+    assert refresher.view(path) == _view(JAN, FEB)
+    # The build was handed the version it replaces
+    assert builds[1] == _view(JAN)
+
+
+def test_version_changed_while_read_is_rejected(tmp_path):
+    path = _export(tmp_path)
+
+    def still_written(file_path):
+        with open(file_path, 'a') as f:
+            f.write('BU1,480\n')
+        return _view(JAN, FEB)
+
+    refresher, _ = _refresher(path, [_view(JAN), still_written])
+    refresher.scan()
+    _export(tmp_path, 'BU,Budget\nBU1,700\n')
+    refresher.scan()
+
+    errors = refresher.scan()
+
+    assert errors == {path: "file changed while it was read"}
+    assert refresher.view(path) == _view(JAN)
+    assert refresher.status(path)['rejected'] == "file changed while it was read"
+
+
+def test_version_without_months_is_rejected(tmp_path):
+    path = _export(tmp_path)
+    refresher, builds = _refresher(path, [_view(JAN), _view()])
+    refresher.scan()
+    _export(tmp_path, 'BU,Budget\n')
+    refresher.scan()
+
+    assert refresher.scan() == {path: "no months found"}
+    assert refresher.view(path) == _view(JAN)
+    # Not retried until the file changes again
+    refresher.scan()
+    assert len(builds) == 2
+
+
+def test_missing_month_is_warned_about(tmp_path):
+    path = _export(tmp_path)
+    refresher, _ = _refresher(path, [_view(JAN, FEB), _view(FEB, problems=2)])
+    refresher.scan()
+    _export(tmp_path, 'BU,Budget\nBU1,480\n')
+    refresher.scan()
+    refresher.scan()
+
+    assert refresher.view(path) == _view(FEB, problems=2)
+    assert refresher.status(path)['warnings'] == [
+        "2 malformed value(s), up from 0",
+        "1 month(s) no longer in the file, e.g. Jan 2025",
+    ]
+
+
+def test_missing_line_break_is_warned_about(tmp_path):
+    path = _export(tmp_path, 'BU,Budget\nBU1,600')
+    refresher, _ = _refresher(path, [_view(JAN)])
+    refresher.scan()
+
+    assert refresher.view(path) == _view(JAN)
+    assert refresher.status(path)['warnings'] == ["its last line has no line break"]
+
+
+def test_published_version_is_kept_until_replaced(tmp_path):
+    path = _export(tmp_path)
+    store = SharedStore(max_bytes=0, ttl=None)
+    refresher, _ = _refresher(path, [_view(JAN), _view(JAN, FEB)], store=store)
+    refresher.scan()
+    first = refresher.view_key(path)
+
+    # Over budget, but referenced by the worker
+    assert refresher.view(path) == _view(JAN)
+
+    _export(tmp_path, 'BU,Budget\nBU1,600\nBU1,480\n')
+    refresher.scan()
+    refresher.scan()
+    assert refresher.view(path) == _view(JAN, FEB)
+    assert first not in store
+    assert store.stats()['references'] == 1
@@ -0,0 +1,55 @@
+import json
+import os
+
+from bu_sources import discover_sources
+
+
+def _touch(data_dir, *names):
+    os.makedirs(data_dir, exist_ok=True)
+    for name in names:
+        with open(os.path.join(data_dir, name), 'w') as f:
+            f.write('')
+
+
+def test_exports_are_discovered_in_natural_order(tmp_path):
+    data_dir = str(tmp_path / 'data')
+    _touch(data_dir, 'BU10.csv', 'bu2.csv', 'BU1.csv', 'overall_bu.csv', 'notes.csv', 'BU3.xlsx')
+
+    sources = discover_sources(data_dir, store_dir=str(tmp_path / 'store'))
+
+    assert sources['overall'] == os.path.join(data_dir, 'overall_bu.csv')
+    assert list(sources['bus']) == ['BU1', 'BU2', 'BU10']
+    assert sources['bus']['BU2'] == os.path.join(data_dir, 'bu2.csv')
+
+
+def test_sources_file_in_the_data_dir_lists_the_exports(tmp_path):
+    data_dir = str(tmp_path / 'data')
+    _touch(data_dir, 'Overall_BU.csv', 'BU1.csv', 'BU2.csv')
+    with open(os.path.join(data_dir, 'sources.json'), 'w') as f:
+        json.dump({'overall': 'Overall_BU.csv', 'bus': {'Retail': 'exports/retail.csv', 'BU1': 'BU1.csv'}}, f)
+
+    sources = discover_sources(data_dir, store_dir=str(tmp_path / 'store'))
+
+    # Listed order and labels, paths relative to the data directory; BU2 is not listed
+    assert sources == {
+        'overall': os.path.join(data_dir, 'Overall_BU.csv'),
+        'bus': {'Retail': os.path.join(data_dir, 'exports', 'retail.csv'), 'BU1': os.path.join(data_dir, 'BU1.csv')},
+    }
+
+
+def test_sources_file_given_explicitly(tmp_path):
+    data_dir = str(tmp_path / 'data')
+    _touch(data_dir, 'BU1.csv')
+    sources_file = str(tmp_path / 'listing.json')
+    with open(sources_file, 'w') as f:
+        json.dump({'bus': {'BU1': 'BU1.csv'}}, f)
+
+    sources = discover_sources(data_dir, sources_file, store_dir=str(tmp_path / 'store'))
+
+    assert sources == {'overall': None, 'bus': {'BU1': os.path.join(data_dir, 'BU1.csv')}}
+
+
+def test_missing_data_dir_has_no_exports(tmp_path):
+    sources = discover_sources(str(tmp_path / 'missing'), store_dir=str(tmp_path / 'store'))
+
+    assert sources == {'overall': None, 'bus': {}}
@@ -0,0 +1,53 @@
+import pandas as pd
+
+from data_generator import generate_bu_frame, generate_mock_data, generate_overall_frame
+from period_index import build_period_index
+
+
+def _assert_same(a, b):
+    """Compare generated values, including frames nested in dicts and lists."""
+    if isinstance(a, pd.DataFrame):
+        pd.testing.assert_frame_equal(a, b)
+    elif isinstance(a, dict):
+        assert a.keys() == b.keys()
+        for key in a:
+            _assert_same(a[key], b[key])
+    elif isinstance(a, list):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            _assert_same(x, y)
+    else:
+        assert a == b
+
+
+def test_same_seed_generates_the_same_data():
+    _assert_same(generate_mock_data(n_bus=5, n_months=14, seed=3), generate_mock_data(n_bus=5, n_months=14, seed=3))
+    pd.testing.assert_frame_equal(generate_overall_frame(seed=3), generate_overall_frame(seed=3))
+    pd.testing.assert_frame_equal(generate_bu_frame(seed=3), generate_bu_frame(seed=3))
+
+
+def test_other_seed_generates_other_data():
+    assert not generate_overall_frame(seed=3).equals(generate_overall_frame(seed=4))
+    assert not generate_bu_frame(seed=3).equals(generate_bu_frame(seed=4))
+
+
+def test_overall_frame_has_a_row_per_bu_and_month_and_exact_totals():
+    df = generate_overall_frame(n_bus=40, n_months=15)
+
+    assert len(df) == 41 * 15
+    assert df['Month'].nunique() == 15
+    index = build_period_index(df)
+    for entry in index.values():
+        assert len(entry['data']) == 40
+        assert entry['reported_total']['Budget'] == entry['totals']['Budget']
+        assert entry['reported_total']['Needed MP'] == entry['totals']['Needed MP']
+
+
+def test_mock_data_scales_with_its_sizes():
+    data = generate_mock_data(n_bus=7, n_subdivs=5, n_products=2, n_months=18)
+
+    assert len(data['overall_budget']) == 7
+    assert len(data['bu_data']) == 7
+    # Long format: one trend row per BU and month
+    assert len(data['satisfaction_trend']) == 7 * 18
+    assert data['satisfaction_trend']['month'].nunique() == 18
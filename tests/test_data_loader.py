@@ -0,0 +1,56 @@
+import os
+import shutil
+
+import pandas as pd
+
+import snapshot_store
+from conftest import REPO_DIR
+from data_loader import bu_view, export_months, read_data_file, view_columns, view_months
+
+
+def _stored_sample(tmp_path, monkeypatch, name='BU1.csv'):
+    # Readers use the default store location, relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    shutil.copyfile(os.path.join(REPO_DIR, name), name)
+    snapshot_store.ingest_csv(name)
+    return name
+
+
+def test_view_months_limits_history_of_stored_exports(tmp_path, monkeypatch):
+    path = _stored_sample(tmp_path, monkeypatch)
+
+    assert view_months(path) is None
+    assert view_months(path, history=1) == ['2025-02']
+
+    df, _ = read_data_file(path, months=view_months(path, history=1), columns=view_columns(path))
+    assert set(df['Month']) == {pd.Period('2025-02', 'M')}
+    assert sorted(bu_view(df)['index']) == [pd.Period('2025-02', 'M')]
+
+
+def test_view_months_reads_every_month_of_unstored_csv(tmp_path):
+    path = str(tmp_path / 'BU1.csv')
+    shutil.copyfile(os.path.join(REPO_DIR, 'BU1.csv'), path)
+
+    assert view_months(path, history=1) is None
+
+
+def test_view_columns_read_the_whole_view(tmp_path, monkeypatch):
+    path = _stored_sample(tmp_path, monkeypatch)
+    full, _ = read_data_file(path)
+    pruned, _ = read_data_file(path, columns=view_columns(path) + ['Not a column'])
+
+    expected = bu_view(full)['tables']
+    actual = bu_view(pruned)['tables']
+    assert expected.keys() == actual.keys()
+    for perspective, table in expected.items():
+        pd.testing.assert_frame_equal(actual[perspective], table)
+
+
+def test_export_months_match_the_loaded_rows(tmp_path, monkeypatch):
+    csv_path = os.path.join(REPO_DIR, 'Overall_BU.csv')
+    df, _ = read_data_file(csv_path)
+    assert export_months(csv_path) == sorted(df['Month'].dropna().unique())
+
+    stored_path = _stored_sample(tmp_path, monkeypatch)
+    stored, _ = read_data_file(stored_path)
+    assert export_months(stored_path) == sorted(stored['Month'].unique())
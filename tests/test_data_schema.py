@@ -0,0 +1,95 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import REPO_DIR
+from data_schema import BU_SCHEMA, OVERALL_SCHEMA, PERSPECTIVES, apply_schema, read_typed_csv, split_perspectives
+
+HEADER = 'BU,Budget Finance,Usage Finance,Customer satisfaction Customer,Bulan Quality\n'
+
+
+def _read(text, **kwargs):
+    return read_typed_csv(io.BytesIO(text.encode('utf-8')), OVERALL_SCHEMA, **kwargs)
+
+
+def test_values_are_converted_to_their_declared_kinds():
+    df, problems = _read('﻿' + HEADER + 'BU1,600,91%,4.4,31/01/2025\nBU2,70000, 85 % ,4.2,28/02/2025\n')
+
+    assert problems == []
+    # The BOM is stripped from the first header name
+    assert list(df.columns) == ['BU', 'Budget', 'Usage', 'Customer satisfaction', 'Month']
+    assert df['BU'].dtype == 'category'
+    assert df['Budget'].dtype == pd.Int32Dtype()
+    assert df['Usage'].tolist() == [91.0, 85.0]
+    assert df['Customer satisfaction'].dtype == 'float32'
+    # dd/mm/yyyy, not mm/dd/yyyy
+    assert df['Month'].tolist() == [pd.Period('2025-01', 'M'), pd.Period('2025-02', 'M')]
+
+
+def test_malformed_values_are_reported():
+    text = HEADER + 'BU1,six hundred,91%,4.4,31/01/2025\nBU2,480,,4.2,02/31/2025\n'
+
+    df, problems = _read(text)
+
+    assert [(p['row'], p['column'], p['value'], p['reason']) for p in problems] == [
+        (0, 'Budget Finance', 'six hundred', 'not a valid int'),
+        (1, 'Bulan Quality', '02/31/2025', 'not a valid month'),
+    ]
+    # Reported rows are kept, the bad cells missing; a blank cell is not a problem
+    assert len(df) == 2
+    assert pd.isna(df['Budget'].iloc[0]) and pd.isna(df['Usage'].iloc[1])
+
+
+def test_rows_with_malformed_values_can_be_rejected_or_raise():
+    text = HEADER + 'BU1,600,91%,4.4,31/01/2025\nBU2,480,x%,4.2,28/02/2025\n'
+
+    df, problems = _read(text, on_error='reject')
+    assert df['BU'].tolist() == ['BU1']
+    assert list(df['BU'].cat.categories) == ['BU1']
+    assert len(problems) == 1
+
+    with pytest.raises(ValueError, match="1 malformed value"):
+        _read(text, on_error='raise')
+
+
+def test_missing_required_column_is_an_error():
+    raw = pd.DataFrame({'Budget Finance': ['600']}, dtype='string')
+    with pytest.raises(ValueError, match="missing required column"):
+        apply_schema(raw, OVERALL_SCHEMA)
+
+
+def test_apply_schema_offsets_reported_rows():
+    raw = pd.DataFrame({'BU': ['BU1'], 'Budget Finance': ['?'], 'Bulan Quality': ['31/01/2025']}, dtype='string')
+
+    _, problems = apply_schema(raw, OVERALL_SCHEMA, row_offset=10)
+
+    assert problems[0]['row'] == 10
+
+
+def test_bu_sheet_is_split_into_dense_perspective_tables():
+    df, _ = read_typed_csv(os.path.join(REPO_DIR, 'BU1.csv'), BU_SCHEMA)
+
+    tables = split_perspectives(df)
+
+    assert sorted(tables) == sorted(PERSPECTIVES)
+    for perspective, table in tables.items():
+        key, columns = PERSPECTIVES[perspective]
+        rows = df[df['Perspective'] == perspective]
+        assert table.index.names == ['Month', key]
+        assert list(table.columns) == columns
+        assert table.index.is_monotonic_increasing
+        assert len(table) == len(rows)
+        # Only the keys of the perspective's own rows are left
+        assert set(table.index.get_level_values(key).categories) == set(rows[key].dropna())
+    customers = tables['Customer n Service']
+    assert customers.loc[(pd.Period('2025-01', 'M'), 'PRODUK 1'), '#of customer'] == 10
+
+
+def test_frame_without_perspectives_has_no_tables():
+    df, _ = read_typed_csv(os.path.join(REPO_DIR, 'BU1.csv'), BU_SCHEMA)
+
+    assert split_perspectives(df.iloc[:0]) == {}
+    assert split_perspectives(df.drop(columns='Perspective')) == {}
+    assert split_perspectives(df[df['Perspective'] == 'Financial']).keys() == {'Financial'}
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from downsample import downsample_frame, lttb_indices
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Month': pd.period_range('2000-01', periods=n, freq='M'),
+        'Amount': rng.normal(size=n).cumsum(),
+    })
+
+
+def test_lttb_keeps_the_first_and_last_points():
+    x = np.arange(100, dtype='float64')
+    y = np.sin(x / 5)
+
+    kept = lttb_indices(x, y, 10)
+
+    assert len(kept) == 10
+    assert kept[0] == 0 and kept[-1] == 99
+    assert (np.diff(kept) > 0).all()
+
+
+def test_each_series_is_cut_to_max_points():
+    data = pd.concat([_series(500).assign(Type='Budget'), _series(300, seed=1).assign(Type='Expense')])
+    # Rows arrive out of x order
+    data = data.sample(frac=1, random_state=0)
+
+    result = downsample_frame(data, 'Month', 'Amount', 50, group='Type')
+
+    for name, series in result.groupby('Type'):
+        assert len(series) == 50
+        assert series['Month'].is_monotonic_increasing
+        full = data[data['Type'] == name].sort_values('Month')
+        assert series['Month'].iloc[0] == full['Month'].iloc[0]
+        assert series['Month'].iloc[-1] == full['Month'].iloc[-1]
+
+
+def test_short_series_is_kept_whole():
+    data = _series(20)
+    assert downsample_frame(data, 'Month', 'Amount', 50).equals(data)
+
+
+def test_categorical_x_keeps_the_input_order():
+    labels = [f"Subdiv {n}" for n in range(200)]
+    # Not in lexical order: 'Subdiv 10' would sort before 'Subdiv 2'
+    data = pd.DataFrame({'Subdiv': labels, 'Amount': np.sin(np.arange(200) / 7)})
+
+    result = downsample_frame(data, 'Subdiv', 'Amount', 40)
+
+    assert len(result) == 40
+    assert result.index.is_monotonic_increasing
+    assert result['Subdiv'].iloc[0] == 'Subdiv 0' and result['Subdiv'].iloc[-1] == 'Subdiv 199'
@@ -0,0 +1,106 @@
+import csv
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+import excel_ingest
+from bu_sources import discover_sources
+from conftest import REPO_DIR
+from data_loader import read_data_file
+from data_schema import BU_SCHEMA, OVERALL_SCHEMA, read_typed_csv
+
+
+def _workbook(tmp_path, content=b'workbook v1'):
+    path = str(tmp_path / 'BU_Performance.xlsx')
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def test_workbook_without_known_sheets_is_parsed_once(tmp_path, monkeypatch):
+    store_dir = str(tmp_path / 'store')
+    path = _workbook(tmp_path)
+    calls = []
+    monkeypatch.setattr(excel_ingest, 'read_workbook', lambda file_path: calls.append(file_path) or {})
+
+    assert excel_ingest.ingest_workbook(path, store_dir) == []
+    assert excel_ingest.ingest_workbook(path, store_dir) == []
+    assert len(calls) == 1
+
+    _workbook(tmp_path, b'workbook v2')
+    excel_ingest.ingest_workbook(path, store_dir)
+    assert len(calls) == 2
+
+
+def test_sheet_not_named_bu_n_is_discovered(tmp_path, monkeypatch):
+    store_dir = str(tmp_path / 'store')
+    data_dir = str(tmp_path / 'data')
+    os.makedirs(data_dir)
+    path = _workbook(tmp_path)
+    typed = read_data_file(os.path.join(REPO_DIR, 'BU1.csv'))
+    monkeypatch.setattr(excel_ingest, 'read_workbook', lambda file_path: {
+        excel_ingest._source_key('bu3', excel_ingest.BU_SCHEMA): typed,
+        excel_ingest._source_key(' Retail ', excel_ingest.BU_SCHEMA): typed,
+    })
+
+    assert excel_ingest.ingest_workbook(path, store_dir) == ['BU3.csv', 'Retail.csv']
+
+    sources = discover_sources(data_dir, store_dir=store_dir)
+    assert sources['bus'] == {
+        'BU3': os.path.join(data_dir, 'BU3.csv'),
+        'Retail': os.path.join(data_dir, 'Retail.csv'),
+    }
+
+
+def _write_sheet(worksheet, csv_path):
+    """Copy a CSV export into a sheet as Excel would hold it: numbers, dates and percent-formatted fractions."""
+    with open(csv_path, encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.reader(f))
+    worksheet.append(rows[0])
+    for row in rows[1:]:
+        worksheet.append([None] * len(row))
+        for column, text in enumerate(row, start=1):
+            cell = worksheet.cell(row=worksheet.max_row, column=column)
+            if text == '':
+                continue
+            if text.endswith('%'):
+                cell.value = float(text[:-1]) / 100
+                cell.number_format = '0%'
+            elif text.count('/') == 2:
+                cell.value = datetime.datetime.strptime(text, '%d/%m/%Y')
+            else:
+                try:
+                    cell.value = int(text)
+                except ValueError:
+                    try:
+                        cell.value = float(text)
+                    except ValueError:
+                        cell.value = text
+
+
+def test_workbook_sheets_match_the_csv_exports(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.Workbook()
+    _write_sheet(workbook.active, os.path.join(REPO_DIR, 'Overall_BU.csv'))
+    workbook.active.title = 'Overall'
+    _write_sheet(workbook.create_sheet('bu1'), os.path.join(REPO_DIR, 'BU1.csv'))
+    workbook.create_sheet('Notes').append(['Prepared by', 'Finance'])
+    path = str(tmp_path / 'BU_Performance.xlsx')
+    workbook.save(path)
+
+    sheets = excel_ingest.read_workbook(path)
+
+    assert list(sheets) == ['Overall_BU.csv', 'BU1.csv']
+    for source_key, schema in (('Overall_BU.csv', OVERALL_SCHEMA), ('BU1.csv', BU_SCHEMA)):
+        expected, expected_problems = read_typed_csv(os.path.join(REPO_DIR, source_key), schema)
+        actual, problems = sheets[source_key]
+        assert set(actual.columns) == set(expected.columns)
+        assert len(problems) == len(expected_problems)
+        pd.testing.assert_frame_equal(actual, expected[actual.columns], check_categorical=False)
+
+    bu = sheets['BU1.csv'][0]
+    # Customer rows have a blank Subdiv; percent cells hold fractions
+    assert bu.loc[bu['Perspective'] == 'Customer n Service', 'Subdiv'].isna().all()
+    assert bu['Usage'].dropna().iloc[0] == 90
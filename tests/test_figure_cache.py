@@ -0,0 +1,55 @@
+import json
+
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+from figure_cache import FigureCache, figure_key
+
+
+def _builder(calls):
+    def build(data):
+        calls.append(len(data))
+        return px.bar(data, x='BU', y='Budget')
+    return build
+
+
+def test_equal_inputs_hit_without_construction():
+    cache = FigureCache()
+    calls = []
+    build = _builder(calls)
+    first_data = pd.DataFrame({'BU': ['BU1', 'BU2'], 'Budget': [600, 480]})
+    second_data = first_data.copy()
+
+    first = cache.get_or_build(figure_key('bar', (first_data,), {}), lambda: build(first_data))
+    second = cache.get_or_build(figure_key('bar', (second_data,), {}), lambda: build(second_data))
+
+    assert second is first
+    assert calls == [2]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_cached_figure_reuses_its_json():
+    cache = FigureCache()
+    data = pd.DataFrame({'BU': ['BU1', 'BU2'], 'Budget': [600, 480]})
+    fig = cache.get_or_build('key', lambda: px.bar(data, x='BU', y='Budget'))
+
+    figure_json = fig.to_json()
+    assert cache.stats()['bytes'] == len(figure_json)
+    assert fig.to_dict() == json.loads(figure_json)
+    # Callers get a fresh dict: the cached JSON cannot be altered through it
+    fig.to_dict()['layout']['title'] = 'changed'
+    assert fig.to_dict() == json.loads(figure_json)
+    assert json.loads(pio.to_json(fig)) == json.loads(figure_json)
+
+
+def test_entries_are_evicted_by_json_size():
+    data = pd.DataFrame({'BU': ['BU1', 'BU2'], 'Budget': [600, 480]})
+    size = len(px.bar(data, x='BU', y='Budget').to_json())
+    cache = FigureCache(max_bytes=size * 2)
+
+    for key in ('a', 'b', 'c'):
+        cache.get_or_build(key, lambda: px.bar(data, x='BU', y='Budget'))
+
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import pandas as pd
+
+import incremental_ingest
+from conftest import REPO_DIR
+from data_loader import bu_view, read_data_file
+
+
+def _copy_sample(tmp_path, name='BU1.csv'):
+    path = str(tmp_path / name)
+    shutil.copyfile(os.path.join(REPO_DIR, name), path)
+    return path
+
+
+def _employee_rows(view, month):
+    table = view['tables']['Employee']
+    return table.xs(pd.Period(month, 'M'), level='Month')
+
+
+def test_unterminated_last_row_is_read(tmp_path):
+    path = _copy_sample(tmp_path)
+    with open(path, 'rb') as f:
+        content = f.read()
+    with open(path, 'wb') as f:
+        f.write(content.rstrip(b'\r\n'))
+
+    view, _, info = incremental_ingest.ingest(path, overall=False)
+    incremental_ingest.forget(path)
+
+    assert info['mode'] == 'full'
+    df, _ = read_data_file(path)
+    assert 'Subdiv 6' in _employee_rows(view, '2025-02').index
+    assert info['rows'] == len(df)
+
+
+def test_completed_last_row_is_read_once(tmp_path):
+    path = _copy_sample(tmp_path)
+    with open(path, 'rb') as f:
+        content = f.read()
+    with open(path, 'wb') as f:
+        f.write(content.rstrip(b'\r\n'))
+    incremental_ingest.ingest(path, overall=False)
+
+    # The writer finishes the line: the file is read again in full, not
+    # appended to, so the row is not counted twice
+    with open(path, 'wb') as f:
+        f.write(content)
+    view, _, info = incremental_ingest.ingest(path, overall=False)
+    incremental_ingest.forget(path)
+
+    assert info['mode'] == 'full'
+    df, _ = read_data_file(path)
+    expected = bu_view(df)
+    pd.testing.assert_frame_equal(view['kpis'], expected['kpis'])
+
+
+def test_appended_month_matches_full_read(tmp_path):
+    path = _copy_sample(tmp_path)
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    january = [line for line in lines if b'/02/2025' not in line]
+    with open(path, 'wb') as f:
+        f.writelines(january)
+    previous, _, _ = incremental_ingest.ingest(path, overall=False)
+
+    with open(path, 'wb') as f:
+        f.writelines(january + [line for line in lines if b'/02/2025' in line])
+    view, _, info = incremental_ingest.ingest(path, overall=False, previous=previous)
+    incremental_ingest.forget(path)
+
+    assert info['mode'] == 'append'
+    expected = bu_view(read_data_file(path)[0])
+    pd.testing.assert_frame_equal(view['kpis'], expected['kpis'])
+    assert list(view['index']) == list(expected['index'])
+
+
+def test_append_without_previous_view_reads_in_full(tmp_path):
+    path = _copy_sample(tmp_path)
+    incremental_ingest.ingest(path, overall=False)
+    with open(path, 'ab') as f:
+        f.write(b'\r\n')
+    _, _, info = incremental_ingest.ingest(path, overall=False)
+    incremental_ingest.forget(path)
+
+    assert info['mode'] == 'full'
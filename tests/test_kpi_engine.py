@@ -0,0 +1,54 @@
+import math
+import os
+
+import pandas as pd
+
+from conftest import REPO_DIR
+from data_loader import read_data_file
+from kpi_engine import ALL_LABEL, overall_kpis, reconcile
+
+
+def _overall():
+    df, _ = read_data_file(os.path.join(REPO_DIR, 'Overall_BU.csv'))
+    return df
+
+
+def _move_month(df, source, target):
+    df = df.copy()
+    df.loc[df['Month'] == pd.Period(source, 'M'), 'Month'] = pd.Period(target, 'M')
+    return df
+
+
+def test_change_is_taken_from_the_previous_month():
+    kpis = overall_kpis(_overall())
+
+    row = kpis.loc[(pd.Period('2025-02', 'M'), 'BU1')]
+    assert row['Budget MoM %'] == 0
+    assert math.isclose(row['Usage % MoM change'], 566 / 6 - 548 / 6)
+
+
+def test_no_change_across_a_gap_month():
+    df = _overall()
+    # Jan, then the Feb rows filed as Apr: nothing to compare Apr with
+    gapped = pd.concat([df, _move_month(df[df['Month'] == pd.Period('2025-02', 'M')], '2025-02', '2025-04')])
+    gapped = gapped[gapped['Month'] != pd.Period('2025-02', 'M')]
+
+    kpis = overall_kpis(gapped)
+
+    april = kpis.xs(pd.Period('2025-04', 'M'), level='Month')
+    assert april['Budget MoM %'].isna().all()
+    assert april['Usage % MoM change'].isna().all()
+    assert not april['Usage %'].isna().any()
+
+
+def test_reconcile_reports_a_differing_total():
+    df = _overall()
+    df = df[df['Month'] == pd.Period('2025-01', 'M')].copy()
+    assert reconcile(overall_kpis(df), df, 'BU').empty
+
+    df.loc[df['BU'] == 'Total Jan', 'Budget'] = 1700
+    mismatches = reconcile(overall_kpis(df), df, 'BU')
+
+    assert mismatches[['BU', 'KPI']].values.tolist() == [[ALL_LABEL, 'Budget']]
+    row = mismatches.iloc[0]
+    assert (row['Computed'], row['Reported'], row['Difference']) == (1680, 1700, -20)
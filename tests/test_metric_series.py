@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpi_engine import ALL_LABEL, compute_kpis
+from metric_series import build_series, series_point, update_series
+
+
+def _rows(months, seed=0):
+    """Typed Overall-like rows of two BUs for each of the months."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for month in months:
+        for bu in ('BU1', 'BU2'):
+            budget = int(rng.integers(400, 800))
+            rows.append({
+                'BU': bu, 'Month': pd.Period(month, 'M'),
+                'Budget': budget, 'Expense': int(budget * rng.uniform(0.6, 1.1)),
+                'Revenue': int(rng.integers(3000, 8000)), 'Profit': int(rng.integers(500, 3000)),
+            })
+    return pd.DataFrame(rows)
+
+
+# Sixteen months with 2024-07 missing
+MONTHS = [str(p) for p in pd.period_range('2024-01', '2025-05', freq='M') if str(p) != '2024-07']
+
+
+@pytest.mark.parametrize('new_month', ['2025-05', '2024-08'], ids=['appended', 'after-gap'])
+def test_update_series_matches_a_full_build(new_month):
+    months = MONTHS[:MONTHS.index(new_month) + 1]
+    df = _rows(months)
+    before = df[df['Month'] != pd.Period(new_month, 'M')]
+    kpis = compute_kpis(df, 'BU')
+
+    updated = update_series(build_series(compute_kpis(before, 'BU')), kpis, [pd.Period(new_month, 'M')])
+
+    assert updated == build_series(kpis)
+
+
+def test_update_series_of_a_replaced_month_matches_a_full_build():
+    df = _rows(MONTHS)
+    replaced = _rows(['2024-10'], seed=1)
+    revised = pd.concat([df[df['Month'] != pd.Period('2024-10', 'M')], replaced])
+    kpis = compute_kpis(revised, 'BU')
+
+    updated = update_series(build_series(compute_kpis(df, 'BU')), kpis, [pd.Period('2024-10', 'M')])
+
+    assert updated == build_series(kpis)
+
+
+def test_comparisons_across_the_gap_month():
+    series = build_series(compute_kpis(_rows(MONTHS), 'BU'))
+
+    point = series_point(series, ALL_LABEL, pd.Period('2024-08', 'M'), 'Budget')
+    assert point['MoM'] is None
+    # The 3-month average needs all three months before
+    assert series_point(series, ALL_LABEL, pd.Period('2024-10', 'M'), 'Budget')['3M'] is None
+    assert series_point(series, ALL_LABEL, pd.Period('2024-11', 'M'), 'Budget')['3M'] is not None
+    assert series_point(series, ALL_LABEL, pd.Period('2025-07', 'M'), 'Budget') is None
+    year_on = series_point(series, ALL_LABEL, pd.Period('2025-01', 'M'), 'Budget')
+    assert year_on['YoY'] is not None and year_on['MoM'] is not None
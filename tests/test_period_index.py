@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+
+from conftest import REPO_DIR
+from data_loader import read_data_file
+from data_schema import split_perspectives
+from period_index import build_period_index, total_row_mask
+
+JAN, FEB = pd.Period('2025-01', 'M'), pd.Period('2025-02', 'M')
+
+
+def _overall():
+    df, _ = read_data_file(os.path.join(REPO_DIR, 'Overall_BU.csv'))
+    return df
+
+
+def test_total_row_mask_flags_summary_rows():
+    df = _overall()
+
+    assert df.loc[total_row_mask(df).to_numpy(), 'BU'].tolist() == ['Total Jan', 'Total Feb']
+    # Plain string labels too; a frame without the label column has none
+    assert total_row_mask(df.astype({'BU': 'string'})).sum() == 2
+    assert not total_row_mask(df, 'Subdiv').any()
+
+
+def test_periods_hold_their_rows_and_totals():
+    index = build_period_index(_overall())
+
+    assert list(index) == [JAN, FEB]
+    january = index[JAN]
+    assert january['data']['BU'].tolist() == ['BU1', 'BU2', 'BU3']
+    assert january['totals']['Budget'] == 1680
+    assert january['totals']['Expense'] == 548 + 425 + 402
+    assert january['reported_total']['BU'] == 'Total Jan'
+
+
+def test_sums_do_not_overflow_compact_integers():
+    df = _overall()
+    df = df[df['Month'] == JAN].astype({'Budget': 'Int16'})
+    df = pd.concat([df] * 30)
+
+    totals = build_period_index(df)[JAN]['totals']
+
+    assert totals['Budget'] == 1680 * 30
+
+
+def test_tables_indexed_by_month_are_sliced_by_key():
+    df, _ = read_data_file(os.path.join(REPO_DIR, 'BU1.csv'))
+    financial = split_perspectives(df)['Financial']
+
+    index = build_period_index(financial, label_column='Subdiv')
+
+    assert list(index) == [JAN, FEB]
+    assert index[FEB]['data'].index.name == 'Subdiv'
+    assert index[FEB]['totals']['Budget'] == financial.xs(FEB, level='Month')['Budget'].sum()
+    assert index[FEB]['reported_total'] is None
@@ -0,0 +1,45 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import REPO_DIR
+from precompute import load_artifact, load_artifact_manifest, precompute
+
+
+@pytest.fixture
+def precomputed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / 'BU1.csv')
+    shutil.copyfile(os.path.join(REPO_DIR, 'BU1.csv'), path)
+    artifact_dir = str(tmp_path / 'artifacts')
+    assert precompute({'overall': None, 'bus': {'BU1': path}}, artifact_dir) == {}
+    return path, artifact_dir
+
+
+def test_fresh_artifact_is_loaded(precomputed):
+    path, artifact_dir = precomputed
+
+    view = load_artifact(path, artifact_dir)
+
+    assert load_artifact_manifest(artifact_dir)['sources']['BU1.csv']['periods'] == 2
+    assert sorted(str(period) for period in view['index']) == ['2025-01', '2025-02']
+    assert sorted(view['figures']) == ['2025-01', '2025-02']
+
+
+def test_stale_artifact_is_not_loaded(precomputed):
+    path, artifact_dir = precomputed
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n')
+
+    assert load_artifact(path, artifact_dir) is None
+
+
+def test_artifact_of_a_missing_csv_is_loaded(precomputed):
+    path, artifact_dir = precomputed
+    os.remove(path)
+
+    view = load_artifact(path, artifact_dir)
+
+    assert view is not None and len(view['index']) == 2
+    assert load_artifact(os.path.join(os.path.dirname(path), 'BU2.csv'), artifact_dir) is None
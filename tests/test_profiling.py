@@ -0,0 +1,16 @@
+import profiling
+
+
+def test_runs_are_kept_per_history():
+    first, second = profiling.new_history(), profiling.new_history()
+
+    with profiling.run('first session', history=first):
+        with profiling.stage('load'):
+            pass
+    with profiling.run('second session', history=second):
+        pass
+
+    assert [record['name'] for record in profiling.recent_runs(first)] == ['first session']
+    assert [record['name'] for record in profiling.recent_runs(second)] == ['second session']
+    assert '"stage": "load"' in profiling.to_jsonl(profiling.recent_runs(first))
+    assert 'first session' not in profiling.to_jsonl(profiling.recent_runs(second))
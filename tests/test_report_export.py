@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from bu_sources import discover_sources
+from report_export import PLOTLY_FILE_NAME, export_reports
+from synthetic_csv import write_dataset
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    # Views are loaded with the default store location, relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    data_dir = str(tmp_path / 'data')
+    write_dataset(data_dir, n_bus=2, n_subdivs=2, n_products=2, n_months=3)
+    return discover_sources(data_dir)
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_export_writes_index_and_one_page_per_view(tmp_path, sources):
+    out_dir = str(tmp_path / 'reports')
+    sources['bus']['Missing'] = str(tmp_path / 'data' / 'Missing.csv')
+
+    results = export_reports(sources, out_dir, max_workers=2)
+
+    assert [result['label'] for result in results] == ['Overall BU', 'BU1', 'BU2', 'Missing']
+    assert sorted(os.listdir(out_dir)) == ['BU1.html', 'BU2.html', 'index.html', 'overall.html']
+    assert 'error' in results[-1]
+    index = _read(os.path.join(out_dir, 'index.html'))
+    assert '<a href="BU1.html">BU1</a>' in index
+    assert 'Missing</td><td colspan="4">Failed: ' in index
+    page = _read(os.path.join(out_dir, 'BU1.html'))
+    assert 'BU1 Performance' in page and 'Budget vs Expense' in page
+
+
+def test_shared_plotly_is_written_once(tmp_path, sources):
+    inline_dir = str(tmp_path / 'inline')
+    shared_dir = str(tmp_path / 'shared')
+    export_reports(sources, inline_dir, max_workers=1)
+    export_reports(sources, shared_dir, max_workers=1, shared_plotly=True)
+
+    assert os.path.exists(os.path.join(shared_dir, PLOTLY_FILE_NAME))
+    page = _read(os.path.join(shared_dir, 'BU1.html'))
+    assert f'src="{PLOTLY_FILE_NAME}"' in page
+    inline_size = os.path.getsize(os.path.join(inline_dir, 'BU1.html'))
+    plotly_size = os.path.getsize(os.path.join(shared_dir, PLOTLY_FILE_NAME))
+    assert os.path.getsize(os.path.join(shared_dir, 'BU1.html')) < inline_size - plotly_size // 2
@@ -0,0 +1,89 @@
+import numpy as np
+
+import shared_store
+from shared_store import Lease, SharedStore, estimate_bytes
+
+# Each value is 8 KB; the store below holds two of them
+VALUE_BYTES = estimate_bytes(np.zeros(1000))
+
+
+def _store(**kwargs):
+    return SharedStore(max_bytes=2 * VALUE_BYTES + VALUE_BYTES // 2, ttl=None, **kwargs)
+
+
+def _builder(builds):
+    def build():
+        builds.append(1)
+        return np.zeros(1000)
+    return build
+
+
+def test_leased_entry_survives_budget_pressure():
+    store = _store()
+    lease = Lease(store)
+    lease.get('a', _builder([]))
+    store.get('b', _builder([]))
+    store.get('c', _builder([]))
+
+    assert 'a' in store
+    assert 'b' not in store
+    assert 'c' in store
+    assert store.stats()['evictions'] == 1
+
+
+def test_unleased_entry_is_evicted_least_recently_used():
+    store = _store()
+    store.get('a', _builder([]))
+    store.get('b', _builder([]))
+    store.get('a', _builder([]))
+    store.get('c', _builder([]))
+
+    assert ['a' in store, 'b' in store, 'c' in store] == [True, False, True]
+
+
+def test_released_entry_can_be_evicted():
+    store = _store()
+    lease = Lease(store)
+    lease.get('a', _builder([]))
+    lease.get('b', _builder([]))
+    lease.get('c', _builder([]))
+    assert store.stats()['entries'] == 3
+
+    lease.keep_only(['c'])
+
+    assert 'a' not in store and 'c' in store
+
+
+def test_expired_entry_is_rebuilt(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(shared_store.time, 'monotonic', lambda: now[0])
+    store = SharedStore(ttl=10)
+    lease = Lease(store)
+    builds = []
+    store.get('a', _builder(builds))
+    lease.get('held', _builder([]))
+
+    now[0] += 20
+    store.get('b', _builder([]))
+    assert 'a' not in store
+    assert 'held' in store
+
+    store.get('a', _builder(builds))
+    assert len(builds) == 2
+
+
+def test_clear_drops_lease_references():
+    store = _store()
+    lease = Lease(store)
+    lease.get('a', _builder([]))
+    store.clear()
+
+    # Fetched again after the clear, the entry is referenced by the lease
+    lease.get('a', _builder([]))
+    assert store.stats()['references'] == 1
+    store.get('b', _builder([]))
+    store.get('c', _builder([]))
+    assert 'a' in store
+
+    lease.close()
+    assert store.stats()['references'] == 0
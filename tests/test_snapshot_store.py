@@ -0,0 +1,32 @@
+import os
+import shutil
+
+import pandas as pd
+
+from conftest import REPO_DIR
+from data_loader import read_data_file
+from snapshot_store import has_fresh_snapshot, ingest_csv, list_months, read_snapshot_for_file
+
+
+def _without_month(path, day_month_year):
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(path, 'wb') as f:
+        f.writelines(line for line in lines if day_month_year.encode() not in line)
+
+
+def test_reingest_removes_deleted_month(tmp_path):
+    store_dir = str(tmp_path / 'store')
+    path = str(tmp_path / 'BU1.csv')
+    shutil.copyfile(os.path.join(REPO_DIR, 'BU1.csv'), path)
+    ingest_csv(path, store_dir)
+    assert list_months('bu', 'BU1', store_dir) == [pd.Period('2025-01', 'M'), pd.Period('2025-02', 'M')]
+
+    _without_month(path, '/02/2025')
+    ingest_csv(path, store_dir)
+
+    assert has_fresh_snapshot(path, store_dir)
+    assert list_months('bu', 'BU1', store_dir) == [pd.Period('2025-01', 'M')]
+    stored = read_snapshot_for_file(path, store_dir=store_dir)
+    assert set(stored['Month']) == {pd.Period('2025-01', 'M')}
+    assert len(stored) == len(read_data_file(path)[0].dropna(subset=['Month']))
@@ -0,0 +1,67 @@
+import math
+import os
+import shutil
+
+import pandas as pd
+
+import sql_backend
+from conftest import REPO_DIR
+from data_loader import bu_view, read_data_file
+from period_index import build_period_index
+
+
+def _ingested(tmp_path, name):
+    path = str(tmp_path / name)
+    shutil.copyfile(os.path.join(REPO_DIR, name), path)
+    db_path = str(tmp_path / 'dashboard.db')
+    sql_backend.ingest_file(path, db_path)
+    return path, db_path
+
+
+def _assert_same_totals(index, expected):
+    assert list(index) == list(expected)
+    for period, entry in expected.items():
+        for column, value in entry['totals'].items():
+            actual = index[period]['totals'][column]
+            if pd.isna(value):
+                assert actual is None or math.isnan(actual)
+            else:
+                assert actual == value
+
+
+def test_overall_totals_match_the_period_index(tmp_path):
+    path, db_path = _ingested(tmp_path, 'Overall_BU.csv')
+    df, _ = read_data_file(path)
+    expected = build_period_index(df)
+
+    index = sql_backend.period_index(path, db_path)
+
+    _assert_same_totals(index, expected)
+    # The month's rows are only queried when read
+    period = pd.Period('2025-02', 'M')
+    assert 'data' not in dict.keys(index[period])
+    data = index[period]['data']
+    assert data['BU'].tolist() == ['BU1', 'BU2', 'BU3']
+    assert data['Expense'].tolist() == expected[period]['data']['Expense'].astype(float).tolist()
+
+
+def test_bu_totals_match_the_financial_rows(tmp_path):
+    path, db_path = _ingested(tmp_path, 'BU1.csv')
+    df, _ = read_data_file(path)
+
+    index = sql_backend.period_index(path, db_path)
+
+    _assert_same_totals(index, bu_view(df)['index'])
+    data = index[pd.Period('2025-01', 'M')]['data']
+    assert set(data['Subdiv']) == set(bu_view(df)['tables']['Financial'].xs('2025-01', level='Month').index)
+
+
+def test_changed_export_is_not_served_from_the_database(tmp_path):
+    path, db_path = _ingested(tmp_path, 'Overall_BU.csv')
+    assert sql_backend.source_for_file(path, db_path) == ('overall', 'Overall_BU')
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('BU4,100,90,90%,1000,100,10,4.0,100,90,90%,90%,90%,10,12,90%,5%,31/03/2025\n')
+
+    assert sql_backend.source_for_file(path, db_path) is None
+    assert sql_backend.period_index(path, db_path) == {}
@@ -0,0 +1,75 @@
+import math
+import os
+
+import background_refresh
+from conftest import REPO_DIR
+from data_loader import bu_view, read_data_file
+from streaming_ingest import aggregate_csv
+
+
+def _table(file_path, perspective):
+    df, _ = read_data_file(file_path)
+    return bu_view(df)['tables'][perspective]
+
+
+def _aggregate_rows(file_path):
+    aggregates, _ = aggregate_csv(file_path, chunksize=5)
+    return {(row['Month'], str(row['Subdiv'])): row for row in aggregates.to_dict('records')}
+
+
+def test_bu_export_aggregates_per_subdiv():
+    path = os.path.join(REPO_DIR, 'BU1.csv')
+    rows = _aggregate_rows(path)
+
+    financial = _table(path, 'Financial')
+    for (month, subdiv), values in financial.iterrows():
+        row = rows[(month, str(subdiv))]
+        assert row['Budget'] == float(values['Budget'])
+        assert row['Expense'] == float(values['Expense'])
+        # Subdivs have no customer rows: their counts are missing, not 0
+        assert math.isnan(row['#of customer'])
+
+
+def test_bu_export_aggregates_customers_per_product():
+    path = os.path.join(REPO_DIR, 'BU1.csv')
+    rows = _aggregate_rows(path)
+
+    customers = _table(path, 'Customer n Service')
+    assert not customers.empty
+    for (month, product), values in customers.iterrows():
+        row = rows[(month, str(product))]
+        assert row['#of customer'] == float(values['#of customer'])
+        assert math.isclose(row['Customer satisfaction'], float(values['Customer satisfaction']), rel_tol=1e-6)
+        assert math.isnan(row['Budget'])
+
+
+def test_month_without_customer_rows_has_no_customer_total(tmp_path, monkeypatch):
+    path = str(tmp_path / 'BU1.csv')
+    with open(os.path.join(REPO_DIR, 'BU1.csv'), 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(path, 'wb') as f:
+        f.writelines(line for line in lines if not (b'Customer' in line and b'/02/2025' in line))
+    monkeypatch.setattr(background_refresh, 'needs_streaming', lambda file_path: True)
+
+    index = background_refresh.build_view(path, overall=False)['index']
+
+    totals = {str(period): entry['totals'] for period, entry in index.items()}
+    assert totals['2025-01']['#of customer'] == 60
+    assert math.isnan(totals['2025-02']['#of customer'])
+    assert totals['2025-02']['Budget'] == 600
+
+
+def test_oversized_bu_export_is_served_streamed(monkeypatch):
+    path = os.path.join(REPO_DIR, 'BU1.csv')
+    monkeypatch.setattr(background_refresh, 'needs_streaming', lambda file_path: True)
+
+    view = background_refresh.build_view(path, overall=False)
+
+    assert view.get('streamed')
+    financial = _table(path, 'Financial')
+    customers = _table(path, 'Customer n Service')
+    assert sorted(view['index']) == sorted(financial.index.get_level_values('Month').unique())
+    period = max(view['index'])
+    data = view['index'][period]['data']
+    expected = set(financial.xs(period, level='Month').index) | set(customers.xs(period, level='Month').index)
+    assert set(data['Subdiv'].astype(str)) == expected
@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+
+from data_generator import generate_bu_frame, generate_overall_frame
+from data_schema import BU_SCHEMA, OVERALL_SCHEMA, read_typed_csv
+from synthetic_csv import iter_bu_chunks, write_csv, write_dataset
+
+
+def _assert_round_trip(path, df, schema):
+    read, problems = read_typed_csv(path, schema)
+    assert problems == []
+    # Percentages are exported as whole points
+    percents = [name for name, kind in schema['columns'].values() if kind == 'percent']
+    df = df.assign(**{name: df[name].round() for name in percents})
+    pd.testing.assert_frame_equal(
+        read[list(df.columns)], df.reset_index(drop=True), check_dtype=False, check_categorical=False
+    )
+
+
+def test_overall_export_reads_back_as_generated(tmp_path):
+    path = str(tmp_path / 'Overall_BU.csv')
+    df = generate_overall_frame(n_bus=4, n_months=3)
+
+    assert write_csv(path, [df], OVERALL_SCHEMA) == len(df)
+
+    _assert_round_trip(path, df, OVERALL_SCHEMA)
+    with open(path, 'rb') as f:
+        header, first = f.read().split(b'\r\n')[:2]
+    assert header.startswith(b'\xef\xbb\xbfBU,Budget Finance,')
+    assert b'%' in first and first.endswith(b'31/01/2025')
+
+
+def test_bu_export_reads_back_as_generated(tmp_path):
+    path = str(tmp_path / 'BU1.csv')
+    df = generate_bu_frame(n_subdivs=3, n_products=2, n_months=2)
+
+    write_csv(path, [df], BU_SCHEMA)
+
+    _assert_round_trip(path, df, BU_SCHEMA)
+
+
+def test_chunked_bu_export_is_laid_out_in_perspective_blocks(tmp_path):
+    path = str(tmp_path / 'BU1.csv')
+    # One month per chunk
+    rows = write_csv(path, iter_bu_chunks(3, 2, 4, chunk_rows=1), BU_SCHEMA)
+
+    df, problems = read_typed_csv(path, BU_SCHEMA)
+    assert problems == [] and len(df) == rows == 4 * (3 * 3 + 2)
+    blocks = df['Perspective'].astype(str)
+    assert blocks[blocks != blocks.shift()].tolist() == ['Financial', 'Customer n Service', 'Quality', 'Employee']
+    assert df.groupby('Perspective', observed=True)['Month'].is_monotonic_increasing.all()
+
+
+def test_dataset_has_an_overall_and_a_file_per_bu(tmp_path):
+    written = write_dataset(str(tmp_path), n_bus=3, n_subdivs=2, n_products=2, n_months=2, bu_files=2)
+
+    assert sorted(os.path.basename(path) for path in written) == ['BU1.csv', 'BU2.csv', 'Overall_BU.csv']
+    assert written[str(tmp_path / 'Overall_BU.csv')] == 2 * 4
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from table_query import label_columns, page_count, page_rows, select_rows
+
+
+def _table():
+    """Subdiv table indexed by (Month, Subdiv), as bu_view builds them."""
+    months = pd.PeriodIndex(['2025-01'] * 3 + ['2025-02'] * 3, freq='M', name='Month')
+    subdivs = pd.CategoricalIndex(['North', 'South', 'Online'] * 2, name='Subdiv')
+    return pd.DataFrame(
+        {'Budget': [600, 480, None, 620, 480, 300], 'Product': ['Card', 'Loan', 'Card', 'Loan', 'Card', 'App']},
+        index=pd.MultiIndex.from_arrays([months, subdivs]),
+    )
+
+
+def test_label_columns_include_index_levels():
+    assert label_columns(_table()) == ['Subdiv', 'Product']
+
+
+def test_search_matches_labels_case_insensitively():
+    df = _table()
+
+    assert select_rows(df, search=' NORTH ').tolist() == [0, 3]
+    # Any label column may match: Subdiv 'Online' or Product 'Loan'
+    assert select_rows(df, search='l').tolist() == [1, 2, 3, 5]
+    assert select_rows(df, search='nowhere').tolist() == []
+
+
+def test_filters_and_search_combine():
+    df = _table()
+
+    assert select_rows(df, filters={'Subdiv': ['North', 'South']}).tolist() == [0, 1, 3, 4]
+    assert select_rows(df, search='card', filters={'Subdiv': ['North', 'South']}).tolist() == [0, 4]
+    # An empty filter keeps every row
+    assert select_rows(df, filters={'Product': []}).tolist() == list(range(6))
+
+
+def test_sort_is_stable_with_missing_values_last():
+    df = _table()
+
+    assert select_rows(df, sort_by='Budget').tolist() == [5, 1, 4, 0, 3, 2]
+    assert select_rows(df, sort_by='Budget', ascending=False).tolist() == [3, 0, 1, 4, 5, 2]
+    assert select_rows(df, filters={'Product': ['Card']}, sort_by='Subdiv').tolist() == [0, 2, 4]
+
+
+def test_pages_of_a_result():
+    df = _table()
+    positions = select_rows(df, sort_by='Budget')
+
+    assert page_count(len(positions), 4) == 2
+    assert page_rows(df, positions, 1, 4)['Budget'].tolist() == [300, 480, 480, 600]
+    # The last page holds the rest
+    last = page_rows(df, positions, 2, 4)
+    assert last['Budget'].tolist()[0] == 620 and np.isnan(last['Budget'].iloc[1])
+    assert page_rows(df, positions, 3, 4).empty
+
+
+def test_empty_table_has_one_empty_page():
+    df = _table().iloc[:0]
+    positions = select_rows(df, search='north', sort_by='Budget')
+
+    assert len(positions) == 0
+    assert page_count(len(positions), 50) == 1
+    assert page_rows(df, positions, 1, 50).empty